@@ -0,0 +1,217 @@
+import os
+import time
+import asyncio
+import itertools
+from collections import deque, Counter
+import metrics
+
+# Gemini quota-aware admission control for /chat.
+# TokenBudget tracks tokens and requests per minute across every LLM call in this process.
+# AdmissionQueue decides when a /chat run may start: runs queue per user and are admitted
+# round-robin, so one user firing off many questions cannot starve everyone else.
+
+GEMINI_TPM_LIMIT = int(os.getenv("GEMINI_TPM_LIMIT", "250000"))
+GEMINI_RPM_LIMIT = int(os.getenv("GEMINI_RPM_LIMIT", "15"))
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "120"))
+# Starting guess for the tokens one agent run consumes; refined from real runs.
+ADMISSION_EST_RUN_TOKENS = int(os.getenv("ADMISSION_EST_RUN_TOKENS", "8000"))
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) used when the API reports no usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class QuotaExceeded(Exception):
+    """Raised when a request is shed instead of queued."""
+    def __init__(self, message, retry_after):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class TokenBudget:
+    """
+    Sliding one-minute window of LLM requests and tokens.
+    Reservations are recorded up front from an estimate and reconciled with
+    the actual usage when the call finishes.
+    """
+    def __init__(self, tokens_per_minute, requests_per_minute, window=60.0):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.window = window
+        self._events = deque()  # [timestamp, tokens] per LLM request
+        self._blocked_until = 0.0
+
+    def _prune(self, now):
+        while self._events and now - self._events[0][0] >= self.window:
+            self._events.popleft()
+
+    def usage(self):
+        now = time.monotonic()
+        self._prune(now)
+        return sum(e[1] for e in self._events), len(self._events)
+
+    def seconds_until_capacity(self, tokens, requests=1):
+        """0 if `tokens`/`requests` fit in the current window, else the wait until they do."""
+        now = time.monotonic()
+        self._prune(now)
+        wait = max(0.0, self._blocked_until - now)
+        used_tokens = sum(e[1] for e in self._events)
+        # A single call larger than the whole budget can only ever run into an empty window
+        tokens = min(tokens, self.tokens_per_minute)
+        used_requests = len(self._events)
+        if used_tokens + tokens <= self.tokens_per_minute and used_requests + requests <= self.requests_per_minute:
+            return wait
+        # Walk the window oldest-first until enough has expired
+        for ts, event_tokens in self._events:
+            used_tokens -= event_tokens
+            used_requests -= 1
+            if used_tokens + tokens <= self.tokens_per_minute and used_requests + requests <= self.requests_per_minute:
+                return max(wait, ts + self.window - now)
+        return max(wait, self.window)
+
+    def reserve(self, tokens):
+        event = [time.monotonic(), tokens]
+        self._events.append(event)
+        metrics.GEMINI_REQUESTS.inc()
+        return event
+
+    def reconcile(self, reservation, actual_tokens):
+        metrics.GEMINI_TOKENS.inc(actual_tokens)
+        if reservation is not None:
+            reservation[1] = actual_tokens
+
+    def backoff(self, seconds):
+        """Called after an upstream 429: admit nothing new until the quota has had time to refill."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self, tokens):
+        """Waits until a call of `tokens` fits the budget, then reserves it."""
+        started = time.monotonic()
+        while True:
+            wait = self.seconds_until_capacity(tokens)
+            if wait <= 0:
+                metrics.GEMINI_BUDGET_WAIT.observe(time.monotonic() - started)
+                return self.reserve(tokens)
+            await asyncio.sleep(min(wait, 1.0))
+
+
+class Ticket:
+    __slots__ = ("user_id", "seq", "enqueued_at", "admitted", "event")
+
+    def __init__(self, user_id, seq):
+        self.user_id = user_id
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.admitted = False
+        self.event = asyncio.Event()
+
+
+class AdmissionQueue:
+    """
+    Fair admission for agent runs. Each user has a FIFO. A ticket's turn is its
+    index in that FIFO plus the user's runs already in flight, so users take turns
+    and a user with runs in progress yields to users with none. Tickets are
+    admitted while there is run concurrency and token budget for another estimated run.
+    """
+    def __init__(self, budget, max_concurrent=MAX_CONCURRENT_RUNS, max_queue=ADMISSION_MAX_QUEUE,
+                 max_wait=ADMISSION_MAX_WAIT, est_run_tokens=ADMISSION_EST_RUN_TOKENS):
+        self.budget = budget
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.est_run_tokens = est_run_tokens
+        self.active = 0
+        self._queues = {}  # user_id -> deque[Ticket]
+        self._active_by_user = Counter()
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def _order(self):
+        """Queued tickets in the order they would be admitted (round-robin across users)."""
+        keyed = []
+        for user_id, queue in self._queues.items():
+            for i, ticket in enumerate(queue):
+                keyed.append((self._active_by_user[user_id] + i, ticket.seq, ticket))
+        keyed.sort(key=lambda k: (k[0], k[1]))
+        return [k[2] for k in keyed]
+
+    def position(self, ticket):
+        """1-based place in line, or 0 once admitted."""
+        if ticket.admitted:
+            return 0
+        return self._order().index(ticket) + 1
+
+    def enqueue(self, user_id):
+        if len(self) >= self.max_queue:
+            metrics.ADMISSION_SHED.inc(reason="queue_full")
+            raise QuotaExceeded("Server is busy. Too many questions are waiting; please retry shortly.",
+                                retry_after=self.budget.seconds_until_capacity(self.est_run_tokens) or 5)
+        ticket = Ticket(user_id or "anonymous", next(self._seq))
+        self._queues.setdefault(ticket.user_id, deque()).append(ticket)
+        metrics.ADMISSION_QUEUE_DEPTH.set(len(self))
+        self.dispatch()
+        return ticket
+
+    def dispatch(self):
+        while self.active < self.max_concurrent and self._queues:
+            if self.budget.seconds_until_capacity(self.est_run_tokens) > 0:
+                return
+            ticket = self._order()[0]
+            queue = self._queues[ticket.user_id]
+            queue.popleft()
+            if not queue:
+                del self._queues[ticket.user_id]
+            ticket.admitted = True
+            self.active += 1
+            self._active_by_user[ticket.user_id] += 1
+            metrics.ADMISSION_WAIT.observe(time.monotonic() - ticket.enqueued_at)
+            ticket.event.set()
+        metrics.ADMISSION_QUEUE_DEPTH.set(len(self))
+
+    def cancel(self, ticket):
+        """Drops a ticket that is still waiting (client went away or it was shed)."""
+        queue = self._queues.get(ticket.user_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user_id]
+        metrics.ADMISSION_QUEUE_DEPTH.set(len(self))
+
+    async def wait(self, ticket, timeout):
+        """Waits up to `timeout` for admission. Sheds the ticket once it exceeds max_wait."""
+        self.dispatch()
+        if ticket.admitted:
+            return True
+        try:
+            await asyncio.wait_for(ticket.event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            pass
+        if time.monotonic() - ticket.enqueued_at > self.max_wait:
+            self.cancel(ticket)
+            metrics.ADMISSION_SHED.inc(reason="timeout")
+            raise QuotaExceeded("Server is busy. Your question waited too long in the queue; please retry shortly.",
+                                retry_after=self.budget.seconds_until_capacity(self.est_run_tokens) or 5)
+        return False
+
+    def release(self, ticket, tokens_used=None):
+        if not ticket.admitted:
+            self.cancel(ticket)
+            return
+        self.active -= 1
+        self._active_by_user[ticket.user_id] -= 1
+        if self._active_by_user[ticket.user_id] <= 0:
+            del self._active_by_user[ticket.user_id]
+        if tokens_used:
+            # Exponentially weighted estimate of what one run costs
+            self.est_run_tokens = int(0.8 * self.est_run_tokens + 0.2 * tokens_used)
+        self.dispatch()
+
+
+gemini_budget = TokenBudget(GEMINI_TPM_LIMIT, GEMINI_RPM_LIMIT)
+chat_queue = AdmissionQueue(gemini_budget)
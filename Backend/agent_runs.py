@@ -0,0 +1,112 @@
+import os
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+import log
+from shared_store import shared_store
+
+# Agent runs that pause for approval and resume where they stopped.
+# A gated tool (or request_user_approval) raises ApprovalRequiredException, which ends the run.
+# The user's "I approve. Proceed with: ..." used to start a fresh run that re-planned from the
+# question, paying again for every LLM turn before the gate. ResumableAgentExecutor
+# (resumable_executor.py, imported with LangChain) attaches a PausedRun to that exception: the run's inputs, its finished (action, observation) steps and the
+# tool calls of the step that hit the gate. main.py keeps it per chat session; when the session's
+# next message is the approval, the run continues from the gated calls instead of from scratch.
+
+# Paused runs older than this are dropped (the user answered something else, or went away)
+PAUSED_RUN_TTL = float(os.getenv("PAUSED_RUN_TTL", "1800"))
+PAUSED_RUNS_KEPT = 256
+
+logger = log.get_logger("agent_runs")
+
+# The PausedRun the agent run started in this context continues; set by main.generate_response
+resume_from = contextvars.ContextVar("resume_from", default=None)
+
+
+def _action_to_dict(action):
+    return {"tool": action.tool, "toolInput": action.tool_input, "log": action.log}
+
+
+def _action_from_dict(data):
+    from langchain_core.agents import AgentAction
+    return AgentAction(data["tool"], data["toolInput"], data["log"])
+
+
+class PausedRun:
+    __slots__ = ("inputs", "steps", "pending", "action", "paused_at", "answer_key", "dependencies")
+
+    def __init__(self, inputs, steps, pending, action=None, paused_at=None, answer_key=None, dependencies=None):
+        self.inputs = inputs  # the executor inputs ({"input": question with memory context})
+        self.steps = steps  # [(AgentAction, observation)] finished before the gate
+        self.pending = pending  # [AgentAction] of the step that hit the gate, run again on resume
+        self.action = action  # what the user was asked to approve
+        self.paused_at = paused_at or time.time()
+        # Answer cache key of the approved answer to the question (answer_cache.make_key), and
+        # the data versions the run read before the gate; set by main.py, None when not cacheable
+        self.answer_key = answer_key
+        self.dependencies = dependencies or {}
+
+    def to_dict(self):
+        return {
+            "inputs": self.inputs,
+            "steps": [[_action_to_dict(a), observation] for a, observation in self.steps],
+            "pending": [_action_to_dict(a) for a in self.pending],
+            "action": self.action,
+            "pausedAt": self.paused_at,
+            "answerKey": list(self.answer_key) if self.answer_key else None,
+            "dependencies": self.dependencies,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        answer_key = data.get("answerKey")
+        return cls(data["inputs"], [(_action_from_dict(a), o) for a, o in data["steps"]],
+                   [_action_from_dict(a) for a in data["pending"]], data.get("action"), data.get("pausedAt"),
+                   tuple(answer_key) if answer_key else None, data.get("dependencies"))
+
+
+class PausedRunStore:
+    """
+    Paused runs by chat session id. With the shared store on, they are kept there only, so the
+    approval can reach any worker and a run is resumed at most once.
+    """
+
+    def __init__(self, ttl=PAUSED_RUN_TTL, maxsize=PAUSED_RUNS_KEPT, shared=shared_store):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._runs = OrderedDict()  # session id -> PausedRun
+
+    def save(self, session_id, run):
+        if self.shared is not None:
+            self.shared.put(f"paused:{session_id}", run.to_dict(), fetched_at=run.paused_at)
+            return
+        with self._lock:
+            self._runs[session_id] = run
+            self._runs.move_to_end(session_id)
+            while len(self._runs) > self.maxsize:
+                self._runs.popitem(last=False)
+
+    def take(self, session_id):
+        """Removes and returns the session's paused run, or None (also when it is older than the TTL)."""
+        if self.shared is not None:
+            # Claimed in one transaction: a double-submitted approval resumes the run on one worker only
+            entry = self.shared.take(f"paused:{session_id}")
+            if entry is None:
+                return None
+            try:
+                run = PausedRun.from_dict(entry[0])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("agent.resume_invalid", "Discarding unreadable paused run: %s", e)
+                return None
+        else:
+            with self._lock:
+                run = self._runs.pop(session_id, None)
+        if run is None or time.time() - run.paused_at > self.ttl:
+            return None
+        return run
+
+
+paused_runs = PausedRunStore()
@@ -0,0 +1,198 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+import metrics
+from data_versions import data_versions, current_dependencies
+
+# Answer cache for repeated /chat questions.
+# During a big match hundreds of users ask the same thing. A finished answer is cached under
+# the normalized question together with the versions of every Sportradar resource the run
+# read; it is served again only while all of those resources are unchanged. Versions only move
+# when the data is fetched again, so before a hit is served the live resources it read (match
+# summaries, schedules) older than ANSWER_CACHE_REFRESH_AGE are re-fetched (`refresher`). Identical
+# questions arriving while a run is still in flight attach to that run instead of starting their own.
+# A question whose run pauses for approval is cached once the approved run finishes, under the
+# question's key with approved=True (main.py): a later approval of the same question, in the same
+# conversation state, is answered from cache instead of resuming its paused run.
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+# Answers that read the live schedule also expire quickly as a safety net: the schedule
+# version only moves when someone fetches it again.
+ANSWER_CACHE_LIVE_TTL = float(os.getenv("ANSWER_CACHE_LIVE_TTL", "30"))
+# Live resources of a cached answer older than this are re-fetched before it is served
+ANSWER_CACHE_REFRESH_AGE = float(os.getenv("ANSWER_CACHE_REFRESH_AGE", "15"))
+
+# SSE event types that belong to one particular run and are not replayed from cache
+_RUN_ONLY_EVENTS = ("trace", "queue")
+
+_PUNCTUATION = re.compile(r"[^\w\s:]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """'Who will win Sri Lanka vs Zimbabwe?' and 'who will win  sri lanka vs zimbabwe' share a key."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_key(message, approved=False, context=""):
+    # Approval changes what the agent is allowed to do, so this request's approval is part of
+    # the key; so is the conversation memory a follow-up is answered against
+    digest = hashlib.blake2b(context.encode("utf-8"), digest_size=8).hexdigest() if context else ""
+    return (normalize_question(message), bool(approved), digest)
+
+
+def _event_type(frame):
+    try:
+        return json.loads(frame[len("data: "):]).get("type")
+    except (ValueError, AttributeError):
+        return None
+
+
+class _Entry:
+    __slots__ = ("frames", "dependencies", "created", "ttl")
+
+    def __init__(self, frames, dependencies, ttl):
+        self.frames = frames
+        self.dependencies = dependencies
+        self.created = time.monotonic()
+        self.ttl = ttl
+
+
+class SharedRun:
+    """One in-flight agent run whose SSE frames are fanned out to every subscriber."""
+    def __init__(self):
+        self.frames = []
+        self.done = False
+        self._subscribers = []
+
+    def publish(self, frame):
+        self.frames.append(frame)
+        for q in self._subscribers:
+            q.put_nowait(frame)
+
+    def finish(self):
+        self.done = True
+        for q in self._subscribers:
+            q.put_nowait(None)
+
+    async def subscribe(self):
+        # Late joiners first get everything published so far
+        q = asyncio.Queue()
+        for frame in self.frames:
+            q.put_nowait(frame)
+        if self.done:
+            q.put_nowait(None)
+        else:
+            self._subscribers.append(q)
+        try:
+            while True:
+                frame = await q.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+
+class AnswerCache:
+    def __init__(self, maxsize=ANSWER_CACHE_SIZE, refresh_age=ANSWER_CACHE_REFRESH_AGE):
+        self.maxsize = maxsize
+        self.refresh_age = refresh_age
+        # refresher(resources, max_age): re-fetches the resources older than max_age (blocking).
+        # Set by main.py once there is a Sportradar client.
+        self.refresher = None
+        self._entries = OrderedDict()
+        self.inflight = {}
+        self._tasks = set()
+
+    def lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expired = time.monotonic() - entry.created > entry.ttl
+        changed = any(data_versions.current(r) != v for r, v in entry.dependencies.items())
+        if expired or changed:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key, frames, dependencies):
+        live = any(r.startswith("get_live_schedule:") for r in dependencies)
+        self._entries[key] = _Entry(frames, dict(dependencies), ANSWER_CACHE_LIVE_TTL if live else ANSWER_CACHE_TTL)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def _produce(self, key, run, produce, dependencies):
+        # The agent task (and its tool threads) inherit this context, so every
+        # Sportradar payload the run reads is recorded with its version.
+        current_dependencies.set(dependencies)
+        answered = False
+        try:
+            async for frame in produce():
+                run.publish(frame)
+                event_type = _event_type(frame)
+                if event_type == "answer":
+                    answered = True
+                elif event_type == "error":
+                    answered = False
+        except Exception as e:
+            answered = False
+            run.publish(f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n")
+        finally:
+            self.inflight.pop(key, None)
+            run.finish()
+        if answered:
+            frames = [f for f in run.frames if _event_type(f) not in _RUN_ONLY_EVENTS]
+            self.store(key, frames, dependencies)
+
+    async def stream(self, key, produce, dependencies=None):
+        """
+        Yields SSE frames for `key`: from cache when still current, else from the
+        in-flight run for the same question, else from a new run started via `produce()`.
+        `dependencies`: data versions read for the answer before this run (a resumed run's first part).
+        """
+        entry = self.lookup(key)
+        if entry is not None and self.refresher is not None:
+            # Bring what the answer read up to date first; a moved version turns the hit into a miss
+            await asyncio.to_thread(self.refresher, list(entry.dependencies), self.refresh_age)
+            entry = self.lookup(key)
+        if entry is not None:
+            metrics.CACHE_REQUESTS.inc(method="answer", result="hit")
+            age = round(time.monotonic() - entry.created, 1)
+            yield f"data: {json.dumps({'type': 'cached', 'ageSeconds': age})}\n\n"
+            for frame in entry.frames:
+                yield frame
+            return
+
+        run = self.inflight.get(key)
+        if run is None:
+            metrics.CACHE_REQUESTS.inc(method="answer", result="miss")
+            run = SharedRun()
+            self.inflight[key] = run
+            # The run lives independently of this client, so other subscribers
+            # keep receiving frames if the first one disconnects.
+            task = asyncio.create_task(self._produce(key, run, produce, dict(dependencies or {})))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            metrics.CACHE_REQUESTS.inc(method="answer", result="shared")
+
+        async for frame in run.subscribe():
+            yield frame
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import statistics
+
+# Shared baseline handling for the benchmark scripts.
+# Baselines live in baselines.json next to this file, one section per benchmark script.
+# Raw timings only mean something on the machine that recorded them, so CPU-bound sections also
+# store the time of a fixed calibration loop (CALIBRATION_KEY) measured when they were recorded.
+# Sections whose timings are mostly waiting (load_chat.py: scripted LLM and Sportradar latency)
+# are saved without it and compared raw.
+# On another machine (or a busier one) the baseline is scaled by current / recorded calibration
+# before comparing; a result fails when it is slower than scaled baseline * tolerance.
+# One calibration sample swings with the machine's load, so scripts take samples before and
+# after their timed loops (bench_hotpaths.py one right after every timed repeat) and the median
+# of the samples is used.
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "2.0"))
+CALIBRATION_KEY = "calibration_us"
+CALIBRATION_REPEAT = 7
+
+_samples = []  # calibration samples of this process, in microseconds
+
+
+def _calibration_loop():
+    # Interpreter-bound work shaped like the hot paths: string keys, dict updates, JSON, sorting
+    counts = {}
+    for i in range(20000):
+        key = f"match:{i % 500}"
+        counts[key] = counts.get(key, 0) + i
+    sorted(json.loads(json.dumps(counts)).values())
+
+
+def calibrate(repeat=CALIBRATION_REPEAT):
+    """Takes a calibration sample: best-of-`repeat` time of the calibration loop, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _calibration_loop()
+        best = min(best, time.perf_counter() - started)
+    _samples.append(best * 1e6)
+    return _samples[-1]
+
+
+def calibration():
+    """Median of this process's calibration samples (one is taken if there is none yet)."""
+    if not _samples:
+        calibrate()
+    return statistics.median(_samples)
+
+
+def _read():
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load(section):
+    """Stored baseline for `section`, scaled to this machine's calibration."""
+    stored = dict(_read().get(section, {}))
+    recorded = stored.pop(CALIBRATION_KEY, None)
+    scale = calibration() / recorded if recorded else 1.0
+    return {name: value * scale for name, value in stored.items()}
+
+
+def save(section, results, calibrated=True):
+    data = _read()
+    data[section] = {name: round(value, 6) for name, value in results.items() if name != CALIBRATION_KEY}
+    if calibrated:
+        data[section][CALIBRATION_KEY] = round(calibration(), 3)
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def compare(section, results, tolerance=DEFAULT_TOLERANCE):
+    """
+    Prints a results table against the stored baseline, scaled to this machine.
+    Returns the list of benchmark names that regressed.
+    """
+    baseline = load(section)
+    recorded = _read().get(section, {}).get(CALIBRATION_KEY)
+    if recorded:
+        print(f"calibration: {calibration():.1f}us here (median of {len(_samples)} samples, "
+              f"{min(_samples):.1f}-{max(_samples):.1f}us), {recorded:.1f}us when recorded "
+              f"(baseline x{calibration() / recorded:.2f})")
+    regressions = []
+    print(f"{'benchmark':<40} {'result':>12} {'baseline':>12} {'ratio':>7}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base:
+            ratio = value / base
+            flag = ""
+            if ratio > tolerance:
+                flag = "  <-- REGRESSION"
+                regressions.append(name)
+            print(f"{name:<40} {value:>12.6f} {base:>12.6f} {ratio:>6.2f}x{flag}")
+        else:
+            print(f"{name:<40} {value:>12.6f} {'-':>12} {'-':>7}")
+    return regressions
@@ -0,0 +1,166 @@
+"""
+Microbenchmarks for backend hot paths, run in-process against mock Sportradar fixtures.
+
+Each result is the best-of-N mean time per call in microseconds, each repeat measured against a
+calibration loop timed right after it (see baseline.py):
+- match_list_us: /api/match-list assembly (live summaries, two daily schedules, recent scores)
+- live_context_us: fetch_live_match_context summary parsing
+- scouting_notes_*_us: check_scouting_notes over a synthetic 50k-entry knowledge base
+- win_probability_*_us: calculate_win_probability (chase and first-innings paths)
+- sse_tool_end_us / sse_agent_action_us: AgentCallbackHandler event -> SSE frame
+
+Usage:
+    python benchmarks/bench_hotpaths.py                   # compare against baselines.json
+    python benchmarks/bench_hotpaths.py --update-baseline # record new baseline numbers
+    python benchmarks/bench_hotpaths.py --only scouting   # run a subset
+"""
+import sys
+import time
+import asyncio
+import argparse
+
+import baseline
+import fixtures
+
+SECTION = "hotpaths"
+
+
+def timeit(func, number, repeat):
+    """
+    Best-of-`repeat` mean per call, in calibration loops: each repeat is divided by one
+    calibration loop timed right after it, so both see the machine at the same speed.
+    main() converts it to microseconds at the run's median calibration.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = (time.perf_counter() - started) / number
+        best = min(best, elapsed * 1e6 / baseline.calibrate(repeat=1))
+    return best
+
+
+def bench_match_list(repeat):
+    import main
+    main.client = fixtures.sportradar_client.get_default_client()
+    loop = asyncio.new_event_loop()
+    run = lambda: loop.run_until_complete(main.get_match_list())
+    run()  # warm the schedule/summary caches, as in steady state
+    try:
+        return {"match_list_us": timeit(run, 50, repeat)}
+    finally:
+        loop.close()
+
+
+def bench_live_context(repeat):
+    import tools
+    tools.SESSION_APPROVED = True
+    run = lambda: tools.fetch_live_match_context.func("")
+    run()
+    return {"live_context_us": timeit(run, 50, repeat)}
+
+
+def bench_scouting_notes(repeat):
+    import tools
+    tools.SESSION_APPROVED = True
+    original = tools.knowledge_base
+    tools.knowledge_base = fixtures.synthetic_knowledge_base(50000)
+    try:
+        return {
+            "scouting_notes_player_us": timeit(lambda: tools.check_scouting_notes.func("V. Kohli"), 5, repeat),
+            "scouting_notes_team_us": timeit(lambda: tools.check_scouting_notes.func("Zimbabwe"), 5, repeat),
+            "scouting_notes_miss_us": timeit(lambda: tools.check_scouting_notes.func("Nobody Known"), 5, repeat),
+        }
+    finally:
+        tools.knowledge_base = original
+
+
+def bench_win_probability(repeat):
+    import tools
+    tools.SESSION_APPROVED = True
+    chase = lambda: tools.calculate_win_probability.func(42, 30, 6, 181, "India", "Zimbabwe")
+    first = lambda: tools.calculate_win_probability.func(0, 60, 8, 0, "India", "Zimbabwe")
+    return {
+        "win_probability_chase_us": timeit(chase, 2000, repeat),
+        "win_probability_first_innings_us": timeit(first, 2000, repeat),
+    }
+
+
+def bench_sse(repeat):
+    import uuid
+    import tools
+    from langchain_core.agents import AgentAction
+    from callbacks import AgentCallbackHandler
+    tools.SESSION_APPROVED = True
+    observation = tools.fetch_live_match_context.func("")
+    action = AgentAction("check_scouting_notes", {"name": "India"}, 'Thought: compare\nAction:\n```\n{"action": "check_scouting_notes"}\n```')
+
+    loop = asyncio.new_event_loop()
+    queue = asyncio.Queue()
+    handler = AgentCallbackHandler(queue)
+
+    async def tool_end():
+        await handler.on_tool_end(observation, run_id=uuid.uuid4())
+        return f"data: {queue.get_nowait()}\n\n"
+
+    async def agent_action():
+        handler._last_action_log = None
+        await handler.on_agent_action(action)
+        return f"data: {queue.get_nowait()}\n\n"
+
+    async def batch(step, n):
+        for _ in range(n):
+            await step()
+
+    try:
+        return {
+            "sse_tool_end_us": timeit(lambda: loop.run_until_complete(batch(tool_end, 200)), 1, repeat) / 200,
+            "sse_agent_action_us": timeit(lambda: loop.run_until_complete(batch(agent_action, 200)), 1, repeat) / 200,
+        }
+    finally:
+        loop.close()
+
+
+BENCHMARKS = {
+    "match_list": bench_match_list,
+    "live_context": bench_live_context,
+    "scouting": bench_scouting_notes,
+    "win_probability": bench_win_probability,
+    "sse": bench_sse,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    fixtures.install_mock_transport()
+    baseline.calibrate()
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results.update(BENCHMARKS[name](args.repeat))
+    baseline.calibrate()
+    # compare() scales the baseline by this same median, so the calibration cancels out
+    scale = baseline.calibration()
+    results = {name: value * scale for name, value in results.items()}
+
+    if args.update_baseline:
+        if args.only:
+            merged = baseline.load(SECTION)
+            merged.update(results)
+            baseline.save(SECTION, merged)
+        else:
+            baseline.save(SECTION, results)
+        print("Baseline updated.")
+    regressions = baseline.compare(SECTION, results)
+    if regressions and not args.update_baseline:
+        print(f"FAILED: hot path regressions in {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Startup benchmark for the backend.
+
+Measures, in fresh subprocesses:
+- import_main_s: time to `import main`
+- first_request_s: time from launching uvicorn until /health answers
+- ready_s: time from launching uvicorn until /ready reports the agent is built
+
+Usage:
+    python benchmarks/bench_startup.py                   # compare against baselines.json
+    python benchmarks/bench_startup.py --update-baseline # record new baseline numbers
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+import baseline
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dummy keys: startup must not need the network, and no request here reaches Gemini/Sportradar
+ENV = dict(os.environ,
+           GEMINI_MODEL=os.getenv("GEMINI_MODEL", "gemini-flash-lite-latest"),
+           GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "benchmark"),
+           SPORTRADAR_API_KEY=os.getenv("SPORTRADAR_API_KEY", "benchmark"))
+
+
+def measure_import(runs):
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=ENV,
+                             capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def measure_server(runs, timeout=60):
+    first_request, ready = [], []
+    for _ in range(runs):
+        port = _free_port()
+        started = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                                cwd=BACKEND_DIR, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            if not _wait_for(base + "/health", started + timeout):
+                raise RuntimeError("server did not answer /health")
+            first_request.append(time.perf_counter() - started)
+            if not _wait_for(base + "/ready", started + timeout):
+                raise RuntimeError("agent did not become ready")
+            ready.append(time.perf_counter() - started)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+    return statistics.median(first_request), statistics.median(ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline.calibrate()  # once before the timed runs; once after it, before compare/save
+    results = {"import_main_s": measure_import(args.runs)}
+    results["first_request_s"], results["ready_s"] = measure_server(args.runs)
+    baseline.calibrate()
+
+    if args.update_baseline:
+        baseline.save("startup", results)
+        print("Baseline updated.")
+    regressions = baseline.compare("startup", results)
+    if regressions and not args.update_baseline:
+        print(f"FAILED: startup regressions in {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
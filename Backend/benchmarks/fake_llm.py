@@ -0,0 +1,76 @@
+import re
+import json
+import asyncio
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Deterministic stand-in for Gemini used by the load test.
+# Each question carries a "[script:<name>]" tag; the model replays that script's ReAct turns,
+# picking the next turn from how many observations are already in the scratchpad. Runs are
+# therefore independent of each other, however many are interleaved.
+
+_SCRIPT_TAG = re.compile(r"\[script:(\w+)\]")
+
+
+def _action(tool, tool_input, thought):
+    blob = json.dumps({"action": tool, "action_input": tool_input}, indent=2)
+    return f"Thought: {thought}\nAction:\n```\n{blob}\n```"
+
+
+SCRIPTS = {
+    "compare": {
+        "question": "Compare India and Sri Lanka",
+        "turns": [
+            _action("request_user_approval", "Use check_scouting_notes to compare India and Sri Lanka.", "I need approval first."),
+            _action("check_scouting_notes", {"name": "India"}, "Look up India."),
+            _action("check_scouting_notes", {"name": "Sri Lanka"}, "Now Sri Lanka."),
+            _action("Final Answer", "India's bowling attack gives them the edge over Sri Lanka.", "I know what to respond."),
+        ],
+    },
+    "live": {
+        "question": "What's the score and who will win?",
+        "turns": [
+            _action("request_user_approval", "Use fetch_live_match_context for the live score.", "I need approval first."),
+            _action("fetch_live_match_context", {"query": ""}, "Get the live scorecard."),
+            _action("calculate_win_probability", {"runs_needed": 42, "balls_remaining": 30, "wickets_in_hand": 6,
+                                                  "target_score": 181, "chasing_team": "Zimbabwe", "defending_team": "India"},
+                    "Estimate the chase."),
+            _action("Final Answer", "Zimbabwe need 42 off 30 with 6 wickets left: India are favourites.", "I know what to respond."),
+        ],
+    },
+    "player": {
+        "question": "What are India Player 1's career stats?",
+        "turns": [
+            _action("request_user_approval", "Use fetch_player_career_stats for India Player 1.", "I need approval first."),
+            _action("fetch_player_career_stats", {"player_id": "sr:player:480100"}, "Fetch the career numbers."),
+            _action("Final Answer", "India Player 1 is a steady top-order batsman.", "I know what to respond."),
+        ],
+    },
+}
+
+
+class ScriptedChatModel(SimpleChatModel):
+    """Replays SCRIPTS turn by turn. `latency` seconds are awaited per call to mimic Gemini."""
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _next_turn(self, messages: List[BaseMessage]) -> str:
+        text = "\n".join(str(m.content) for m in messages)
+        tag = _SCRIPT_TAG.search(text)
+        turns = SCRIPTS[tag.group(1) if tag else "compare"]["turns"]
+        # Only the human message holds the scratchpad; the system prompt's format example is ignored
+        step = str(messages[-1].content).count("Observation")
+        return turns[min(step, len(turns) - 1)]
+
+    def _call(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        return self._next_turn(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._next_turn(messages)))])
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import types
+import time
+import random
+
+# Shared fixtures for the in-process benchmarks.
+# Sportradar responses come from mock_sportradar.MockSportradar without any HTTP: the client's
+# `requests` is swapped for an in-process transport, so only our own parsing code is timed.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Dummy keys so main/tools import without a .env; nothing here reaches Gemini or Sportradar
+os.environ.setdefault("GEMINI_MODEL", "gemini-flash-lite-latest")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SPORTRADAR_API_KEY", "benchmark")
+# Mock calls must not count against (or be throttled by) the real quota ledger
+os.environ.setdefault("QUOTA_LEDGER_PATH", "")
+os.environ.setdefault("SESSION_MEMORY_DIR", "")
+
+import requests
+import sportradar_client
+from mock_sportradar import MockSportradar
+
+
+def install_mock_transport(mock=None, live_matches=4, latency=0.0):
+    """
+    Routes every SportradarClient request to `mock` in-process and disables the rate limiter
+    on the shared client. Matches are frozen (no ball advances) so each run times the same payloads.
+    `latency` (seconds) simulates the upstream round trip; requests run in tool threads, so it blocks like one.
+    """
+    mock = mock or MockSportradar(live_matches=live_matches, ball_interval=1e9)
+
+    def get(url, params=None, timeout=None):
+        if latency:
+            time.sleep(latency)
+        endpoint = "/" + url.split("://", 1)[-1].split("/", 1)[-1]
+        status, payload = mock.respond(endpoint)
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response._content = json.dumps(payload).encode("utf-8")
+        return response
+
+    sportradar_client.requests = types.SimpleNamespace(get=get, exceptions=requests.exceptions)
+    client = sportradar_client.get_default_client()
+    client.base_url = "http://mock"
+    client.min_interval = 0
+    return mock, client
+
+
+def synthetic_knowledge_base(n_players=50000, seed=1):
+    """knowledge.json plus `n_players` generated player reports (the real file has ~35)."""
+    with open(os.path.join(BACKEND_DIR, "knowledge.json"), "r", encoding="utf-8") as f:
+        kb = json.load(f)
+    rng = random.Random(seed)
+    teams = list(kb["teams"])
+    weaknesses = ["Left-arm pace", "Leg-spin", "Short ball", "Inswingers", "Slower balls", "Yorkers"]
+    strengths = ["Cover drive", "Pull shot", "Sweep", "Death bowling", "Powerplay hitting"]
+    players = dict(kb["players"])
+    for i in range(n_players - len(players)):
+        team = rng.choice(teams)
+        players[f"{chr(65 + i % 26)}. Player{i}"] = {
+            "id": f"sr:player:{1000000 + i}",
+            "scouting_report": f"{team} squad member. Struggles against {rng.choice(weaknesses).lower()}.",
+            "weaknesses": rng.sample(weaknesses, 2),
+            "strengths": rng.sample(strengths, 2),
+        }
+    kb["players"] = players
+    return kb
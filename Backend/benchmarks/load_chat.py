@@ -0,0 +1,190 @@
+"""
+Concurrent /chat load test with a scripted fake LLM.
+
+Starts the FastAPI app with uvicorn in this process, replaces Gemini with a deterministic
+chat model that replays scripted ReAct tool-call sequences, serves Sportradar from the mock
+fixtures, and runs N concurrent SSE clients against POST /chat.
+
+Reports p50/p95/p99 time-to-first-event and time-to-answer, events per second across all
+streams, and the server event loop's scheduling lag.
+
+Usage:
+    python benchmarks/load_chat.py --clients 50 --requests 4
+    python benchmarks/load_chat.py --clients 100 --llm-latency 0.5 --max-concurrent 8
+    python benchmarks/load_chat.py --shared-questions      # identical questions (answer cache fan-out)
+    python benchmarks/load_chat.py --update-baseline
+
+Baselines are recorded with the default arguments; compare like with like.
+"""
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import baseline
+import fixtures
+from fake_llm import ScriptedChatModel, SCRIPTS
+
+SECTION = "load_chat"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` on the server loop and records how late each wake-up is."""
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = []
+
+    async def run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - started - self.interval)
+
+
+def start_server(app, port, monitor):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+
+    async def serve():
+        lag_task = asyncio.create_task(monitor.run())
+        try:
+            await server.serve()
+        finally:
+            lag_task.cancel()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + 30
+    while not server.started:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("server did not start")
+        time.sleep(0.02)
+    return server, thread
+
+
+def run_client(base_url, question, user_id):
+    """One /chat request. Returns (time to first event, time to answer or None, event count)."""
+    started = time.perf_counter()
+    first_event = answered = None
+    events = 0
+    with requests.post(f"{base_url}/chat", json={"message": question, "user_id": user_id},
+                       stream=True, timeout=300) as response:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            now = time.perf_counter() - started
+            events += 1
+            if first_event is None:
+                first_event = now
+            if json.loads(line[len("data: "):]).get("type") == "answer":
+                answered = now
+    return first_event, answered, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="concurrent SSE clients")
+    parser.add_argument("--requests", type=int, default=3, help="/chat requests per client, back to back")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    parser.add_argument("--sportradar-latency", type=float, default=0.05, help="seconds per mock Sportradar call")
+    parser.add_argument("--max-concurrent", type=int, help="agent runs admitted at once (default MAX_CONCURRENT_RUNS)")
+    parser.add_argument("--shared-questions", action="store_true", help="every client asks the same questions")
+    parser.add_argument("--agent-mode", choices=["react", "parallel"], default="react")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    fixtures.install_mock_transport(latency=args.sportradar_latency)
+    import main as backend
+    import admission
+    import prefetch
+    prefetch.PREFETCH_ENABLED = False  # keep background Sportradar traffic out of the measurement
+    backend.AGENT_MODE = args.agent_mode
+    backend.agent_executor = backend.build_agent_executor(llm=ScriptedChatModel(latency=args.llm_latency))
+    backend.agent_executor.verbose = False
+    # Measure the streaming loop, not Gemini's quota: the fake model has none
+    admission.gemini_budget.tokens_per_minute = admission.gemini_budget.requests_per_minute = 10 ** 9
+    if args.max_concurrent:
+        admission.chat_queue.max_concurrent = args.max_concurrent
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monitor = LoopLagMonitor()
+    quiet, sys.stdout = sys.stdout, open(fixtures.os.devnull, "w")  # tools/callbacks print per event
+    server, thread = start_server(backend.app, port, monitor)
+    base_url = f"http://127.0.0.1:{port}"
+
+    scripts = sorted(SCRIPTS)
+    jobs = []
+    for client in range(args.clients):
+        for n in range(args.requests):
+            script = scripts[(client + n) % len(scripts)]
+            suffix = "" if args.shared_questions else f" (client {client}, request {n})"
+            question = f"I approve. Proceed with: [script:{script}] {SCRIPTS[script]['question']}{suffix}"
+            jobs.append((client, question))
+
+    def run_user(client):
+        return [run_client(base_url, q, f"load-{client}") for c, q in jobs if c == client]
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = [r for user in pool.map(run_user, range(args.clients)) for r in user]
+    finally:
+        wall = time.perf_counter() - started
+        server.should_exit = True
+        thread.join(timeout=10)
+        sys.stdout.close()
+        sys.stdout = quiet
+
+    first_events = [r[0] for r in results if r[0] is not None]
+    answers = [r[1] for r in results if r[1] is not None]
+    total_events = sum(r[2] for r in results)
+    lag = monitor.samples
+
+    print(f"{len(results)} /chat requests from {args.clients} clients in {wall:.2f}s "
+          f"({len(answers)} answered, agent_mode={args.agent_mode}, max_concurrent={admission.chat_queue.max_concurrent})")
+    print(f"{'metric':<28} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, samples in (("time_to_first_event_s", first_events), ("time_to_answer_s", answers), ("loop_lag_ms", [x * 1000 for x in lag])):
+        print(f"{name:<28} {percentile(samples, 50):>9.3f} {percentile(samples, 95):>9.3f} "
+              f"{percentile(samples, 99):>9.3f} {max(samples, default=float('nan')):>9.3f}")
+    print(f"events_per_s                 {total_events / wall:.1f} ({total_events} events)")
+    print()
+
+    if len(answers) < len(results):
+        print(f"FAILED: {len(results) - len(answers)} requests ended without an answer")
+        sys.exit(1)
+
+    summary = {
+        "time_to_first_event_p95_s": percentile(first_events, 95),
+        "time_to_answer_p95_s": percentile(answers, 95),
+        "loop_lag_p99_ms": percentile(lag, 99) * 1000,
+        # Lower is better for every baseline entry, so throughput is stored as seconds per event
+        "seconds_per_event": wall / total_events,
+    }
+    if args.update_baseline:
+        # Mostly scripted waits, not CPU: compared raw, without calibration scaling
+        baseline.save(SECTION, summary, calibrated=False)
+        print("Baseline updated.")
+    regressions = baseline.compare(SECTION, summary)
+    if regressions and not args.update_baseline:
+        print(f"FAILED: /chat load regressions in {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
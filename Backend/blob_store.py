@@ -0,0 +1,102 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+import metrics
+from shared_store import shared_store
+
+# Content-addressed store for large tool observations.
+# on_tool_end used to put the full tool output into the SSE stream: the same live-context JSON
+# went to every user on every turn and was kept again in each browser's chat history. Outputs
+# longer than OBSERVATION_INLINE_CHARS are stored here once, under the hash of their bytes, and
+# the observation event carries {"blob": hash, "size": bytes, "content": preview}. Clients fetch
+# GET /api/blobs/{hash} when they need the full text; a hash names immutable content, so the
+# response is cacheable forever. The store is an LRU bounded by total bytes (BLOB_STORE_MAX_MB).
+# With SHARED_STORE_PATH set, blobs are also written to the shared store so any worker can serve them.
+
+OBSERVATION_INLINE_CHARS = int(os.getenv("OBSERVATION_INLINE_CHARS", "1024"))
+BLOB_PREVIEW_CHARS = 200
+BLOB_STORE_MAX_MB = float(os.getenv("BLOB_STORE_MAX_MB", "64"))
+
+_DIGEST = re.compile(r"[0-9a-f]{32}")
+
+
+def blob_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def is_digest(value):
+    return bool(value) and _DIGEST.fullmatch(value) is not None
+
+
+class BlobStore:
+    def __init__(self, max_bytes=int(BLOB_STORE_MAX_MB * 1024 * 1024), shared=shared_store):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._blobs = OrderedDict()  # digest -> bytes, least recently used first
+        self._bytes = 0
+
+    def put(self, data):
+        """Stores `data` (bytes) once. Returns (digest, True if it was not held yet)."""
+        digest = blob_digest(data)
+        with self._lock:
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+                metrics.BLOB_STORE_PUTS.inc(result="dedup")
+                return digest, False
+            self._blobs[digest] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._blobs) > 1:
+                _, evicted = self._blobs.popitem(last=False)
+                self._bytes -= len(evicted)
+            metrics.BLOB_STORE_BYTES.set(self._bytes)
+        metrics.BLOB_STORE_PUTS.inc(result="stored")
+        if self.shared is not None:
+            self.shared.put_blob(digest, data)
+        return digest, True
+
+    def get(self, digest):
+        """The bytes stored under `digest`, or None."""
+        with self._lock:
+            data = self._blobs.get(digest)
+            if data is not None:
+                self._blobs.move_to_end(digest)
+                return data
+        if self.shared is not None:
+            return self.shared.get_blob(digest)
+        return None
+
+    def text(self, digest, default=None):
+        data = self.get(digest)
+        return data.decode("utf-8") if data is not None else default
+
+    def observation(self, output):
+        """
+        Fields of an observation event for tool `output`: the text itself when it is short,
+        otherwise a reference to the stored blob plus a preview.
+        """
+        output = str(output)
+        if len(output) <= OBSERVATION_INLINE_CHARS:
+            return {"content": output}
+        data = output.encode("utf-8")
+        digest, _ = self.put(data)
+        return {"content": output[:BLOB_PREVIEW_CHARS].rstrip() + "...", "blob": digest, "size": len(data)}
+
+    def clear(self):
+        with self._lock:
+            self._blobs.clear()
+            self._bytes = 0
+            metrics.BLOB_STORE_BYTES.set(0)
+
+
+def observation_text(event):
+    """Full tool output of an observation event, resolving a blob reference (preview if it was evicted)."""
+    digest = event.get("blob")
+    if digest:
+        return blob_store.text(digest, default=event.get("content", ""))
+    return event.get("content", "")
+
+
+blob_store = BlobStore()
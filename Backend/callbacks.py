@@ -1,15 +1,34 @@
 import json
+import time
 import asyncio
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_core.outputs import LLMResult
+import log
+import metrics
+from tracing import Trace
+from admission import TokenBudget, estimate_tokens
+from blob_store import blob_store, OBSERVATION_INLINE_CHARS
+
+logger = log.get_logger("agent")
 
 class AgentCallbackHandler(AsyncCallbackHandler):
     """Callback handler for streaming LangChain agent events to a queue."""
 
-    def __init__(self, queue: asyncio.Queue):
+    def __init__(self, queue: asyncio.Queue, trace: Optional[Trace] = None, budget: Optional[TokenBudget] = None):
         self.queue = queue
+        self.trace = trace
+        self.budget = budget
+        # Tokens consumed by every LLM call of this run (reported, or estimated)
+        self.tokens_used = 0
+        # run_id -> (budget reservation, estimated prompt tokens)
+        self._llm_reservations: Dict[UUID, Any] = {}
+        # run_id -> (tool name, start time, span) for tool latency metrics and tracing
+        self._tool_starts: Dict[UUID, Any] = {}
+        # run_id -> span for in-flight LLM calls
+        self._llm_spans: Dict[UUID, Any] = {}
+        self._last_action_log: Optional[str] = None
 
     async def on_llm_start(
         self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
@@ -23,7 +42,45 @@ class AgentCallbackHandler(AsyncCallbackHandler):
         self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any
     ) -> None:
         """Run when Chat Model starts running."""
-        pass
+        run_id = kwargs.get("run_id")
+        prompt_tokens = estimate_tokens("".join(str(m.content) for batch in messages for m in batch))
+        if self.budget:
+            # Awaited before the request goes out, so a drained TPM/RPM budget
+            # delays this call instead of letting Gemini answer with a 429.
+            reservation = await self.budget.acquire(prompt_tokens)
+            self._llm_reservations[run_id] = (reservation, prompt_tokens)
+        if self.trace:
+            model = (serialized.get("kwargs") or {}).get("model") or serialized.get("name") or "llm"
+            self._llm_spans[run_id] = self.trace.start_span("llm", "llm", model=model, prompt_tokens_est=prompt_tokens)
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Run when LLM ends running."""
+        run_id = kwargs.get("run_id")
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        reservation, prompt_tokens = self._llm_reservations.pop(run_id, (None, 0))
+        total_tokens = usage.get("total_tokens")
+        if not total_tokens:
+            completion = "".join(g.text for gens in response.generations for g in gens)
+            total_tokens = prompt_tokens + estimate_tokens(completion)
+        self.tokens_used += total_tokens
+        if self.budget:
+            self.budget.reconcile(reservation, total_tokens)
+        span = self._llm_spans.pop(run_id, None)
+        if span:
+            span.end(total_tokens=total_tokens, **usage)
+
+    async def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        """Run when LLM errors."""
+        run_id = kwargs.get("run_id")
+        reservation, prompt_tokens = self._llm_reservations.pop(run_id, (None, 0))
+        if self.budget:
+            self.budget.reconcile(reservation, prompt_tokens)
+            if "429" in str(error) or "ResourceExhausted" in type(error).__name__:
+                # Upstream quota is drained; hold new admissions until it refills
+                self.budget.backoff(30)
+        span = self._llm_spans.pop(run_id, None)
+        if span:
+            span.end(error=type(error).__name__)
 
     async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         """Run on new LLM token. Only available with streaming=True on LLM."""
@@ -36,7 +93,9 @@ class AgentCallbackHandler(AsyncCallbackHandler):
         self, serialized: Dict[str, Any], input_str: str, **kwargs: Any
     ) -> None:
         """Run when tool starts running."""
-        print(f"[Callback] Tool Start: {serialized.get('name')}")
+        logger.debug("tool.start", "Tool start: %s", serialized.get('name'))
+        span = self.trace.start_span(serialized.get('name') or "tool", "tool") if self.trace else None
+        self._tool_starts[kwargs.get("run_id")] = (serialized.get('name'), time.perf_counter(), span)
         await self.queue.put(json.dumps({
             "type": "action",
             "content": f"Accessing tool: {serialized.get('name')}",
@@ -45,17 +104,41 @@ class AgentCallbackHandler(AsyncCallbackHandler):
 
     async def on_tool_end(self, output: str, **kwargs: Any) -> None:
         """Run when tool ends running."""
-        print(f"[Callback] Tool End: {output[:50]}...")
-        # Do not truncate output as it might be JSON data for the frontend
-        # display_output = output[:200] + "..." if len(output) > 200 else output
+        started = self._tool_starts.get(kwargs.get("run_id"))
+        tool_name = started[0] if started else None
+        logger.debug("tool.end", "Tool end: %s", tool_name, output_chars=len(output))
+        self._observe_tool(kwargs.get("run_id"))
+        # Large outputs go to the blob store once; the event carries their hash and a preview
+        # and the frontend fetches the full JSON from /api/blobs/{hash} when it needs it
+        if blob_store.shared is not None and len(output) > OBSERVATION_INLINE_CHARS:
+            fields = await asyncio.to_thread(blob_store.observation, output)  # may write SQLite
+        else:
+            fields = blob_store.observation(output)
         await self.queue.put(json.dumps({
             "type": "observation",
-            "content": output  # Send full output
+            **fields,
+            "tool": tool_name
         }))
 
+    async def on_tool_error(self, error: BaseException, **kwargs: Any) -> None:
+        """Run when tool errors (including the approval gate)."""
+        self._observe_tool(kwargs.get("run_id"), error=type(error).__name__)
+
+    def _observe_tool(self, run_id: Optional[UUID], **attributes: Any) -> None:
+        started = self._tool_starts.pop(run_id, None)
+        if started:
+            name, start_time, span = started
+            metrics.TOOL_LATENCY.observe(time.perf_counter() - start_time, tool=name or "unknown")
+            if span:
+                span.end(**attributes)
+
     async def on_agent_action(self, action: Any, **kwargs: Any) -> None:
         """Run on agent action."""
-        print(f"[Callback] Agent Action: {action.log[:50]}...")
+        # A batch of parallel tool calls shares one log: show the thought once
+        if action.log == self._last_action_log:
+            return
+        self._last_action_log = action.log
+        logger.debug("agent.action", "Agent action: %s", action.log[:50])
         await self.queue.put(json.dumps({
             "type": "thought",
             "content": f"Thinking: {action.log}"
@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+from collections import deque
+import metrics
+
+# Per-endpoint circuit breakers and adaptive timeouts for Sportradar.
+# Every request used to wait up to the client's fixed 10s timeout, so a slow or failing
+# upstream put 10s stalls into every /chat tool call and /api/match-list page, one per
+# endpoint called. Each endpoint (metrics.endpoint_label: one per kind, not per match) keeps:
+#   - its recent successful latencies; the timeout is TIMEOUT_FACTOR x their 95th percentile,
+#     between SPORTRADAR_TIMEOUT_MIN and the client's timeout. Until an endpoint has MIN_SAMPLES
+#     of its own, the latencies of all endpoints are used (the ceiling until those are enough);
+#   - a breaker: SPORTRADAR_BREAKER_FAILURES consecutive failures (timeouts, connection errors,
+#     5xx) open it and requests fail at once, without a rate-limiter slot or quota. After
+#     SPORTRADAR_BREAKER_COOLDOWN seconds one probe is let through with the ceiling timeout;
+#     its success closes the breaker, its failure opens it for another cooldown. A probe that
+#     succeeds slowly adds its latency, so an upstream that got slower raises the timeout.
+# 4xx responses (404, 429) are answers, not outages: they count as successes.
+# State is per process; each worker finds out about an outage on its own.
+
+SPORTRADAR_BREAKER_FAILURES = int(os.getenv("SPORTRADAR_BREAKER_FAILURES", "3"))
+SPORTRADAR_BREAKER_COOLDOWN = float(os.getenv("SPORTRADAR_BREAKER_COOLDOWN", "30"))
+SPORTRADAR_TIMEOUT_MIN = float(os.getenv("SPORTRADAR_TIMEOUT_MIN", "2"))
+TIMEOUT_PERCENTILE = 0.95
+TIMEOUT_FACTOR = 3.0
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 10
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class LatencyWindow:
+    """Recent latencies and the timeout derived from them (None until there are MIN_SAMPLES)."""
+
+    def __init__(self, ceiling, floor=SPORTRADAR_TIMEOUT_MIN):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.timeout = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            if len(self._latencies) < MIN_SAMPLES:
+                return
+            ordered = sorted(self._latencies)
+        p = ordered[min(len(ordered) - 1, int(len(ordered) * TIMEOUT_PERCENTILE))]
+        self.timeout = min(self.ceiling, max(self.floor, p * TIMEOUT_FACTOR))
+
+
+class EndpointBreaker:
+    def __init__(self, label, ceiling, host_window, failures=SPORTRADAR_BREAKER_FAILURES,
+                 cooldown=SPORTRADAR_BREAKER_COOLDOWN):
+        self.label = label
+        self.ceiling = ceiling
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._window = LatencyWindow(ceiling)
+        self._host_window = host_window
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started = None  # monotonic time of the half-open probe in flight
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def timeout(self):
+        return self._window.timeout or self._host_window.timeout or self.ceiling
+
+    def acquire(self):
+        """Timeout (seconds) for a request to this endpoint, or None when the breaker rejects it."""
+        with self._lock:
+            if self._state == CLOSED:
+                return self.timeout
+            now = time.monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < self.cooldown:
+                    return None
+                self._set_state(HALF_OPEN)
+            # Half open: one probe at a time (a probe that never reported back is replaced)
+            if self._probe_started is not None and now - self._probe_started < self.ceiling * 2:
+                return None
+            self._probe_started = now
+            return self.ceiling
+
+    def success(self, latency=None):
+        """The endpoint answered (`latency` seconds; None when no request timing applies)."""
+        if latency is not None:
+            self._window.add(latency)
+            self._host_window.add(latency)
+            metrics.SPORTRADAR_TIMEOUT.set(round(self.timeout, 3), endpoint=self.label)
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_started = None
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def failure(self):
+        """The request timed out, could not connect or got a 5xx."""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failures:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state):
+        self._state = state
+        metrics.SPORTRADAR_CIRCUIT_STATE.set(_STATE_VALUES[state], endpoint=self.label)
+
+
+class CircuitBreakers:
+    """EndpointBreaker by endpoint label, created on first use."""
+
+    def __init__(self, ceiling):
+        self.ceiling = ceiling
+        self.host_window = LatencyWindow(ceiling)  # every endpoint's latencies
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, label):
+        breaker = self._breakers.get(label)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(label, EndpointBreaker(label, self.ceiling, self.host_window))
+        return breaker
+
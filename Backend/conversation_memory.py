@@ -0,0 +1,221 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import log
+from admission import estimate_tokens
+
+# Per-session conversation memory with a hard token budget.
+# Sending the whole history with every question drained the Gemini token quota, so memory used
+# to be off and every follow-up re-fetched its context from scratch. Here each session keeps:
+#   - recent turns verbatim (question, tool observations, answer), observations compacted to
+#     MEMORY_OBSERVATION_TOKENS when they are recorded;
+#   - a summary of older turns: when the budget is exceeded the oldest turn is folded into one
+#     short line, once. Summary lines are never re-summarized; the oldest are dropped instead.
+# Every item's token estimate is stored with it, so enforcing the budget never re-counts the
+# history. Sessions are persisted as one JSON file each under SESSION_MEMORY_DIR.
+
+logger = log.get_logger("memory")
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))
+MEMORY_OBSERVATION_TOKENS = int(os.getenv("MEMORY_OBSERVATION_TOKENS", "300"))
+# Empty = in memory only
+SESSION_MEMORY_DIR = os.getenv("SESSION_MEMORY_DIR", os.path.join(os.path.dirname(__file__), "sessions"))
+MEMORY_SESSIONS_KEPT = 256  # sessions held in memory; older ones are reloaded from disk on demand
+SUMMARY_QUESTION_CHARS = 160
+SUMMARY_ANSWER_CHARS = 320
+SUMMARY_MIN_SENTENCE_CHARS = 40  # "Yes." alone is not a conclusion
+
+# Observations that carry no facts worth remembering
+_SKIPPED_TOOLS = ("request_user_approval",)
+
+
+def _clip(text, chars):
+    text = " ".join(str(text).split())
+    return text if len(text) <= chars else text[:chars - 3].rstrip() + "..."
+
+
+def compact_observation(content, max_tokens=MEMORY_OBSERVATION_TOKENS):
+    """A tool observation cut to about max_tokens. JSON keeps its scalar top-level fields first."""
+    text = str(content).strip()
+    max_chars = max_tokens * 4  # estimate_tokens' ratio
+    if len(text) <= max_chars:
+        return text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        # Scalars (scores, rates, ids) are the facts; nested lists are mostly detail
+        scalars = {k: v for k, v in data.items() if not isinstance(v, (dict, list))}
+        text = json.dumps(scalars, separators=(",", ":"))
+        if len(text) > max_chars:
+            return text[:max_chars - 3] + "..."
+        return text
+    return text[:max_chars - 3].rstrip() + "..."
+
+
+def summarize_turn(turn):
+    """One line standing for a whole turn once it leaves the verbatim window."""
+    answer = turn["answer"]
+    # The first sentences of an answer are its conclusion
+    cuts = [c for c in (answer.find(". ", SUMMARY_MIN_SENTENCE_CHARS), answer.find(".\n", SUMMARY_MIN_SENTENCE_CHARS))
+            if 0 < c < SUMMARY_ANSWER_CHARS]
+    if cuts:
+        answer = answer[:min(cuts) + 1]
+    line = f"Q: {_clip(turn['question'], SUMMARY_QUESTION_CHARS)} -> A: {_clip(answer, SUMMARY_ANSWER_CHARS)}"
+    tools = sorted({o["tool"] for o in turn["observations"]})
+    if tools:
+        line += f" (tools: {', '.join(tools)})"
+    return line
+
+
+class SessionMemory:
+    def __init__(self, session_id, summary=None, turns=None):
+        self.session_id = session_id
+        self.summary = summary or []  # [{"text", "tokens"}], oldest first
+        self.turns = turns or []  # [{"question", "answer", "observations": [{"tool", "content"}], "tokens"}]
+        self._context = None  # rendered context, rebuilt only after a change
+
+    @property
+    def tokens(self):
+        return sum(s["tokens"] for s in self.summary) + sum(t["tokens"] for t in self.turns)
+
+    def add_turn(self, question, answer, observations, budget):
+        observations = [{"tool": tool or "tool", "content": compact_observation(content)}
+                        for tool, content in observations if tool not in _SKIPPED_TOOLS]
+        turn = {"question": question, "answer": answer, "observations": observations}
+        turn["tokens"] = estimate_tokens(self._render_turn(turn))
+        self.turns.append(turn)
+        self._fit(budget)
+        self._context = None
+
+    def _fit(self, budget):
+        total = self.tokens
+        # Oldest verbatim turns become summary lines (once each), keeping the latest turn verbatim
+        while total > budget and len(self.turns) > 1:
+            turn = self.turns.pop(0)
+            text = summarize_turn(turn)
+            line = {"text": text, "tokens": estimate_tokens(text)}
+            self.summary.append(line)
+            total += line["tokens"] - turn["tokens"]
+        # Then the oldest summary lines go
+        while total > budget and self.summary:
+            total -= self.summary.pop(0)["tokens"]
+        # A single turn over budget: its observations first, then the answer is clipped
+        if total > budget and self.turns:
+            turn = self.turns[-1]
+            turn["observations"] = []
+            turn["answer"] = _clip(turn["answer"], max(budget * 4 - len(turn["question"]) - 64, 200))
+            turn["tokens"] = estimate_tokens(self._render_turn(turn))
+
+    @staticmethod
+    def _render_turn(turn):
+        lines = [f"User: {turn['question']}"]
+        for o in turn["observations"]:
+            lines.append(f"[{o['tool']} returned] {o['content']}")
+        lines.append(f"Assistant: {turn['answer']}")
+        return "\n".join(lines)
+
+    def context(self):
+        """Text put before the next question ("" for a new session)."""
+        if self._context is None:
+            if not self.summary and not self.turns:
+                self._context = ""
+            else:
+                parts = ["Conversation so far (reuse these facts instead of calling tools again when they "
+                         "answer the question; call tools for anything newer or missing):"]
+                if self.summary:
+                    parts.append("Earlier:\n" + "\n".join(f"- {s['text']}" for s in self.summary))
+                if self.turns:
+                    parts.append("Recent:\n" + "\n\n".join(self._render_turn(t) for t in self.turns))
+                self._context = "\n\n".join(parts)
+        return self._context
+
+    def to_dict(self):
+        return {"sessionId": self.session_id, "summary": self.summary, "turns": self.turns}
+
+
+class ConversationMemory:
+    def __init__(self, directory=SESSION_MEMORY_DIR, budget=MEMORY_TOKEN_BUDGET, sessions_kept=MEMORY_SESSIONS_KEPT):
+        self.directory = directory or None
+        self.budget = budget
+        self.sessions_kept = sessions_kept
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # session id -> SessionMemory
+
+    def _path(self, session_id):
+        # Hashed so any client-supplied id is a safe file name
+        name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _load(self, session_id):
+        if self.directory:
+            try:
+                with open(self._path(session_id), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return SessionMemory(session_id, data.get("summary"), data.get("turns"))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning("memory.load_failed", "Error loading session memory: %s", e)
+        return SessionMemory(session_id)
+
+    def _session(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = self._load(session_id)
+                while len(self._sessions) > self.sessions_kept:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def context(self, session_id):
+        if not session_id:
+            return ""
+        session = self._session(session_id)
+        with self._lock:
+            return session.context()
+
+    def record(self, session_id, question, answer, observations=()):
+        """Adds a finished turn. `observations` are (tool name, output) pairs from the run."""
+        if not session_id or not answer:
+            return
+        session = self._session(session_id)
+        with self._lock:
+            session.add_turn(question, answer, list(observations), self.budget)
+            data = session.to_dict()
+        self._save(session_id, data)
+
+    def _save(self, session_id, data):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(session_id)
+            # Write then rename, so a crash mid-write never leaves a truncated session
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("memory.save_failed", "Error saving session memory: %s", e)
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.directory:
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                pass
+
+
+def with_context(context, message):
+    """The agent input for `message` given a session's memory context."""
+    return f"{context}\n\nCurrent question: {message}" if context else message
+
+
+memory = ConversationMemory()
@@ -0,0 +1,68 @@
+import json
+import hashlib
+import threading
+import contextvars
+from collections import OrderedDict
+
+# Versions of the upstream data the agent reads.
+# Every payload the Sportradar client hands out is observed here under a resource key
+# (e.g. "get_match_summary:sr:match:123"). The version only moves when the payload content
+# changes, so anything derived from it (cached answers) can tell whether it is still current.
+# A version is derived from the content digest, not counted, so every worker gives the same
+# content the same version: clients hold versions as refresh cursors (match_deltas.py) and
+# their next request may reach another worker. 0 means "not seen".
+# Only the versions are kept, for the DATA_VERSIONS_KEPT most recently observed resources; the
+# client's cache keeps each cached payload's version with the payload, so hits are not re-hashed.
+
+DATA_VERSIONS_KEPT = 4096
+
+# Fields that change on every fetch without the match state changing
+_VOLATILE_KEYS = ("generated_at",)
+
+# Set by a caller that wants to know which resources (and versions) a run read.
+current_dependencies = contextvars.ContextVar("current_dependencies", default=None)
+
+
+def version_of(payload):
+    """Content version of a payload (hashes all of it: callers that can, memoize it)."""
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k not in _VOLATILE_KEYS}
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=8).digest()
+    # 52 bits: an exact integer in the browser's JSON numbers; never 0
+    return (int.from_bytes(digest, "big") >> 12) or 1
+
+
+class DataVersions:
+    def __init__(self, maxsize=DATA_VERSIONS_KEPT):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._versions = OrderedDict()  # resource -> version, least recently observed first
+
+    def observe(self, resource, payload, version=None):
+        """
+        Records a payload for `resource` and returns its (possibly bumped) version.
+        `version` is version_of(payload) when the caller already has it.
+        """
+        if payload is None:
+            # Failed fetches say nothing new about the match state
+            version = self.current(resource)
+        else:
+            if version is None:
+                version = version_of(payload)  # outside the lock: it serializes the whole payload
+            with self._lock:
+                self._versions[resource] = version
+                self._versions.move_to_end(resource)
+                while len(self._versions) > self.maxsize:
+                    self._versions.popitem(last=False)
+        deps = current_dependencies.get()
+        if deps is not None:
+            deps[resource] = version
+        return version
+
+    def current(self, resource):
+        with self._lock:
+            return self._versions.get(resource, 0)
+
+
+data_versions = DataVersions()
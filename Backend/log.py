@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import uuid
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+import contextvars
+
+# Structured, leveled logging off the request path.
+# Records are handed to a queue and written to stdout by a background listener thread, so a
+# Sportradar call or tool callback never waits on console I/O (on the event loop or in a
+# tool thread). Every record carries an event name, key=value fields and the id of the HTTP
+# request it belongs to. Disabled levels return after one isEnabledFor check, and
+# high-volume events can be sampled (LOG_SAMPLE_RATES).
+
+# LOG_LEVEL (default INFO) and LOG_FORMAT ("text" or "json", one object per line) are read by configure()
+# event=rate pairs, e.g. "sportradar.request=0.1,tool.end=0.5"; unlisted events are always kept
+DEFAULT_SAMPLE_RATES = {"sportradar.rate_limit_wait": 0.1}
+
+# Id of the HTTP request being served; set by RequestIdMiddleware, copied into tasks and tool threads
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def _sample_rates():
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for pair in os.getenv("LOG_SAMPLE_RATES", "").split(","):
+        name, _, rate = pair.partition("=")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+_SAMPLE_RATES = _sample_rates()
+
+
+class _RequestQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # The base class formats the message here, in the caller's thread; the listener does it instead
+        return record
+
+
+class _RequestIdFilter(logging.Filter):
+    # Runs in the caller's thread, where the request's context is visible
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name}"
+        if record.request_id:
+            line += f" [{record.request_id}]"
+        line += f" {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "msg": record.getMessage(),
+            "requestId": record.request_id,
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class Logger:
+    """
+    log.debug("sportradar.request", "Requesting: %s", endpoint, endpoint=endpoint)
+    The message is %-formatted by the listener thread, only if the record is kept.
+    """
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def _log(self, level, event, msg, args, fields, exc_info=None):
+        logger = self._logger
+        if not logger.isEnabledFor(level):
+            return
+        rate = _SAMPLE_RATES.get(event)
+        if rate is not None and random.random() >= rate:
+            return
+        logger.log(level, msg or event, *args, exc_info=exc_info, stacklevel=3,
+                   extra={"event": event, "fields": fields})
+
+    def debug(self, event, msg="", *args, **fields):
+        self._log(logging.DEBUG, event, msg, args, fields)
+
+    def info(self, event, msg="", *args, **fields):
+        self._log(logging.INFO, event, msg, args, fields)
+
+    def warning(self, event, msg="", *args, **fields):
+        self._log(logging.WARNING, event, msg, args, fields)
+
+    def error(self, event, msg="", *args, exc_info=None, **fields):
+        self._log(logging.ERROR, event, msg, args, fields, exc_info=exc_info)
+
+    def enabled(self, level=logging.DEBUG):
+        """For call sites that would do work just to build a log line."""
+        return self._logger.isEnabledFor(level)
+
+
+_listener = None
+_handler = None
+
+
+def configure(level=None, fmt=None, stream=None):
+    """
+    Routes the "statsscout" loggers through a queue to a background writer. Safe to call
+    again (e.g. once .env is loaded) to apply LOG_LEVEL / LOG_FORMAT.
+    """
+    global _listener, _handler
+    root = logging.getLogger("statsscout")
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    fmt = fmt or os.getenv("LOG_FORMAT", "text")
+    formatter = JsonFormatter() if fmt == "json" else TextFormatter()
+    if _listener is not None:
+        _handler.setFormatter(formatter)
+        return
+    _handler = handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(formatter)
+    records = queue.SimpleQueue()
+    queue_handler = _RequestQueueHandler(records)
+    queue_handler.addFilter(_RequestIdFilter())
+    root.addHandler(queue_handler)
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=False)
+    _listener.start()
+    # Flush what is still queued on exit
+    atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    if _listener is None:
+        configure()
+    return Logger(logging.getLogger(f"statsscout.{name}"))
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware: takes X-Request-ID from the request (or makes one), exposes it to log
+    records through `request_id` and echoes it in the response headers.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rid = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                rid = value.decode("latin-1")[:64]
+                break
+        rid = rid or uuid.uuid4().hex[:12]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        token = request_id.set(rid)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
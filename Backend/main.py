@@ -1,37 +1,57 @@
 import sys
-import io
 
-# Fix Windows charmap error when printing emojis
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Fix Windows charmap error when printing emojis.
+# reconfigure() keeps the existing stream (no extra wrapper, works under test runners).
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding='utf-8')
 
 import os
-import uvicorn
 import asyncio
 import json
-import logging
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import AgentType, initialize_agent
-from tools import (
-    fetch_live_match_context, 
-    check_scouting_notes,
-    fetch_player_profile,
-    calculate_win_probability,
-    fetch_player_career_stats,
-    analyze_match_matchup,
-    request_user_approval,
-    client
-)
-from callbacks import AgentCallbackHandler
 
+# Before any project import: the modules below read their settings from the environment
+# when they are imported, and tools.py (which used to load .env first) is now imported lazily
 load_dotenv()
 
+# LangChain, the Gemini client, the tools and knowledge.json are heavy; they are
+# loaded lazily by get_agent_executor() (in the background at startup) so the app
+# can accept traffic, serve /health and the match list before the agent is ready.
+from sportradar_client import get_default_client, speculated_payloads, stale_reads
+import log
+import metrics
+import tracing
+import admission
+import match_deltas
+import prefetch
+from quota_ledger import ledger as quota_ledger
+from timeline_store import timeline_store, progression as timeline_progression
+from data_versions import data_versions, current_dependencies
+from answer_cache import answer_cache, make_key as answer_key
+from conversation_memory import memory as conversation_memory, with_context
+from blob_store import blob_store, is_digest, observation_text
+from agent_runs import paused_runs, resume_from
+from speculation import speculations
+from shared_store import shared_store
+
+log.configure()  # LOG_LEVEL / LOG_FORMAT may come from .env
+
+logger = log.get_logger("main")
+
+client = get_default_client()
+if client:
+    # Cached answers re-check their live data first (slower while the quota ledger slows live polls)
+    answer_cache.refresher = lambda resources, max_age: client.refresh_resources(
+        resources, max_age * quota_ledger.live_poll_factor())
+
 class ApprovalRequiredException(Exception):
     def __init__(self, action_description):
         self.action_description = action_description
@@ -48,34 +68,17 @@ class ApprovalRequiredException(Exception):
 # Strictly using model from .env
 MODEL_NAME = os.getenv("GEMINI_MODEL")
 if not MODEL_NAME:
-    print("CRITICAL: GEMINI_MODEL not found in .env")
+    logger.error("config.missing", "GEMINI_MODEL not found in .env")
 API_KEY = os.getenv("GEMINI_API_KEY")
 
 if not API_KEY:
-    print("CRITICAL: GEMINI_API_KEY not found in .env")
-
-# Initialize the LLM directly
-# Streaming required for token-level updates, but we engage mainly with tool events
-llm = ChatGoogleGenerativeAI(
-    model=MODEL_NAME,
-    google_api_key=API_KEY,
-    temperature=0.2, # Lowered for more reliable tool calling
-    streaming=True,
-    convert_system_message_to_human=True,
-    max_retries=3,
-    timeout=30.0
-)
+    logger.error("config.missing", "GEMINI_API_KEY not found in .env")
 
-# Tools
-tools = [
-    fetch_live_match_context, 
-    check_scouting_notes,
-    fetch_player_profile,
-    calculate_win_probability,
-    fetch_player_career_stats,
-    analyze_match_matchup,
-    request_user_approval
-]
+# "react": one tool per Gemini turn (structured chat ReAct agent).
+# "parallel": the model may batch independent tool calls into one turn; they run concurrently.
+AGENT_MODE = os.getenv("AGENT_MODE", "react").lower()
+# LangChain's verbose output is synchronous console I/O on every step; off unless debugging
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "false").lower() == "true"
 
 # Agent Setup
 SYSTEM_PROMPT = """
@@ -84,7 +87,9 @@ You are the Master Orchestrator. When the user asks a question, you must intelli
 Follow this routing guide:
 - **"Who is playing?" / "What's the score?"**: Route to `fetch_live_match_context`.
 - **"Compare X and Y" / "Who will win?"**: Route to `analyze_match_matchup` or `calculate_win_probability`. If mathematical probability is not possible, YOU MUST use the returned qualitative scouting data to make a DECISIVE and definitive prediction on who will win.
-- **"What are [Player]'s stats?"**: Route to `fetch_player_career_stats`.
+- **"What are [Player]'s stats?"** or **"Is [Player] in form?"**: Route to `fetch_player_career_stats`.
+- **"Compare these players / both XIs"**: Route to `compare_squads` (one call for all players).
+- **"How did the last few overs go?" / "Where were they at 15 overs?"**: Route to `fetch_match_progression`.
 - **"What are the weaknesses of [Team/Player]?"**: Route to `check_scouting_notes`.
 
 **STRICT EXECUTION WORKFLOW:**
@@ -101,28 +106,137 @@ Follow this routing guide:
 You have access to the following tools:
 - fetch_live_match_context: Get current match scorecard and players. REQUIRES APPROVAL.
 - check_scouting_notes: Search for scouting reports on specific players/venues. REQUIRES APPROVAL.
-- fetch_player_career_stats: Get historical career stats (Runs, Wickets, Avg). REQUIRES APPROVAL.
+- fetch_player_career_stats: Get historical career stats (Runs, Wickets, Avg) and recent form (last innings average, SR, boundary %, economy). REQUIRES APPROVAL.
 - calculate_win_probability: Calculate win %. REQUIRES APPROVAL.
 - analyze_match_matchup: Fetch full team rosters. REQUIRES APPROVAL.
+- compare_squads: Career batting/bowling totals for many players (or both XIs) in one table. REQUIRES APPROVAL.
+- fetch_match_progression: Score at a given over, recent run rate and runs per over from the ball-by-ball timeline. REQUIRES APPROVAL.
 - request_user_approval: THE ONLY TOOL YOU CAN CALL FREELY. YOU MUST CALL THIS FIRST TO GET PERMISSION TO CALL ANY OF THE OTHER TOOLS.
 
 Always explain your reasoning step-by-step.
 """
 
-# Memory disabled per user request to avoid 429 Token Quota Exhaustion
-
-agent_executor = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    agent_kwargs={
-        "system_message": SystemMessage(content=SYSTEM_PROMPT)
-    }
-)
+# Conversation memory is per session and token-bounded (conversation_memory.py); it is put in
+# front of the question rather than held by the agent, so the agent stays shared across sessions.
+
+agent_executor = None
+_agent_lock = threading.Lock()
+
+def build_agent_executor(llm=None):
+    """
+    Imports LangChain/Gemini and the tools (which load knowledge.json) and builds the agent.
+    `llm` replaces the Gemini model (the load-test harness passes a scripted fake).
+    """
+    from langchain_core.messages import SystemMessage
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain.agents import AgentType, initialize_agent
+    from resumable_executor import ResumableAgentExecutor
+    from tools import (
+        fetch_live_match_context, 
+        check_scouting_notes,
+        fetch_player_profile,
+        calculate_win_probability,
+        fetch_player_career_stats,
+        analyze_match_matchup,
+        compare_squads,
+        fetch_match_progression,
+        request_user_approval
+    )
 
-app = FastAPI(title="StatsScout Agent Backend")
+    # Initialize the LLM directly
+    # Streaming required for token-level updates, but we engage mainly with tool events
+    if llm is None:
+        llm = ChatGoogleGenerativeAI(
+            model=MODEL_NAME,
+            google_api_key=API_KEY,
+            temperature=0.2, # Lowered for more reliable tool calling
+            streaming=True,
+            convert_system_message_to_human=True,
+            max_retries=3,
+            timeout=30.0
+        )
+
+    # Tools
+    tools = [
+        fetch_live_match_context, 
+        check_scouting_notes,
+        fetch_player_profile,
+        calculate_win_probability,
+        fetch_player_career_stats,
+        analyze_match_matchup,
+        compare_squads,
+        fetch_match_progression,
+        request_user_approval
+    ]
+
+    if AGENT_MODE == "parallel":
+        from parallel_agent import create_parallel_agent_executor
+        return create_parallel_agent_executor(llm, tools, SYSTEM_PROMPT, verbose=AGENT_VERBOSE)
+
+    executor = initialize_agent(
+        tools=tools,
+        llm=llm,
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=AGENT_VERBOSE,
+        handle_parsing_errors=True,
+        agent_kwargs={
+            "system_message": SystemMessage(content=SYSTEM_PROMPT)
+        }
+    )
+    # Same agent, in an executor whose runs can resume after the approval pause (agent_runs.py)
+    return ResumableAgentExecutor.from_agent_and_tools(
+        agent=executor.agent, tools=tools, verbose=AGENT_VERBOSE, handle_parsing_errors=True)
+
+def get_agent_executor():
+    """Builds the agent on first use; later calls return the same executor."""
+    global agent_executor
+    if agent_executor is None:
+        with _agent_lock:
+            if agent_executor is None:
+                started = time.perf_counter()
+                agent_executor = build_agent_executor()
+                logger.info("agent.ready", "Agent (%s) ready in %.2fs", AGENT_MODE, time.perf_counter() - started)
+    return agent_executor
+
+async def ensure_agent_ready():
+    # Building imports LangChain and reads knowledge.json: keep it off the event loop
+    if agent_executor is not None:
+        return agent_executor
+    return await asyncio.get_running_loop().run_in_executor(None, get_agent_executor)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm the agent in the background so the server accepts traffic immediately.
+    # Set EAGER_AGENT_INIT=false to build it only on the first /chat request.
+    # Multi-worker sharing depends on SHARED_STORE_PATH (usually from .env): say which mode this worker is in
+    if shared_store is not None:
+        logger.info("shared_store.active", "Shared store active at %s (limiter, response cache, quota counts)",
+                    shared_store.path)
+    else:
+        logger.info("shared_store.off", "Shared store off (SHARED_STORE_PATH not set): per-process limiter and caches")
+    warmup = None
+    if os.getenv("EAGER_AGENT_INIT", "true").lower() != "false":
+        warmup = asyncio.get_running_loop().run_in_executor(None, _warm_up)
+    # Warm team/player caches for matches about to start, in Sportradar's idle time
+    prefetcher = None
+    if client and prefetch.PREFETCH_ENABLED:
+        prefetcher = prefetch.Prefetcher(
+            client, busy=lambda: admission.chat_queue.active > 0 or len(admission.chat_queue) > 0)
+        prefetcher.start()
+    yield
+    if prefetcher is not None:
+        prefetcher.stop()
+    quota_ledger.flush()
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+
+def _warm_up():
+    try:
+        get_agent_executor()
+    except Exception as e:
+        logger.warning("agent.warmup_failed", "Agent warm-up failed (will retry on first request): %s", e)
+
+app = FastAPI(title="StatsScout Agent Backend", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -131,28 +245,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# Request ids on every log record of a request (and in the X-Request-ID response header)
+app.add_middleware(log.RequestIdMiddleware)
 
 class ChatRequest(BaseModel):
     message: str
     history: list = []
-
-async def generate_response(message: str):
+    user_id: Optional[str] = None
+    # Enables conversation memory: follow-ups in the same session see a compact history
+    session_id: Optional[str] = None
+
+class BatchRefreshRequest(BaseModel):
+    # match id -> version the client last saw (0 if none)
+    matches: Dict[str, int]
+
+async def generate_response(message: str, user_id: Optional[str] = None, context: str = "",
+                            session_id: Optional[str] = None, resume=None, speculation=None):
+    # Admission control: wait for a run slot and Gemini budget, telling the client
+    # where it is in line rather than failing mid-run with a 429.
+    ticket = None
+    try:
+        ticket = admission.chat_queue.enqueue(user_id)
+        last_position = None
+        while not ticket.admitted:
+            position = admission.chat_queue.position(ticket)
+            if position != last_position:
+                yield f"data: {json.dumps({'type': 'queue', 'position': position, 'queued': len(admission.chat_queue)})}\n\n"
+                last_position = position
+            await admission.chat_queue.wait(ticket, timeout=1.0)
+    except admission.QuotaExceeded as e:
+        yield f"data: {json.dumps({'type': 'error', 'content': str(e), 'retryAfter': round(e.retry_after, 1)})}\n\n"
+        return
+    finally:
+        if ticket is not None and not ticket.admitted:
+            admission.chat_queue.cancel(ticket)
+
+    executor = await ensure_agent_ready()
     import tools
+    from callbacks import AgentCallbackHandler
     tools.GLOBAL_USER_MESSAGE = message
     queue = asyncio.Queue()
-    handler = AgentCallbackHandler(queue)
+    loop = asyncio.get_running_loop()
+
+    # Spans can finish inside tool threads, so hand them to the loop thread-safely
+    def push_span(span_data):
+        loop.call_soon_threadsafe(queue.put_nowait, json.dumps({"type": "trace", "span": span_data}))
+
+    trace = tracing.Trace(sink=push_span)
+    handler = AgentCallbackHandler(queue, trace, budget=admission.gemini_budget)
     
     # Send initial event (Optional, removing to reduce noise)
     # await queue.put(json.dumps({"type": "thought", "content": "Agent started..."}))
 
     # Run the agent in a background task
+    run_started = time.perf_counter()
+    # create_task copies the current context, so the agent run (and its tool threads) see the
+    # trace and, after an approval, the paused run it continues
+    trace_token = tracing.current_trace.set(trace)
+    resume_token = resume_from.set(resume)
+    speculated_token = speculated_payloads.set(speculation)
     task = asyncio.create_task(
-        agent_executor.ainvoke(
-            {"input": message},
+        executor.ainvoke(
+            resume.inputs if resume else {"input": with_context(context, message)},
             config={"callbacks": [handler]}
         )
     )
+    speculated_payloads.reset(speculated_token)
+    resume_from.reset(resume_token)
+    tracing.current_trace.reset(trace_token)
+    if speculation is not None:
+        # Whatever the run did not read is dropped with it
+        task.add_done_callback(lambda t: speculation.discard())
+    task.add_done_callback(lambda t: _observe_agent_run(t, run_started))
+    # The slot is held until the run itself finishes, even if the client disconnects
+    task.add_done_callback(lambda t: admission.chat_queue.release(ticket, handler.tokens_used))
 
     try:
         # Loop until task is done or valid break
@@ -171,6 +339,20 @@ async def generate_response(message: str):
                         exc = task.exception()
                         # Check if it's our custom approval exception
                         if "approval_required" in str(exc):
+                            paused = getattr(exc, "paused_run", None)
+                            if paused is not None and session_id:
+                                # The approved answer is cached under the question's key (approved),
+                                # with what was read so far, when this run goes through the answer cache
+                                read = current_dependencies.get()
+                                if resume is not None:
+                                    paused.answer_key = resume.answer_key
+                                elif read is not None and not tools.is_approval(message):
+                                    paused.answer_key = answer_key(message, True, context)
+                                paused.dependencies = dict(read or {})
+                                # The session's approval continues this run (agent_runs.py); until
+                                # then the gated calls' data is fetched on the side (speculation.py)
+                                await asyncio.to_thread(paused_runs.save, session_id, paused)
+                                speculations.start(session_id, client, paused.pending)
                             try:
                                 # Extract just the JSON portion if it's wrapped in an Exception string
                                 err_str = str(exc)
@@ -188,215 +370,395 @@ async def generate_response(message: str):
                         final_output = result.get("output", "No output generated.")
                         final_msg = json.dumps({"type": "answer", "content": final_output})
                         yield f"data: {final_msg}\n\n"
+                    yield f"data: {json.dumps({'type': 'trace', 'summary': trace.summary()})}\n\n"
+                    trace.export()
                     break
     except Exception as e:
         yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
 
-from datetime import datetime, timedelta
+def _observe_agent_run(task, started):
+    if task.cancelled():
+        outcome = "cancelled"
+    elif task.exception():
+        outcome = "approval_required" if "approval_required" in str(task.exception()) else "error"
+    else:
+        outcome = "answer"
+    metrics.AGENT_RUN_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+async def remember_turn(stream, session_id, message):
+    """Passes SSE frames through, then records the finished turn in the session's memory."""
+    observations = []
+    answer = None
+    async for frame in stream:
+        yield frame
+        if frame.startswith('data: {"type": "trace"'):
+            continue  # the bulk of the frames; nothing to remember
+        try:
+            event = json.loads(frame[len("data: "):])
+        except ValueError:
+            continue
+        if event.get("type") == "answer":
+            answer = event.get("content")
+        elif event.get("type") == "observation":
+            if event.get("_requiresApproval"):
+                # The user's next message is likely the approval; keep what was being asked
+                answer = f"(Paused, waiting for the user's approval: {event.get('_approvalAction')})"
+            else:
+                observations.append((event.get("tool"), observation_text(event)))
+    if answer:
+        # Writes the session file: keep it off the event loop
+        await asyncio.to_thread(conversation_memory.record, session_id, message, answer, observations)
+
+async def instrument_stream(stream, started):
+    """Wraps an SSE generator to track open streams and time-to-first-event."""
+    metrics.SSE_ACTIVE_STREAMS.inc()
+    first_event = True
+    try:
+        async for frame in stream:
+            if first_event:
+                metrics.SSE_FIRST_EVENT_SECONDS.observe(time.perf_counter() - started)
+                first_event = False
+            yield frame
+    finally:
+        metrics.SSE_ACTIVE_STREAMS.dec()
+
+from schedule_index import schedule_index, encode_cursor, decode_cursor, parse_date_bound
+
+MATCH_LIST_PAGE_SIZE = int(os.getenv("MATCH_LIST_PAGE_SIZE", "20"))
+MATCH_LIST_MAX_PAGE_SIZE = 100
+MATCH_LIST_SECTIONS = ("live", "upcoming", "recent")
+
+
+def _enrich_recent(item):
+    """Adds score and result text from the match summary to a completed match item."""
+    try:
+        summary = client.get_match(item['id'])
+        if summary:
+            if summary.status is not None:
+                item['status'] = summary.status
+
+            # 1. Get Detailed Score from Periods (Innings)
+            # Only take innings, ignore super overs for now unless they are crucial
+            innings_scores = [i.display_score for i in summary.innings if i.display_score]
+
+            if innings_scores:
+                item['score'] = " vs ".join(innings_scores)
+            else:
+                item['score'] = summary.display_score or ""
+
+            # 2. Get Result Text
+            result_text = summary.match_result or summary.match_status
+            if result_text and str(result_text).lower() not in ['ended', 'closed', 'finished', 'not_started']:
+                 item['result'] = str(result_text)
+            else:
+                 # Try fallback to just "Ended" if we have scores but no result text
+                 if item['score']:
+                      item['result'] = "Match Ended"
+                 else:
+                      item['result'] = ""
+    except Exception:
+        pass
+
+
+def _matches_filters(event, team, tournament, status):
+    """Team/tournament/status filter for live schedule events (the index handles the others)."""
+    if team and not any(team in (c.id, (c.name or "").lower()) for c in event.competitors):
+        return False
+    if tournament and not (event.tournament and tournament in (event.tournament.id, (event.tournament.name or "").lower())):
+        return False
+    return not status or status == "live"
+
+
+def _sparse(item, fields):
+    if fields is None:
+        return item
+    return {k: v for k, v in item.items() if k in fields}
+
+
+def _match_list_page(sections, limit, after, team, tournament, status, start, end, field_set):
+    """The /api/match-list response for validated parameters. Blocking (Sportradar calls)."""
+    wants = lambda *names: field_set is None or any(n in field_set for n in names)
+    # Runs in its own context copy (to_thread): the stale reads collected are this request's
+    stale = {}
+    stale_reads.set(stale)
+    response = {}
+    # 1. Fetch Live Matches (the live schedule is needed to exclude them from the other lists)
+    live_events = client.get_live_matches() or []
+    live_ids = {m.id for m in live_events}
+    if "live" in sections:
+        live_matches = []
+        for match in live_events:
+            if not _matches_filters(match, team, tournament, status):
+                continue
+            # Try to get more detail (score), unless the client asked for none of it
+            summary = client.get_match(match.id) if wants("status", "score", "version") else None
+            display_status = "Live"
+            score = ""
+
+            version = data_versions.current(match_deltas.summary_resource(match.id))
+            if summary:
+                display_status = summary.status or "Live"
+                score = summary.score_text()
+                match_deltas.tracker.record(match.id, version, match_deltas.compact_view(summary))
+
+            live_matches.append(_sparse({
+                "id": match.id,
+                "team1": match.team1,
+                "team2": match.team2,
+                "status": display_status,
+                "score": score,
+                "type": "live",
+                # Cursor for POST /api/matches/refresh
+                "version": version
+            }, field_set))
+        response["live"] = live_matches
+
+    # 2. Daily schedules for "Upcoming" and "Recent"
+    # The index holds a window of days (matches often span midnight, so yesterday is included
+    # by default) and only re-fetches days that are new or can still change.
+    next_cursors = {}
+    if "upcoming" in sections or "recent" in sections:
+        schedule_index.sync(client)
+    for kind in ("upcoming", "recent"):
+        if kind not in sections:
+            continue
+        # One extra event tells whether there is a next page
+        events = schedule_index.query(kind, team=team, tournament=tournament, status=status, start=start,
+                                      end=end, exclude=live_ids, after=after, limit=limit + 1)
+        page = events[:limit]
+        items = [e.to_item() for e in page]
+        # Fetch scores for the completed matches on this page only
+        if kind == "recent" and wants("status", "score", "result") and not quota_ledger.degraded("skip_recent_enrichment"):
+            for item in items:
+                _enrich_recent(item)
+        response[kind] = [_sparse(item, field_set) for item in items]
+        next_cursors[kind] = encode_cursor(kind, page[-1]) if len(events) > limit else None
+
+    if next_cursors:
+        response["next"] = next_cursors
+    if stale:
+        response["stale"] = stale
+    return response
+
 
 @app.get("/api/match-list")
-async def get_match_list():
+async def get_match_list(section: Optional[str] = None, limit: int = MATCH_LIST_PAGE_SIZE, cursor: Optional[str] = None,
+                         team: Optional[str] = None, tournament: Optional[str] = None, status: Optional[str] = None,
+                         date_from: Optional[str] = None, date_to: Optional[str] = None,
+                         fields: Optional[str] = None):
     """
     Fetches live and daily match limits.
-    Returns JSON with 'live', 'upcoming', 'recent'.
+    Returns JSON with 'live', 'upcoming', 'recent' (one page each) and 'next' cursors.
+
+    - section: only this list ("live", "upcoming" or "recent"); implied by `cursor`
+    - limit / cursor: page size and the `next` cursor of the previous page
+    - team, tournament, status: ids or names (case-insensitive)
+    - date_from / date_to: YYYY-MM-DD or ISO date-times bounding the start time (scheduled matches only)
+    - fields: comma-separated item fields to return (id is always included)
+    Scores are only fetched for the items on the returned page.
+    While Sportradar is unavailable the last good data is returned, with 'stale' mapping each
+    endpoint served that way to its age in seconds.
     """
     if not client:
         raise HTTPException(status_code=500, detail="Sportradar Client not initialized")
-    
+
+    after = None
+    if cursor:
+        try:
+            cursor_section, after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if section and section != cursor_section:
+            raise HTTPException(status_code=400, detail="Cursor belongs to a different section")
+        section = cursor_section
+    if section and section not in MATCH_LIST_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"section must be one of {', '.join(MATCH_LIST_SECTIONS)}")
+    if not 1 <= limit <= MATCH_LIST_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MATCH_LIST_MAX_PAGE_SIZE}")
     try:
-        # 1. Fetch Live Matches
-        live_data = client.get_live_schedule()
-        live_matches = []
-        if live_data and 'sport_events' in live_data:
-            for match in live_data['sport_events']:
-                match_id = match.get('id')
-                # Try to get more detail (score)
-                summary = client.get_match_summary(match_id)
-                display_status = "Live"
-                score = ""
-                
-                if summary:
-                    status = summary.get('sport_event_status', {})
-                    display_status = status.get('status', 'Live')
-                    if 'period_scores' in status:
-                        scores = []
-                        for p in status['period_scores']:
-                            scores.append(f"{p.get('type')}: {p.get('display_score')}")
-                        score = ", ".join(scores)
-
-                competitors = match.get('competitors', [])
-                team1 = competitors[0].get('name', 'Unknown') if len(competitors) > 0 else 'Unknown'
-                team2 = competitors[1].get('name', 'Unknown') if len(competitors) > 1 else 'Unknown'
-
-                live_matches.append({
-                    "id": match_id,
-                    "team1": team1,
-                    "team2": team2,
-                    "status": display_status,
-                    "score": score,
-                    "type": "live"
-                })
-
-        # 2. Fetch Daily Schedule for "Upcoming" and "Recent"
-        # Since matches often span midnight or users check "tonight's game" after midnight,
-        # we fetch BOTH today and yesterday.
-        now = datetime.now()
-        today = now.strftime("%Y-%m-%d")
-        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        # Parallel fetch if we were async, but sequential is fine for now
-        schedule_today = client.get_daily_schedule(today)
-        schedule_yesterday = client.get_daily_schedule(yesterday)
-        
-        all_events = []
-        if schedule_today:
-            all_events.extend(schedule_today.get('sport_events', []))
-        if schedule_yesterday:
-            all_events.extend(schedule_yesterday.get('sport_events', []))
-            
-        upcoming_matches = []
-        recent_matches = []
-        
-        # Deduplicate by ID just in case
-        seen_ids = set()
-        
-        # Sort all events by time (descending for processing simplification? No, just sort result lists)
-        
-        for match in all_events:
-            match_id = match.get('id')
-            if match_id in seen_ids: continue
-            seen_ids.add(match_id)
-            
-            # Filter out active live matches
-            if any(m['id'] == match_id for m in live_matches):
-                continue
-                
-            status = match.get('sport_event_status', {}).get('status', '')
-            competitors = match.get('competitors', [])
-            if len(competitors) < 2: continue
-            
-            team1 = competitors[0].get('name', 'Unknown')
-            team2 = competitors[1].get('name', 'Unknown')
-            start_time = match.get('scheduled', '') # ISO string
-
-            # Determine Status if missing
-            if not status or status == 'Unknown':
-                try:
-                    # Parse start_time (e.g. 2026-02-19T21:30:00+00:00)
-                    # Handle Z if present
-                    st = start_time.replace('Z', '+00:00')
-                    dt = datetime.fromisoformat(st)
-                    if dt.timestamp() < now.timestamp():
-                        status = 'ended' # Assume ended if in past
-                    else:
-                        status = 'not_started'
-                except Exception:
-                    status = 'scheduled' # Fallback
-
-            item = {
-                "id": match_id,
-                "team1": team1,
-                "team2": team2,
-                "status": status,
-                "startTime": start_time,
-                "type": "scheduled",
-                "score": "",
-                "result": ""
-            }
-
-            if status == "closed" or status == "ended" or status == "postponed":
-                item['type'] = 'recent'
-                recent_matches.append(item)
-            elif status == "not_started" or status == "scheduled":
-                item['type'] = 'upcoming'
-                upcoming_matches.append(item)
-
-        # Sort Lists
-        recent_matches.sort(key=lambda x: x['startTime'] or "", reverse=True)
-        upcoming_matches.sort(key=lambda x: x['startTime'] or "")
-        
-        # Fetch Scores for Top 10 Recent
-        for i, item in enumerate(recent_matches[:10]):
-            try:
-                summary = client.get_match_summary(item['id'])
-                if summary:
-                    status_obj = summary.get('sport_event_status', {})
-                    item['status'] = status_obj.get('status', item['status'])
-                    
-                    # 1. Get Detailed Score from Periods (Innings)
-                    period_scores = status_obj.get('period_scores', [])
-                    innings_scores = []
-                    for p in period_scores:
-                        # Only take innings, ignore super overs for now unless they are crucial
-                        if p.get('display_score'):
-                             innings_scores.append(p.get('display_score'))
-                    
-                    if innings_scores:
-                        item['score'] = " vs ".join(innings_scores)
-                    else:
-                        item['score'] = status_obj.get('display_score') or ""
-                    
-                    # 2. Get Result Text
-                    result_text = status_obj.get('match_result') or status_obj.get('match_status')
-                    if result_text and str(result_text).lower() not in ['ended', 'closed', 'finished', 'not_started']:
-                         item['result'] = str(result_text)
-                    else:
-                         # Try fallback to just "Ended" if we have scores but no result text
-                         if item['score']:
-                              item['result'] = "Match Ended"
-                         else:
-                              item['result'] = ""
-            except Exception:
-                pass
-        
-        return {
-            "live": live_matches,
-            "upcoming": upcoming_matches,
-            "recent": recent_matches 
-        }
+        start = parse_date_bound(date_from) if date_from else None
+        end = parse_date_bound(date_to, end=True) if date_to else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date_from/date_to must be YYYY-MM-DD or ISO date-times")
+    field_set = {"id"} | {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+    team = team.lower() if team else None
+    tournament = tournament.lower() if tournament else None
+    sections = [section] if section else list(MATCH_LIST_SECTIONS)
 
+    try:
+        # Sportradar calls are blocking and rate limited: keep them off the event loop
+        return await asyncio.to_thread(_match_list_page, sections, limit, after, team, tournament, status,
+                                       start, end, field_set)
     except Exception as e:
-        print(f"Error in match-list: {e}")
+        logger.error("match_list.error", "Error in match-list: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/match/{match_id}/refresh")
 async def refresh_match(match_id: str):
     """
     Fetches the latest summary for a specific match.
-    Used for manual live score refreshing.
+    Used for manual live score refreshing. 'staleSeconds' is set when Sportradar is unavailable
+    and the last good summary is returned instead.
     """
     if not client:
         raise HTTPException(status_code=500, detail="Sportradar Client not initialized")
     
+    stale = {}
+    stale_token = stale_reads.set(stale)
     try:
-        summary = client.get_match_summary(match_id)
+        summary = client.get_match(match_id)
         if not summary:
             raise HTTPException(status_code=404, detail="Match not found or data unavailable")
         
-        status_obj = summary.get('sport_event_status', {})
-        display_status = status_obj.get('status', 'Live')
-        score = ""
-        
-        if 'period_scores' in status_obj:
-            scores = []
-            for p in status_obj['period_scores']:
-                scores.append(f"{p.get('type')}: {p.get('display_score')}")
-            score = ", ".join(scores)
-            
-        return {
+        result = {
             "id": match_id,
-            "status": display_status,
-            "score": score
+            "status": summary.status or "Live",
+            "score": summary.score_text()
         }
+        if stale:
+            result["staleSeconds"] = max(stale.values())
+        return result
             
     except Exception as e:
-        print(f"Error refreshing match {match_id}: {e}")
+        logger.error("match.refresh_error", "Error refreshing match %s: %s", match_id, e)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        stale_reads.reset(stale_token)
+
+@app.get("/api/match/{match_id}/progression")
+async def match_progression(match_id: str, at_over: Optional[float] = None, last_overs: int = 3):
+    """
+    Ball-by-ball progression from the match timeline: each innings' score at `at_over`
+    (default: current over), run rate over the last `last_overs` overs and runs per over.
+    """
+    if not client:
+        raise HTTPException(status_code=500, detail="Sportradar Client not initialized")
+    # The timeline poll is blocking and rate limited: keep it off the event loop
+    timeline = await asyncio.to_thread(timeline_store.sync, client, match_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="Match timeline not found or data unavailable")
+    return timeline_progression(timeline, at_over, last_overs)
+
+@app.get("/api/blobs/{digest}")
+async def get_blob(digest: str, request: Request):
+    """
+    Full text of a large tool observation, referenced by hash from `observation` SSE events.
+    Content never changes under a hash, so clients may cache it indefinitely.
+    """
+    etag = f'"{digest}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if not is_digest(digest):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    data = blob_store.get(digest)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Blob not found or expired")
+    return Response(content=data, media_type="text/plain; charset=utf-8", headers=headers)
+
+@app.post("/api/matches/refresh")
+async def refresh_matches(request: BatchRefreshRequest):
+    """
+    Batch delta refresh for live matches. Takes each match's last seen version and returns
+    only the matches that changed since, each as a patch of the changed fields plus its new version.
+    """
+    if not client:
+        raise HTTPException(status_code=500, detail="Sportradar Client not initialized")
+    if len(request.matches) > match_deltas.MAX_BATCH_REFRESH:
+        raise HTTPException(status_code=400, detail=f"At most {match_deltas.MAX_BATCH_REFRESH} matches per refresh")
+    # Sportradar calls are blocking and rate limited: keep them off the event loop
+    return await asyncio.to_thread(match_deltas.batch_refresh, client, request.matches)
+
+@app.get("/api/admin/quota")
+async def quota_status(request: Request):
+    """
+    Sportradar quota ledger: calls this month by endpoint and day, burn rate, projected
+    month-end usage, the degrade level and the degrade actions in effect.
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set.
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if admin_token and request.headers.get("x-admin-token") != admin_token:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return quota_ledger.snapshot()
 
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
-    print(f"--- Streaming Request: {request.message[:50]}... ---")
-    return StreamingResponse(generate_response(request.message), media_type="text/event-stream")
+async def chat_endpoint(request: ChatRequest, http_request: Request):
+    logger.info("chat.request", "Chat request: %s", request.message[:50], session=bool(request.session_id))
+    started = time.perf_counter()
+    # Fair queuing is per user; fall back to the client address when no id is sent
+    user_id = request.user_id or (http_request.client.host if http_request.client else None)
+    # Repeated questions are answered from cache (while the data they read is unchanged)
+    # or share the run already in flight for the same question.
+    await ensure_agent_ready()
+    import tools
+    # A session not held in memory yet is read from disk: off the event loop
+    context = await asyncio.to_thread(conversation_memory.context, request.session_id) if request.session_id else ""
+    # A run paused for approval lasts until the session's next message: resumed if that is the approval
+    paused = await asyncio.to_thread(paused_runs.take, request.session_id) if request.session_id else None
+    resume = paused if paused is not None and tools.is_approval(request.message) else None
+    # Data fetched while the approval was pending: for the approved run only, dropped otherwise
+    speculation = speculations.take(request.session_id) if request.session_id else None
+    if speculation is not None and not tools.is_approval(request.message):
+        speculation.discard()
+        speculation = None
+    produce = lambda: generate_response(request.message, user_id, context, request.session_id, resume, speculation)
+    approval = tools.is_approval(request.message)
+    if resume is not None and resume.answer_key is not None:
+        # The approved answer to the paused question (same conversation state) may be cached
+        # already, or being produced for another session: then this paused run is not needed
+        ran = []
+        def produce_resumed():
+            ran.append(True)
+            return produce()
+        stream = answer_cache.stream(resume.answer_key, produce_resumed, resume.dependencies)
+        if speculation is not None:
+            stream = _discard_unless_ran(stream, speculation, ran)
+    elif resume is not None or speculation is not None or approval or not request.session_id:
+        # Not cached or shared:
+        # - the paused run (not cacheable) and speculation were taken for this request: a cached or
+        #   shared answer would drop them unused;
+        # - an approval ("yes", "I approve. Proceed with: ...") only means something for its own run;
+        # - without a session the conversation the message follows is unknown.
+        stream = produce()
+    else:
+        key = answer_key(request.message, approval, context)
+        stream = answer_cache.stream(key, produce)
+    if request.session_id:
+        stream = remember_turn(stream, request.session_id, request.message)
+    return StreamingResponse(instrument_stream(stream, started), media_type="text/event-stream")
+
+async def _discard_unless_ran(stream, speculation, ran):
+    """
+    Passes frames through. A speculation whose run never started (the answer came from cache or
+    from another session's run) is discarded as wasted; a started run discards it when it ends.
+    """
+    try:
+        async for frame in stream:
+            yield frame
+    finally:
+        if not ran:
+            speculation.discard()
+
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the agent (LangChain, Gemini client, tools, knowledge base) is built."""
+    if agent_executor is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Prometheus scrape endpoint: Sportradar traffic, rate-limit waits,
+    cache hit rates, tool latency and /chat streaming stats.
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
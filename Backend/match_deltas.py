@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import OrderedDict
+from data_versions import data_versions
+from quota_ledger import ledger as quota_ledger
+from sportradar_client import SportradarClient
+
+# Delta refresh for live matches.
+# The dashboard keeps, per match, the data version it last saw (the cursor). A batch refresh
+# returns only matches whose summary version differs from that cursor, and for each only the
+# fields that differ from what the client already has. Versions are content digests, the same
+# on every worker; views are kept per process, so a worker that never served the cursor's
+# version sends the full view.
+
+# Summaries younger than this are served from cache instead of re-fetched (1 QPS upstream)
+LIVE_REFRESH_MAX_AGE = float(os.getenv("LIVE_REFRESH_MAX_AGE", "15"))
+MAX_BATCH_REFRESH = int(os.getenv("MAX_BATCH_REFRESH", "20"))
+# Older views are dropped; a cursor older than this gets the full view again
+VERSIONS_KEPT = 8
+# Views of the least recently refreshed matches beyond this are dropped (finished matches
+# stop being polled); a cursor for a dropped match gets the full view again
+MATCHES_KEPT = 256
+
+
+def summary_resource(match_id):
+    return f"get_match_summary:{match_id}"
+
+
+def compact_view(summary):
+    """The fields a dashboard card shows, keyed by their wire names."""
+    return {
+        "status": summary.status or "Live",
+        "score": summary.score_text(),
+        "matchStatus": summary.match_status,
+        "overs": summary.display_overs,
+        "runRate": summary.run_rate,
+        "requiredRunRate": summary.required_run_rate,
+        "result": summary.match_result,
+    }
+
+
+class DeltaTracker:
+    def __init__(self, versions_kept=VERSIONS_KEPT, matches_kept=MATCHES_KEPT):
+        self.versions_kept = versions_kept
+        self.matches_kept = matches_kept
+        self._lock = threading.Lock()
+        self._views = OrderedDict()  # match_id -> OrderedDict(version -> view), least recent first
+
+    def record(self, match_id, version, view):
+        """Remembers what a client that was handed `version` of the match has."""
+        with self._lock:
+            history = self._views.setdefault(match_id, OrderedDict())
+            self._views.move_to_end(match_id)
+            history[version] = view
+            history.move_to_end(version)
+            while len(history) > self.versions_kept:
+                history.popitem(last=False)
+            while len(self._views) > self.matches_kept:
+                self._views.popitem(last=False)
+
+    def diff(self, match_id, version, view, since):
+        """
+        Records `view` as `version` of the match and returns the patch against `since`:
+        (patch, full). `full` is True when the client's version is unknown or too old.
+        """
+        self.record(match_id, version, view)
+        with self._lock:
+            base = self._views.get(match_id, {}).get(since) if since else None
+        if base is None:
+            return dict(view), True
+        return {k: v for k, v in view.items() if base.get(k) != v}, False
+
+
+tracker = DeltaTracker()
+
+
+def batch_refresh(client, cursors, max_age=LIVE_REFRESH_MAX_AGE):
+    """
+    `cursors` maps match id -> last seen version (0 if never seen).
+    Returns {"matches": {id: {"version", "patch"[, "full"]}}, "missing": [ids], "pollAfter": s}
+    with only the matches that changed, plus {"stale": {id: age seconds}} for summaries served
+    past their max age to save quota. Blocking (Sportradar calls): run it off the event loop.
+    """
+    # Polled less often while the Sportradar quota runs low
+    max_age *= quota_ledger.live_poll_factor()
+    changed = {}
+    missing = []
+    stale = {}
+    for match_id, since in cursors.items():
+        summary = client.refresh_match(match_id, max_age=max_age)
+        if summary is None:
+            missing.append(match_id)
+            continue
+        age = SportradarClient.get_match_summary.age(client, match_id)
+        if age is not None and age > max_age:
+            stale[match_id] = round(age)
+        version = data_versions.current(summary_resource(match_id))
+        if version == since:
+            continue
+        patch, full = tracker.diff(match_id, version, compact_view(summary), since)
+        entry = {"version": version, "patch": patch}
+        if full:
+            entry["full"] = True
+        changed[match_id] = entry
+    result = {"matches": changed, "missing": missing, "pollAfter": max_age}
+    if stale:
+        result["stale"] = stale
+    return result
@@ -0,0 +1,141 @@
+# Typed view of Sportradar schedule and summary payloads.
+# The client decodes each cached raw payload into these __slots__ objects once and keeps the
+# model on the payload's cache entry (tracked_lru_cache.derived), so it is freed with the payload.
+# The match list, refresh endpoint and agent tools read plain attributes instead of re-walking
+# nested dicts with .get chains.
+
+
+class Competitor:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+class Tournament(Competitor):
+    __slots__ = ()
+
+
+class Innings:
+    __slots__ = ("type", "number", "display_score", "home_score", "away_score", "home_wickets", "away_wickets")
+
+    def __init__(self, raw):
+        self.type = raw.get('type')
+        self.number = raw.get('number')
+        self.display_score = raw.get('display_score')
+        self.home_score = raw.get('home_score')
+        self.away_score = raw.get('away_score')
+        self.home_wickets = raw.get('home_wickets')
+        self.away_wickets = raw.get('away_wickets')
+
+
+class PlayerLine:
+    """One player's line in a match summary (batting and bowling figures if present)."""
+    __slots__ = ("id", "name", "team", "role", "runs", "balls", "strike_rate", "fours", "sixes", "dismissed",
+                 "overs", "runs_conceded", "wickets", "economy")
+
+    def __init__(self, raw, team):
+        stats = raw.get('statistics', {})
+        batting = stats.get('batting', {})
+        bowling = stats.get('bowling', {})
+        self.id = raw.get('id')
+        self.name = raw.get('name')
+        self.team = team
+        self.role = raw.get('type', 'Player')  # e.g. batsman, bowler
+        self.runs = batting.get('runs')
+        self.balls = batting.get('balls')
+        self.strike_rate = batting.get('strike_rate')
+        self.fours = batting.get('fours')
+        self.sixes = batting.get('sixes')
+        self.dismissed = bool(batting.get('dismissal'))
+        self.overs = bowling.get('overs')  # e.g. 3.2
+        self.runs_conceded = bowling.get('runs_conceded')
+        self.wickets = bowling.get('wickets')
+        self.economy = bowling.get('economy')
+
+    def to_dict(self):
+        # Frontend expects: id, name, role, team, runs, balls, strikeRate, wickets, economy
+        return {
+            "id": self.id,
+            "name": self.name,
+            "team": self.team,
+            "role": self.role,
+            "runs": self.runs,
+            "balls": self.balls,
+            "strikeRate": self.strike_rate,
+            "wickets": self.wickets,
+            "economy": self.economy,
+        }
+
+
+def _competitors(raw_list):
+    return [Competitor(c.get('id'), c.get('name', 'Unknown')) for c in raw_list]
+
+
+class _Fixture:
+    __slots__ = ()
+
+    @property
+    def team1(self):
+        return self.competitors[0].name if len(self.competitors) > 0 else 'Unknown'
+
+    @property
+    def team2(self):
+        return self.competitors[1].name if len(self.competitors) > 1 else 'Unknown'
+
+
+class ScheduleEvent(_Fixture):
+    """An entry of a live or daily schedule."""
+    __slots__ = ("id", "competitors", "status", "scheduled", "venue", "tournament")
+
+    def __init__(self, raw):
+        self.id = raw.get('id')
+        self.competitors = _competitors(raw.get('competitors', []))
+        self.status = raw.get('sport_event_status', {}).get('status', '')
+        self.scheduled = raw.get('scheduled', '')  # ISO string
+        self.venue = raw.get('venue', {}).get('name', 'Unknown Venue')
+        tournament = raw.get('tournament', {})
+        self.tournament = Tournament(tournament.get('id'), tournament.get('name', '')) if tournament else None
+
+
+class MatchSummary(_Fixture):
+    """Decoded /matches/{id}/summary.json."""
+    __slots__ = ("id", "competitors", "scheduled", "status", "match_status", "display_overs", "run_rate",
+                 "required_run_rate", "display_score", "match_result", "innings", "players")
+
+    def __init__(self, raw):
+        sport_event = raw.get('sport_event', {})
+        status = raw.get('sport_event_status', {})
+        self.id = sport_event.get('id')
+        self.competitors = _competitors(sport_event.get('competitors', []) or raw.get('competitors', []))
+        self.scheduled = sport_event.get('scheduled', '')  # ISO string
+        self.status = status.get('status')
+        self.match_status = status.get('match_status')  # e.g. second_innings_away_team
+        self.display_overs = status.get('display_overs')  # e.g. 14.1
+        self.run_rate = status.get('run_rate')
+        self.required_run_rate = status.get('required_run_rate')
+        self.display_score = status.get('display_score')
+        self.match_result = status.get('match_result')
+        self.innings = [Innings(p) for p in status.get('period_scores', [])]
+        self.players = [PlayerLine(p, team.get('name', 'Unknown Team'))
+                        for team in raw.get('statistics', {}).get('teams', [])
+                        for p in team.get('players', [])]
+
+    def score_text(self):
+        """e.g. 'inn: 172/6, inn: 95/3'"""
+        return ", ".join(f"{i.type}: {i.display_score}" for i in self.innings)
+
+
+def summary_from(payload):
+    """MatchSummary for a raw summary payload (None passes through)."""
+    if payload is None:
+        return None
+    return MatchSummary(payload)
+
+
+def schedule_from(payload):
+    """List of ScheduleEvent for a raw schedule payload (None passes through)."""
+    if payload is None:
+        return None
+    return [ScheduleEvent(e) for e in payload.get('sport_events', [])]
@@ -0,0 +1,274 @@
+import re
+import threading
+import time
+
+# Minimal Prometheus-style metrics registry.
+# We avoid pulling in prometheus_client for a handful of counters; this module renders
+# the plain text exposition format (version 0.0.4) that Prometheus scrapes.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds. Sportradar calls sit around 0.2-2s, agent runs around 5-60s.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(label_names, label_values):
+    if not label_names:
+        return ""
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. active streams)."""
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed histogram with _sum and _count series."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [bucket counts..., sum, count]
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        """Context manager observing the elapsed wall-clock time of its block."""
+        return _Timer(self, labels)
+
+    def _render_sample(self, key, state):
+        lines = []
+        for i, bound in enumerate(self.buckets):
+            labels = _format_labels(self.labelnames + ("le",), key + (repr(float(bound)),))
+            lines.append(f"{self.name}_bucket{labels} {state[i]}")
+        labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+        lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+        base = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{base} {state[-2]}")
+        lines.append(f"{self.name}_count{base} {state[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Sportradar ---
+SPORTRADAR_REQUESTS = REGISTRY.register(Counter(
+    "statsscout_sportradar_requests_total",
+    "Sportradar HTTP requests by endpoint and outcome.",
+    ("endpoint", "status")))
+SPORTRADAR_LATENCY = REGISTRY.register(Histogram(
+    "statsscout_sportradar_request_seconds",
+    "Sportradar HTTP request latency by endpoint.",
+    ("endpoint",)))
+SPORTRADAR_429 = REGISTRY.register(Counter(
+    "statsscout_sportradar_429_total",
+    "Sportradar responses with status 429 (quota exceeded).",
+    ("endpoint",)))
+SPORTRADAR_QUOTA_USED = REGISTRY.register(Gauge(
+    "statsscout_sportradar_quota_used",
+    "Sportradar calls made this month (quota ledger)."))
+SPORTRADAR_CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "statsscout_sportradar_circuit_state",
+    "Sportradar circuit breaker state by endpoint (0 closed, 1 half open, 2 open).",
+    ("endpoint",)))
+SPORTRADAR_TIMEOUT = REGISTRY.register(Gauge(
+    "statsscout_sportradar_timeout_seconds",
+    "Adaptive Sportradar request timeout by endpoint (from recent latency percentiles).",
+    ("endpoint",)))
+SPORTRADAR_STALE_SERVED = REGISTRY.register(Counter(
+    "statsscout_sportradar_stale_served_total",
+    "Last good payloads served in place of a failed or rejected Sportradar request.",
+    ("endpoint",)))
+RATE_LIMIT_WAIT = REGISTRY.register(Histogram(
+    "statsscout_rate_limit_wait_seconds",
+    "Time spent sleeping in the client-side rate limiter.",
+    buckets=(0.0, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 5.0, 10.0, 30.0)))
+
+# --- Caches ---
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "statsscout_cache_requests_total",
+    "Cached method lookups by result (hit, miss, stale; shared = joined an in-flight answer).",
+    ("method", "result")))
+
+# --- Observation blobs ---
+BLOB_STORE_PUTS = REGISTRY.register(Counter(
+    "statsscout_blob_store_puts_total",
+    "Large tool observations stored by result (stored, or dedup when the same content was held).",
+    ("result",)))
+BLOB_STORE_BYTES = REGISTRY.register(Gauge(
+    "statsscout_blob_store_bytes",
+    "Bytes of tool observations held in this process's blob store."))
+
+# --- Speculative fetches during approval ---
+SPECULATIVE_REQUESTS = REGISTRY.register(Counter(
+    "statsscout_speculative_requests_total",
+    "Sportradar payloads fetched while a run waited for approval, by result "
+    "(fetched, failed, capped, used by the approved run, expired, wasted when not approved).",
+    ("result",)))
+
+# --- Prefetch ---
+PREFETCH_REQUESTS = REGISTRY.register(Counter(
+    "statsscout_prefetch_requests_total",
+    "Prefetcher lookups by kind (team, player) and result (warmed, cached, failed).",
+    ("kind", "result")))
+PREFETCH_PAUSES = REGISTRY.register(Counter(
+    "statsscout_prefetch_pauses_total",
+    "Times the prefetcher stood down because interactive traffic needed the Sportradar budget."))
+
+# --- Agent ---
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "statsscout_tool_call_seconds",
+    "Agent tool call latency by tool.",
+    ("tool",)))
+AGENT_RUN_SECONDS = REGISTRY.register(Histogram(
+    "statsscout_agent_run_seconds",
+    "Wall-clock duration of /chat agent runs by outcome.",
+    ("outcome",)))
+AGENT_RESUMED_RUNS = REGISTRY.register(Counter(
+    "statsscout_agent_resumed_runs_total",
+    "Agent runs continued from the step that paused for approval instead of re-planning."))
+SSE_FIRST_EVENT_SECONDS = REGISTRY.register(Histogram(
+    "statsscout_sse_first_event_seconds",
+    "Time from /chat request to the first SSE event sent to the client."))
+SSE_ACTIVE_STREAMS = REGISTRY.register(Gauge(
+    "statsscout_sse_active_streams",
+    "Number of /chat SSE streams currently open."))
+
+# --- Gemini budget / admission ---
+GEMINI_REQUESTS = REGISTRY.register(Counter(
+    "statsscout_gemini_requests_total",
+    "LLM calls made against the Gemini budget."))
+GEMINI_TOKENS = REGISTRY.register(Counter(
+    "statsscout_gemini_tokens_total",
+    "Tokens consumed by LLM calls (reported usage, or estimated when unavailable)."))
+GEMINI_BUDGET_WAIT = REGISTRY.register(Histogram(
+    "statsscout_gemini_budget_wait_seconds",
+    "Time LLM calls waited for tokens-per-minute / requests-per-minute headroom."))
+ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "statsscout_admission_queue_depth",
+    "/chat runs waiting for admission."))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "statsscout_admission_wait_seconds",
+    "Time /chat runs spent queued before admission."))
+ADMISSION_SHED = REGISTRY.register(Counter(
+    "statsscout_admission_shed_total",
+    "/chat runs rejected by admission control.",
+    ("reason",)))
+
+
+# Collapse ids and dates so each endpoint is one label value, not one per match.
+_ID_PATTERN = re.compile(r"sr:[a-z_]+:\d+")
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def endpoint_label(endpoint):
+    """e.g. /matches/sr:match:123/summary.json -> /matches/{id}/summary.json"""
+    return _DATE_PATTERN.sub("{date}", _ID_PATTERN.sub("{id}", endpoint))
+
+
+def render():
+    return REGISTRY.render()
@@ -0,0 +1,439 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import metrics
+
+# Local stand-in for the Sportradar Cricket API.
+# Point the client at it with SPORTRADAR_BASE_URL=http://127.0.0.1:8001 and every script,
+# benchmark and the backend itself run without an API key, network access or a live match.
+#   - replays recorded responses (summary_dump.json, match_structure.json, ...)
+#   - simulates live T20 matches progressing ball by ball (deterministic per seed)
+#   - injects latency, 429s and timeouts, configurable at startup or via POST /_mock/faults
+#
+# Run: python mock_sportradar.py --port 8001 --matches 2 --ball-interval 2
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = [os.path.join(BASE_DIR, "summary_dump.json"), os.path.join(BASE_DIR, "match_structure.json")]
+
+# Outcome of one delivery: (runs, is_wicket), weighted roughly like a T20 innings (~8 an over)
+_BALL_OUTCOMES = [(0, False), (1, False), (2, False), (3, False), (4, False), (6, False), (0, True)]
+_BALL_WEIGHTS = [34, 36, 8, 1, 11, 5, 5]
+BALLS_PER_INNINGS = 120
+PLAYERS_PER_TEAM = 11
+
+_HEADER = re.compile(r"Requesting:\s*(\S+)")
+# Some scripts call the client with the real path prefix baked into the base URL
+_PATH_PREFIX = re.compile(r"^/cricket-[a-z]+2/[a-z]{2}(?=/)")
+
+
+def load_fixture(path):
+    """
+    Reads a recorded response. Recordings were captured from the console, so they may be
+    UTF-16 and start with the client's '📡 [Sportradar API] Requesting: <endpoint>' line.
+    Returns (endpoint or None, payload).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        text = raw.decode("utf-16")
+    else:
+        text = raw.decode("utf-8-sig")
+    endpoint = None
+    lines = text.splitlines()
+    while lines and not lines[0].lstrip().startswith(("{", "[")):
+        match = _HEADER.search(lines.pop(0))
+        if match:
+            endpoint = match.group(1)
+    return endpoint, json.loads("\n".join(lines))
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec="seconds")
+
+
+class SimulatedMatch:
+    """
+    A live T20 match. The score is a pure function of (seed, balls bowled), and balls
+    advance with wall-clock time, so every poll sees a consistent, progressing match.
+    """
+    def __init__(self, match_id, home, away, seed, ball_interval, start_ball=0, venue="Wankhede Stadium"):
+        self.match_id = match_id
+        self.home = home  # (competitor id, name)
+        self.away = away
+        self.venue = venue
+        self.ball_interval = ball_interval
+        self.start_ball = start_ball
+        self.started = time.time()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.rosters = {team[0]: self._roster(team) for team in (home, away)}
+        # Per innings: [runs, wickets, legal balls]
+        self.innings = [[0, 0, 0]]
+        self.batting = {}  # player id -> [runs, balls, fours, sixes, out]
+        self.bowling = {}  # player id -> [balls, runs, wickets]
+        self._striker, self._non_striker, self._next_batter = 0, 1, 2
+        self.balls_bowled = 0
+        self.ended = False
+        self.timeline = []  # one event per delivery, ids increasing
+
+    def _roster(self, team):
+        team_id, name = team
+        number = int(team_id.rsplit(":", 1)[-1])
+        roles = ["batsman"] * 5 + ["all_rounder"] * 2 + ["bowler"] * 4
+        return [{"id": f"sr:player:{number * 100 + i}", "name": f"{name} Player {i + 1}", "type": roles[i]}
+                for i in range(PLAYERS_PER_TEAM)]
+
+    def _sides(self):
+        # Home bats first
+        return (self.home, self.away) if len(self.innings) == 1 else (self.away, self.home)
+
+    def _bowl(self):
+        batting_team, fielding_team = self._sides()
+        inn = self.innings[-1]
+        batter = self.rosters[batting_team[0]][self._striker]["id"]
+        bowler = self.rosters[fielding_team[0]][6 + (inn[2] // 6) % 5]["id"]
+        runs, wicket = self._rng.choices(_BALL_OUTCOMES, _BALL_WEIGHTS)[0]
+        self.timeline.append({
+            "id": len(self.timeline) + 1,
+            "type": "ball",
+            "innings_number": len(self.innings),
+            "over_number": inn[2] // 6 + 1,
+            "ball_number": inn[2] % 6 + 1,
+            "runs": runs,
+            "wicket": wicket,
+            "batter_id": batter,
+            "bowler_id": bowler,
+        })
+        inn[0] += runs
+        inn[2] += 1
+        bat = self.batting.setdefault(batter, [0, 0, 0, 0, False])
+        bat[0] += runs
+        bat[1] += 1
+        if runs == 4:
+            bat[2] += 1
+        elif runs == 6:
+            bat[3] += 1
+        bowl = self.bowling.setdefault(bowler, [0, 0, 0])
+        bowl[0] += 1
+        bowl[1] += runs
+        if wicket:
+            inn[1] += 1
+            bowl[2] += 1
+            bat[4] = True
+            self._striker = self._next_batter
+            self._next_batter += 1
+        elif runs % 2 == 1:
+            self._striker, self._non_striker = self._non_striker, self._striker
+        if inn[2] % 6 == 0:
+            self._striker, self._non_striker = self._non_striker, self._striker
+
+        chased = len(self.innings) == 2 and inn[0] > self.innings[0][0]
+        if inn[1] >= 10 or inn[2] >= BALLS_PER_INNINGS or chased:
+            if len(self.innings) == 1:
+                self.innings.append([0, 0, 0])
+                self._striker, self._non_striker, self._next_batter = 0, 1, 2
+            else:
+                self.ended = True
+
+    def advance(self, now=None):
+        """Bowls every ball due by `now`."""
+        now = now or time.time()
+        due = self.start_ball + int((now - self.started) / self.ball_interval)
+        with self._lock:
+            while self.balls_bowled < due and not self.ended:
+                self._bowl()
+                self.balls_bowled += 1
+
+    def _competitors(self):
+        return [{"id": self.home[0], "name": self.home[1], "qualifier": "home"},
+                {"id": self.away[0], "name": self.away[1], "qualifier": "away"}]
+
+    def sport_event(self):
+        return {
+            "id": self.match_id,
+            "scheduled": _iso(self.started),
+            "competitors": self._competitors(),
+            "venue": {"name": self.venue},
+        }
+
+    def status(self):
+        inn = self.innings[-1]
+        status = {"status": "closed" if self.ended else "live", "period_scores": []}
+        for number, (runs, wickets, _) in enumerate(self.innings, start=1):
+            home_batting = number == 1
+            status["period_scores"].append({
+                "type": "inn",
+                "number": number,
+                "home_score": runs if home_batting else 0,
+                "away_score": 0 if home_batting else runs,
+                "home_wickets": wickets if home_batting else 0,
+                "away_wickets": 0 if home_batting else wickets,
+                "display_score": f"{runs}/{wickets}",
+            })
+        if self.ended:
+            first, second = self.innings[0][0], self.innings[1][0]
+            winner = self.away[1] if second > first else self.home[1]
+            status["match_status"] = "ended"
+            status["match_result"] = "Match tied" if first == second else f"{winner} won"
+            return status
+        overs = f"{inn[2] // 6}.{inn[2] % 6}"
+        status["match_status"] = "first_innings_home_team" if len(self.innings) == 1 else "second_innings_away_team"
+        status["display_overs"] = float(overs)
+        status["run_rate"] = round(inn[0] * 6 / inn[2], 2) if inn[2] else 0.0
+        if len(self.innings) == 2:
+            remaining = BALLS_PER_INNINGS - inn[2]
+            needed = self.innings[0][0] + 1 - inn[0]
+            status["required_run_rate"] = round(needed * 6 / remaining, 2) if remaining else None
+        return status
+
+    def summary(self):
+        self.advance()
+        with self._lock:
+            teams = []
+            for team_id, name in (self.home, self.away):
+                players = []
+                for p in self.rosters[team_id]:
+                    stats = {}
+                    if p["id"] in self.batting:
+                        runs, balls, fours, sixes, out = self.batting[p["id"]]
+                        stats["batting"] = {"runs": runs, "balls": balls, "fours": fours, "sixes": sixes,
+                                            "strike_rate": round(runs * 100 / balls, 2) if balls else 0.0}
+                        if out:
+                            stats["batting"]["dismissal"] = {"type": "bowled"}
+                    if p["id"] in self.bowling:
+                        balls, runs, wickets = self.bowling[p["id"]]
+                        stats["bowling"] = {"wickets": wickets, "runs_conceded": runs,
+                                            "overs": float(f"{balls // 6}.{balls % 6}"),
+                                            "economy": round(runs * 6 / balls, 2) if balls else 0.0}
+                    players.append({**p, "statistics": stats})
+                teams.append({"id": team_id, "name": name, "players": players})
+            return {
+                "generated_at": _iso(time.time()),
+                "sport_event": self.sport_event(),
+                "sport_event_status": self.status(),
+                "statistics": {"teams": teams},
+            }
+
+    def timeline_payload(self):
+        self.advance()
+        with self._lock:
+            return {"sport_event": self.sport_event(), "sport_event_status": self.status(), "timeline": list(self.timeline)}
+
+    def schedule_entry(self):
+        self.advance()
+        with self._lock:
+            return {**self.sport_event(), "sport_event_status": {"status": "closed" if self.ended else "live"}}
+
+
+class Faults:
+    """Injected misbehaviour. Rates are probabilities per request (0-1)."""
+    FIELDS = ("latency_ms", "jitter_ms", "error_429_rate", "timeout_rate", "timeout_seconds", "qps")
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_429_rate=0.0, timeout_rate=0.0, timeout_seconds=15.0, qps=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_429_rate = error_429_rate
+        self.timeout_rate = timeout_rate
+        # Longer than the client's 10s timeout, so requests.get raises Timeout
+        self.timeout_seconds = timeout_seconds
+        # Like the trial key's 1 QPS: requests closer together than 1/qps get a 429 (0 = off)
+        self.qps = qps
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency_ms=float(os.getenv("MOCK_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("MOCK_JITTER_MS", "0")),
+            error_429_rate=float(os.getenv("MOCK_429_RATE", "0")),
+            timeout_rate=float(os.getenv("MOCK_TIMEOUT_RATE", "0")),
+            timeout_seconds=float(os.getenv("MOCK_TIMEOUT_SECONDS", "15")),
+            qps=float(os.getenv("MOCK_QPS", "0")),
+        )
+
+    def update(self, values):
+        for key, value in values.items():
+            if key in self.FIELDS:
+                setattr(self, key, float(value))
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+class MockSportradar:
+    """Routes client endpoints to simulated matches and recorded fixtures."""
+    def __init__(self, live_matches=2, ball_interval=5.0, seed=7, fixtures=None, knowledge_path=None):
+        self.fixtures = {}
+        for path in (DEFAULT_FIXTURES if fixtures is None else fixtures):
+            if os.path.exists(path) and os.path.getsize(path):
+                self.add_fixture(*load_fixture(path))
+        self.matches = {}
+        teams = self._teams(knowledge_path or os.path.join(BASE_DIR, "knowledge.json"))
+        for i in range(live_matches):
+            home, away = teams[(2 * i) % len(teams)], teams[(2 * i + 1) % len(teams)]
+            match_id = f"sr:match:{900000 + i}"
+            # Stagger the matches so one is early in the first innings and another deep in a chase
+            self.matches[match_id] = SimulatedMatch(match_id, home, away, seed + i, ball_interval,
+                                                    start_ball=(i * 150) % 230)
+
+    @staticmethod
+    def _teams(knowledge_path):
+        try:
+            with open(knowledge_path, "r", encoding="utf-8") as f:
+                teams = json.load(f).get("teams", {})
+            return [(data["id"], name) for name, data in teams.items() if data.get("id")]
+        except (OSError, ValueError):
+            return [("sr:competitor:4801", "India"), ("sr:competitor:4808", "Sri Lanka")]
+
+    def add_fixture(self, endpoint, payload):
+        if not endpoint:
+            return
+        endpoint = _PATH_PREFIX.sub("", endpoint)
+        # match_structure.json holds a single schedule event rather than the whole schedule
+        if "/schedules/" in endpoint and isinstance(payload, dict) and "sport_events" not in payload:
+            payload = {"sport_events": [payload]}
+        self.fixtures[endpoint] = payload
+
+    def _team(self, team_id):
+        for match in self.matches.values():
+            for team in (match.home, match.away):
+                if team[0] == team_id:
+                    return team, match.rosters[team_id]
+        return None, None
+
+    def _player(self, player_id):
+        for match in self.matches.values():
+            for team_id, roster in match.rosters.items():
+                for p in roster:
+                    if p["id"] == player_id:
+                        return p, team_id
+        return None, None
+
+    def respond(self, endpoint):
+        """Returns (status code, payload) for a client endpoint such as /matches/<id>/summary.json."""
+        endpoint = _PATH_PREFIX.sub("", endpoint)
+        if endpoint == "/schedules/live/schedule.json":
+            events = [m.schedule_entry() for m in self.matches.values()]
+            return 200, {"generated_at": _iso(time.time()), "sport_events": [e for e in events if e["sport_event_status"]["status"] == "live"]}
+
+        match = re.fullmatch(r"/schedules/(\d{4}-\d{2}-\d{2})/schedule\.json", endpoint)
+        if match:
+            events = list(self.fixtures.get(endpoint, {}).get("sport_events", []))
+            events += [m.schedule_entry() for m in self.matches.values()
+                       if m.sport_event()["scheduled"].startswith(match.group(1))]
+            return 200, {"generated_at": _iso(time.time()), "sport_events": events}
+
+        match = re.fullmatch(r"/matches/(sr:match:\d+)/summary\.json", endpoint)
+        if match and match.group(1) in self.matches:
+            return 200, self.matches[match.group(1)].summary()
+
+        match = re.fullmatch(r"/matches/(sr:match:\d+)/timeline\.json", endpoint)
+        if match and match.group(1) in self.matches:
+            return 200, self.matches[match.group(1)].timeline_payload()
+
+        match = re.fullmatch(r"/teams/(sr:competitor:\d+)/profile\.json", endpoint)
+        if match:
+            team, roster = self._team(match.group(1))
+            if team:
+                return 200, {"competitor": {"id": team[0], "name": team[1]}, "players": roster}
+
+        match = re.fullmatch(r"/players/(sr:player:\d+)/profile\.json", endpoint)
+        if match:
+            player, team_id = self._player(match.group(1))
+            if player:
+                rng = random.Random(player["id"])
+                batting_matches = rng.randint(20, 120)
+                return 200, {
+                    "player": {**player, "competitor_id": team_id},
+                    "statistics": {"total": {
+                        "batting": {"matches": batting_matches, "runs": batting_matches * rng.randint(8, 35),
+                                    "average": round(rng.uniform(12, 48), 2), "strike_rate": round(rng.uniform(95, 165), 2)},
+                        "bowling": {"matches": batting_matches, "wickets": rng.randint(0, 140),
+                                    "economy": round(rng.uniform(6, 10), 2), "average": round(rng.uniform(18, 40), 2)},
+                    }},
+                }
+
+        if endpoint in self.fixtures:
+            return 200, self.fixtures[endpoint]
+        return 404, {"message": "Not found"}
+
+
+def create_app(mock=None, faults=None):
+    mock = mock or MockSportradar()
+    faults = faults or Faults.from_env()
+    stats = Counter()
+    last_request = [0.0]
+    app = FastAPI(title="Mock Sportradar Cricket API")
+
+    @app.get("/_mock/stats")
+    async def mock_stats():
+        return {"requests": {f"{endpoint} {status}": n for (endpoint, status), n in sorted(stats.items())},
+                "faults": faults.to_dict()}
+
+    @app.post("/_mock/faults")
+    async def mock_faults(request: Request):
+        faults.update(await request.json())
+        return faults.to_dict()
+
+    @app.post("/_mock/reset")
+    async def mock_reset():
+        stats.clear()
+        return {"status": "ok"}
+
+    @app.get("/{path:path}")
+    async def sportradar(path: str, request: Request):
+        endpoint = "/" + path
+        label = metrics.endpoint_label(_PATH_PREFIX.sub("", endpoint))
+        if not request.query_params.get("api_key"):
+            stats[(label, "403")] += 1
+            return JSONResponse({"message": "Missing api_key"}, status_code=403)
+
+        now = time.monotonic()
+        too_fast = faults.qps and now - last_request[0] < 1.0 / faults.qps
+        last_request[0] = now
+        if too_fast or random.random() < faults.error_429_rate:
+            stats[(label, "429")] += 1
+            return JSONResponse({"message": "Too Many Requests"}, status_code=429)
+        if random.random() < faults.timeout_rate:
+            # The client has given up by the time this answers
+            stats[(label, "timeout")] += 1
+            await asyncio.sleep(faults.timeout_seconds)
+            return JSONResponse({"message": "Gateway Timeout"}, status_code=504)
+        delay = faults.latency_ms + random.uniform(-faults.jitter_ms, faults.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        status, payload = mock.respond(endpoint)
+        stats[(label, str(status))] += 1
+        return JSONResponse(payload, status_code=status)
+
+    app.state.mock = mock
+    app.state.faults = faults
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Sportradar Cricket API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--matches", type=int, default=int(os.getenv("MOCK_LIVE_MATCHES", "2")), help="simulated live matches")
+    parser.add_argument("--ball-interval", type=float, default=float(os.getenv("MOCK_BALL_INTERVAL", "5")), help="seconds per delivery")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--fixture", action="append", help="recorded response file (repeatable); defaults to the bundled dumps")
+    args = parser.parse_args()
+
+    mock = MockSportradar(args.matches, args.ball_interval, args.seed, fixtures=args.fixture)
+    print(f"Mock Sportradar on http://{args.host}:{args.port} "
+          f"({len(mock.matches)} live matches, {len(mock.fixtures)} recorded fixtures)")
+    print(f"Use it with: SPORTRADAR_BASE_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(mock), host=args.host, port=args.port)
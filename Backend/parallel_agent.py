@@ -0,0 +1,157 @@
+import re
+import json
+import functools
+from typing import List, Tuple, Union
+from langchain.agents.agent import MultiActionAgentOutputParser, RunnableMultiActionAgent
+from langchain.tools.render import render_text_description_and_args
+from langchain_core.tools import StructuredTool
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnablePassthrough
+import tracing
+from resumable_executor import ResumableAgentExecutor
+
+# Parallel agent mode (AGENT_MODE=parallel).
+# The ReAct agent can only run one tool per Gemini turn, so "compare India and Sri Lanka"
+# costs one round trip per team. Here the model may return a LIST of tool calls in one turn;
+# AgentExecutor runs them concurrently (asyncio.gather) and every observation is merged into
+# the scratchpad before the next turn.
+# langchain-google-genai 1.0.1 only surfaces the first functionCall part of a Gemini
+# response, so the batch is expressed as a JSON list instead of native function calls.
+
+FORMAT_INSTRUCTIONS = """Use a json blob to call tools. Each call has an "action" key (tool name) and an "action_input" key (tool input).
+
+Valid "action" values: "Final Answer" or {tool_names}
+
+When you need several INDEPENDENT lookups (e.g. scouting notes for both teams, stats for two players),
+put all of them in ONE list. They run at the same time and you get every result back together:
+
+```
+[
+  {{"action": $TOOL_NAME, "action_input": $INPUT}},
+  {{"action": $TOOL_NAME, "action_input": $INPUT}}
+]
+```
+
+Only batch calls that do not depend on each other's results. A single call can be a list of one.
+
+Follow this format:
+
+Question: input question to answer
+Thought: consider previous and subsequent steps
+Action:
+```
+$JSON_LIST
+```
+Observation: results of every call in the list
+... (repeat Thought/Action/Observation N times)
+Thought: I know what to respond
+Action:
+```
+{{"action": "Final Answer", "action_input": "Final response to human"}}
+```"""
+
+SUFFIX = """Begin! Reminder to ALWAYS respond with a valid json blob. Batch independent tool calls into one list. Format is Action:```$JSON_LIST```then Observation:.
+Thought:"""
+
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+class ParallelActionOutputParser(MultiActionAgentOutputParser):
+    """Parses a single tool call, a list of tool calls, or a Final Answer."""
+
+    def parse(self, text: str) -> Union[List[AgentAction], AgentFinish]:
+        match = _JSON_BLOCK.search(text)
+        if not match:
+            # No json blob: the model answered directly
+            return AgentFinish({"output": text}, text)
+        try:
+            calls = json.loads(match.group(1).strip())
+        except json.JSONDecodeError as e:
+            raise OutputParserException(f"Could not parse LLM output: {text}") from e
+        if isinstance(calls, dict):
+            calls = [calls]
+        if not isinstance(calls, list) or not calls:
+            raise OutputParserException(f"Expected a json blob or list of json blobs: {text}")
+
+        actions = []
+        final_answer = None
+        for call in calls:
+            if not isinstance(call, dict) or "action" not in call:
+                raise OutputParserException(f"Each call needs an 'action' key: {text}")
+            if call["action"] == "Final Answer":
+                final_answer = call.get("action_input", "")
+            else:
+                actions.append(AgentAction(call["action"], call.get("action_input", {}), text))
+        # Tool calls win over a premature Final Answer in the same batch
+        if actions:
+            return actions
+        return AgentFinish({"output": final_answer}, text)
+
+    @property
+    def _type(self) -> str:
+        return "parallel-structured-chat"
+
+
+def format_scratchpad(intermediate_steps: List[Tuple[AgentAction, str]]) -> str:
+    """
+    Every action of one batch carries the same log, so the model's turn is written
+    once followed by all of its observations.
+    """
+    thoughts = ""
+    last_log = None
+    for action, observation in intermediate_steps:
+        if action.log != last_log:
+            if last_log is not None:
+                thoughts += "\nThought: "
+            thoughts += action.log
+            last_log = action.log
+        thoughts += f"\nObservation ({action.tool} {json.dumps(action.tool_input)}): {observation}"
+    if intermediate_steps:
+        thoughts += "\nThought: "
+    return thoughts
+
+
+def _traced(tool):
+    """
+    Copies a sync tool so its thread attaches Sportradar/cache spans to its own tool span.
+    With several tools in flight the trace cannot tell them apart otherwise.
+    """
+    func = tool.func
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        with tracing.tool_scope(tool.name):
+            return func(*args, **kwargs)
+
+    return StructuredTool(name=tool.name, description=tool.description, args_schema=tool.args_schema,
+                          func=run, return_direct=tool.return_direct)
+
+
+def create_parallel_agent_executor(llm, tools, system_prompt, verbose=False):
+    tools = [_traced(t) if getattr(t, "func", None) else t for t in tools]
+    tool_names = ", ".join(f'"{t.name}"' for t in tools)
+    system = "\n\n".join([
+        system_prompt,
+        render_text_description_and_args(tools),
+        FORMAT_INSTRUCTIONS.format(tool_names=tool_names),
+        SUFFIX,
+    ])
+    prompt = ChatPromptTemplate.from_messages([
+        # Literal braces (json examples, tool schemas) must not be read as template variables
+        ("system", system.replace("{", "{{").replace("}", "}}")),
+        ("human", "{input}\n\n{agent_scratchpad}"),
+    ])
+    runnable = (
+        RunnablePassthrough.assign(agent_scratchpad=lambda x: format_scratchpad(x["intermediate_steps"]))
+        | prompt
+        | llm.bind(stop=["\nObservation"])
+        | ParallelActionOutputParser()
+    )
+    return ResumableAgentExecutor(
+        agent=RunnableMultiActionAgent(runnable=runnable),
+        tools=tools,
+        verbose=verbose,
+        handle_parsing_errors=True,
+    )
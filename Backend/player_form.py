@@ -0,0 +1,135 @@
+import os
+import bisect
+import threading
+from collections import OrderedDict
+
+# Rolling player form from finished matches.
+# Career totals (fetch_player_career_stats) say little about current form. Every closed match
+# summary the client hands out is folded into per-player windows of the last PLAYER_FORM_INNINGS
+# batting innings and bowling spells, each with running sums that are adjusted as an innings
+# enters or leaves the window. A form query is a dict lookup plus a few divisions, however
+# many matches have been seen. Each match is ingested once.
+
+PLAYER_FORM_INNINGS = int(os.getenv("PLAYER_FORM_INNINGS", "10"))
+PLAYERS_TRACKED = 2000
+MATCHES_REMEMBERED = 1024  # ids of ingested matches, so re-reads of a summary are skipped
+
+FINISHED_STATUSES = ("closed", "ended")
+
+
+def _overs_to_balls(overs):
+    # 3.2 overs = 3 overs and 2 balls
+    overs = float(overs)
+    whole = int(overs)
+    return whole * 6 + round((overs - whole) * 10)
+
+
+class _Window:
+    """
+    The latest `size` entries (by match start time) of fixed-width number tuples, with the
+    column sums kept up to date on insert and eviction.
+    """
+    __slots__ = ("size", "keys", "entries", "sums")
+
+    def __init__(self, size, width):
+        self.size = size
+        self.keys = []  # (match start, match id), ascending
+        self.entries = []
+        self.sums = [0] * width
+
+    def add(self, key, entry):
+        if len(self.keys) >= self.size and key < self.keys[0]:
+            return  # older than everything already in a full window
+        i = bisect.bisect(self.keys, key)
+        self.keys.insert(i, key)
+        self.entries.insert(i, entry)
+        for col, value in enumerate(entry):
+            self.sums[col] += value
+        if len(self.keys) > self.size:
+            self.keys.pop(0)
+            for col, value in enumerate(self.entries.pop(0)):
+                self.sums[col] -= value
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PlayerForm:
+    __slots__ = ("player_id", "name", "team", "batting", "bowling")
+
+    # Batting entry: (runs, balls, dismissals, fours, sixes); bowling entry: (balls, runs conceded, wickets)
+    def __init__(self, player_id, innings):
+        self.player_id = player_id
+        self.name = None
+        self.team = None
+        self.batting = _Window(innings, 5)
+        self.bowling = _Window(innings, 3)
+
+    def to_dict(self):
+        result = {"playerId": self.player_id, "name": self.name, "team": self.team}
+        if len(self.batting):
+            runs, balls, outs, fours, sixes = self.batting.sums
+            result["batting"] = {
+                "innings": len(self.batting),
+                "runs": runs,
+                "average": round(runs / outs, 2) if outs else None,  # None: not out in every innings
+                "strikeRate": round(runs * 100 / balls, 2) if balls else None,
+                "boundaryPercent": round((fours + sixes) * 100 / balls, 2) if balls else None,  # balls hit for 4 or 6
+            }
+        if len(self.bowling):
+            balls, runs, wickets = self.bowling.sums
+            result["bowling"] = {
+                "spells": len(self.bowling),
+                "wickets": wickets,
+                "economy": round(runs * 6 / balls, 2) if balls else None,
+            }
+        return result
+
+
+class FormEngine:
+    def __init__(self, innings=PLAYER_FORM_INNINGS, players_tracked=PLAYERS_TRACKED):
+        self.innings = innings
+        self.players_tracked = players_tracked
+        self._lock = threading.Lock()
+        self._players = OrderedDict()  # player id -> PlayerForm, least recently updated first
+        self._ingested = OrderedDict()  # match id -> None
+
+    def observe(self, summary):
+        """Folds a finished MatchSummary into its players' form. Returns False if skipped (unfinished or seen)."""
+        if summary is None or summary.status not in FINISHED_STATUSES or not summary.id:
+            return False
+        with self._lock:
+            if summary.id in self._ingested:
+                return False
+            self._ingested[summary.id] = None
+            while len(self._ingested) > MATCHES_REMEMBERED:
+                self._ingested.popitem(last=False)
+            key = (summary.scheduled or "", summary.id)
+            for line in summary.players:
+                batted = line.balls is not None
+                bowled = line.overs is not None
+                if not line.id or not (batted or bowled):
+                    continue
+                form = self._players.get(line.id)
+                if form is None:
+                    form = self._players[line.id] = PlayerForm(line.id, self.innings)
+                self._players.move_to_end(line.id)
+                form.name = line.name
+                form.team = line.team
+                if batted:
+                    form.batting.add(key, (line.runs or 0, line.balls or 0, 1 if line.dismissed else 0,
+                                           line.fours or 0, line.sixes or 0))
+                if bowled:
+                    form.bowling.add(key, (_overs_to_balls(line.overs), line.runs_conceded or 0, line.wickets or 0))
+            while len(self._players) > self.players_tracked:
+                self._players.popitem(last=False)
+        return True
+
+    def form(self, player_id):
+        """Form dict for a player (see PlayerForm.to_dict), or None if no finished match of theirs was seen."""
+        with self._lock:
+            form = self._players.get(player_id)
+            return form.to_dict() if form is not None else None
+
+
+form_engine = FormEngine()
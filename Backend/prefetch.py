@@ -0,0 +1,114 @@
+import os
+import time
+import threading
+import log
+import metrics
+from sportradar_client import SportradarClient, background_requests
+from schedule_index import schedule_index
+from quota_ledger import ledger as quota_ledger
+
+# Predictive prefetch for matches about to start.
+# The first "who will win?" for a new match pays for both team profiles and any player profiles
+# through the 1.2s rate limiter. This background thread reads upcoming fixtures from the schedule
+# index and warms those caches (and the knowledge base's player name -> id mappings) ahead of
+# start time, using only spare capacity: it stands down whenever an agent run is active or an
+# interactive Sportradar request was queued or made within PREFETCH_QUIET_SECONDS, and pauses
+# entirely while the monthly quota is low (quota_ledger.py).
+
+logger = log.get_logger("prefetch")
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() != "false"
+PREFETCH_LOOKAHEAD_MINUTES = float(os.getenv("PREFETCH_LOOKAHEAD_MINUTES", "120"))
+PREFETCH_QUIET_SECONDS = float(os.getenv("PREFETCH_QUIET_SECONDS", "5"))
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "60"))
+PREFETCH_PLAYERS_PER_TEAM = int(os.getenv("PREFETCH_PLAYERS_PER_TEAM", "11"))
+# Profiles fetched more recently than this are considered warm
+PREFETCH_MAX_AGE = float(os.getenv("PREFETCH_MAX_AGE", "21600"))
+
+
+class _Stopped(Exception):
+    pass
+
+
+class Prefetcher:
+    def __init__(self, client, index=schedule_index, busy=None, lookahead_minutes=PREFETCH_LOOKAHEAD_MINUTES,
+                 quiet_seconds=PREFETCH_QUIET_SECONDS, interval=PREFETCH_INTERVAL,
+                 players_per_team=PREFETCH_PLAYERS_PER_TEAM, max_age=PREFETCH_MAX_AGE):
+        self.client = client
+        self.index = index
+        self.busy = busy or (lambda: False)  # e.g. "an agent run is in progress"
+        self.lookahead = lookahead_minutes * 60
+        self.quiet_seconds = quiet_seconds
+        self.interval = interval
+        self.players_per_team = players_per_team
+        self.max_age = max_age
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except _Stopped:
+                break
+            except Exception as e:
+                logger.warning("prefetch.failed", "Prefetch failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def _wait_for_capacity(self):
+        """Blocks until interactive traffic leaves the budget alone. Raises _Stopped on shutdown."""
+        paused = False
+        while not self._stop.is_set():
+            if not self.busy() and self.client.is_idle(self.quiet_seconds):
+                return
+            if not paused:
+                metrics.PREFETCH_PAUSES.inc()
+                paused = True
+            self._stop.wait(0.5)
+        raise _Stopped()
+
+    def _warm(self, kind, method, key):
+        """Cached payload for method(key), fetched with spare capacity if missing or older than max_age."""
+        age = method.age(self.client, key)
+        if age is not None and age <= self.max_age:
+            metrics.PREFETCH_REQUESTS.inc(kind=kind, result="cached")
+            return method.refresh(self.client, key, max_age=self.max_age)
+        self._wait_for_capacity()
+        payload = method.refresh(self.client, key, max_age=self.max_age)
+        metrics.PREFETCH_REQUESTS.inc(kind=kind, result="warmed" if payload else "failed")
+        return payload
+
+    def run_once(self, now=None):
+        """Warms the teams and players of every match starting within the lookahead. Returns the match count."""
+        now = now or time.time()
+        if quota_ledger.degraded("pause_prefetch"):
+            return 0
+        with background_requests():
+            self._wait_for_capacity()
+            self.index.sync(self.client, now)
+            # A few minutes back too: kick-offs run late and the status may not have flipped yet
+            upcoming = self.index.query("upcoming", start=now - 600, end=now + self.lookahead)
+            rosters = []
+            for event in upcoming:
+                for team in event.event.competitors:
+                    profile = self._warm("team", SportradarClient.get_team_profile, team.id)
+                    if not profile:
+                        continue
+                    roster = profile.get('players', [])
+                    rosters.append({"players": roster})
+                    for player in roster[:self.players_per_team]:
+                        if player.get('id'):
+                            self._warm("player", SportradarClient.get_player_profile, player['id'])
+        if rosters:
+            # Name -> id mappings so fetch_player_career_stats resolves names without scanning rosters
+            from tools import harvest_player_ids
+            harvest_player_ids(rosters)
+        return len(upcoming)
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+import log
+import metrics
+from shared_store import shared_store
+
+# Persistent Sportradar call ledger.
+# Trial keys have a hard monthly call quota. Every HTTP call the client makes is counted here
+# per endpoint and per day, persisted to QUOTA_LEDGER_PATH so restarts don't forget it, and
+# projected to month end from the month's burn rate. As the budget runs low the ledger moves
+# to a degrade level, and each degrade action switches on at its configured level.
+# With SHARED_STORE_PATH set, every worker counts into the shared store instead of its own file
+# (workers rewriting one file would keep only the last writer's counts): calls are added there
+# as increments on each flush, and the month's totals are read back at least every
+# FLUSH_EVERY_SECONDS. The ledger file's counts seed the shared store once.
+
+logger = log.get_logger("quota")
+
+SPORTRADAR_MONTHLY_QUOTA = int(os.getenv("SPORTRADAR_MONTHLY_QUOTA", "1000"))
+# Empty = in memory only
+QUOTA_LEDGER_PATH = os.getenv("QUOTA_LEDGER_PATH", os.path.join(os.path.dirname(__file__), "quota_ledger.json"))
+QUOTA_CONSERVE_AT = float(os.getenv("QUOTA_CONSERVE_AT", "0.75"))  # fraction of the quota used
+QUOTA_CRITICAL_AT = float(os.getenv("QUOTA_CRITICAL_AT", "0.9"))
+# Live summaries are re-fetched this many times less often while slow_live_polls is on
+QUOTA_LIVE_POLL_FACTOR = float(os.getenv("QUOTA_LIVE_POLL_FACTOR", "4"))
+FLUSH_EVERY_CALLS = 10
+FLUSH_EVERY_SECONDS = 30.0
+
+LEVELS = ("normal", "conserve", "critical", "exhausted")
+
+# Degrade action -> level from which it applies ("off" disables it).
+# Override with QUOTA_DEGRADE_<ACTION>, e.g. QUOTA_DEGRADE_SERVE_STALE=conserve.
+DEGRADE_ACTIONS = {
+    "pause_prefetch": "conserve",          # no predictive prefetch (prefetch.py)
+    "skip_recent_enrichment": "conserve",  # /api/match-list: no score lookups for completed matches
+    "slow_live_polls": "conserve",         # live refresh max age x QUOTA_LIVE_POLL_FACTOR
+    "serve_stale": "critical",             # refreshes return the cached copy, marked stale
+}
+
+
+def _degrade_config():
+    config = {}
+    for action, default in DEGRADE_ACTIONS.items():
+        level = os.getenv(f"QUOTA_DEGRADE_{action.upper()}", default).lower()
+        config[action] = level if level in LEVELS else "off"
+    return config
+
+
+class QuotaLedger:
+    def __init__(self, quota=SPORTRADAR_MONTHLY_QUOTA, path=QUOTA_LEDGER_PATH,
+                 conserve_at=QUOTA_CONSERVE_AT, critical_at=QUOTA_CRITICAL_AT, shared=shared_store):
+        self.quota = quota
+        self.path = path or None
+        self.shared = shared
+        self.conserve_at = conserve_at
+        self.critical_at = critical_at
+        self.actions = _degrade_config()
+        self._lock = threading.Lock()
+        self._month = None
+        self._by_endpoint = {}
+        self._by_day = {}
+        self._unflushed = 0
+        self._flushed_at = time.monotonic()
+        # With the shared store: calls not added there yet, {(month, kind, name): calls}
+        self._pending = {}
+        self._load()
+        if self.shared is not None:
+            month = datetime.now().strftime("%Y-%m")
+            if self._month == month:
+                seed = {(month, "endpoint", e): n for e, n in self._by_endpoint.items()}
+                seed.update({(month, "day", d): n for d, n in self._by_day.items()})
+                self.shared.add_quota_calls(seed, seed_month=month)
+            self.flush()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._month = data.get("month")
+            self._by_endpoint = dict(data.get("byEndpoint", {}))
+            self._by_day = dict(data.get("byDay", {}))
+        except (OSError, ValueError) as e:
+            logger.error("quota.load_failed", "Error loading quota ledger: %s", e)
+
+    def _roll_month(self, now):
+        # Quotas reset monthly; counts from a previous month are dropped
+        month = now.strftime("%Y-%m")
+        if self._month != month:
+            self._month = month
+            self._by_endpoint = {}
+            self._by_day = {}
+
+    def record(self, endpoint, calls=1):
+        """Counts `calls` HTTP calls to `endpoint` (a metrics.endpoint_label)."""
+        now = datetime.now()
+        with self._lock:
+            self._roll_month(now)
+            self._by_endpoint[endpoint] = self._by_endpoint.get(endpoint, 0) + calls
+            day = now.strftime("%Y-%m-%d")
+            self._by_day[day] = self._by_day.get(day, 0) + calls
+            if self.shared is not None:
+                for key in ((self._month, "endpoint", endpoint), (self._month, "day", day)):
+                    self._pending[key] = self._pending.get(key, 0) + calls
+            self._unflushed += calls
+            due = (self._unflushed >= FLUSH_EVERY_CALLS
+                   or time.monotonic() - self._flushed_at >= FLUSH_EVERY_SECONDS)
+            used = sum(self._by_day.values())
+        metrics.SPORTRADAR_QUOTA_USED.set(used)
+        if due:
+            self.flush()
+
+    def flush(self):
+        if self.shared is not None:
+            self._sync_shared()
+            return
+        if not self.path:
+            return
+        with self._lock:
+            data = {"month": self._month, "byEndpoint": dict(self._by_endpoint), "byDay": dict(self._by_day)}
+            self._unflushed = 0
+            self._flushed_at = time.monotonic()
+        try:
+            # Write then rename, so a crash mid-write never leaves a truncated ledger
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error("quota.save_failed", "Error saving quota ledger: %s", e)
+
+    def _sync_shared(self):
+        # Adds this worker's new calls to the shared counts, then reads every worker's totals
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._unflushed = 0
+            self._flushed_at = time.monotonic()
+            month = self._month or datetime.now().strftime("%Y-%m")
+        if pending and not self.shared.add_quota_calls(pending):
+            with self._lock:
+                for key, calls in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + calls
+            return
+        totals = self.shared.quota_calls(month)
+        if totals is None:
+            return
+        with self._lock:
+            if self._month != month:
+                return
+            by_endpoint, by_day = totals
+            # Calls recorded while the totals were read are not in them yet
+            for (m, kind, name), calls in self._pending.items():
+                if m == month:
+                    counts = by_endpoint if kind == "endpoint" else by_day
+                    counts[name] = counts.get(name, 0) + calls
+            self._by_endpoint, self._by_day = by_endpoint, by_day
+            used = sum(by_day.values())
+        metrics.SPORTRADAR_QUOTA_USED.set(used)
+
+    def _usage(self, now):
+        if self.shared is not None and time.monotonic() - self._flushed_at >= FLUSH_EVERY_SECONDS:
+            # Other workers' calls count too
+            self._sync_shared()
+        with self._lock:
+            self._roll_month(now)
+            return dict(self._by_endpoint), dict(self._by_day)
+
+    @staticmethod
+    def _projection(now, used):
+        """(burn rate per day, projected month-end total, start of next month)."""
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        elapsed_days = (now - month_start).total_seconds() / 86400
+        # Month-to-date burn rate; at least one day so a busy first hour doesn't project wildly
+        burn_rate = used / max(elapsed_days, 1.0)
+        projected = used + burn_rate * ((next_month - month_start).days - elapsed_days)
+        return burn_rate, projected, next_month
+
+    def snapshot(self, now=None):
+        now = now or datetime.now()
+        by_endpoint, by_day = self._usage(now)
+        used = sum(by_day.values())
+        burn_rate, projected, next_month = self._projection(now, used)
+        exhausts_on = None
+        if burn_rate > 0:
+            exhausts_at = now + timedelta(days=max(self.quota - used, 0) / burn_rate)
+            if exhausts_at < next_month:
+                exhausts_on = exhausts_at.strftime("%Y-%m-%d")
+        level = self._level(used, projected)
+        return {
+            "month": now.strftime("%Y-%m"),
+            "quota": self.quota,
+            "used": used,
+            "remaining": max(self.quota - used, 0),
+            "burnRatePerDay": round(burn_rate, 2),
+            "projectedMonthEnd": round(projected),
+            "exhaustsOn": exhausts_on,
+            "level": level,
+            "degraded": [a for a in self.actions if self._applies(a, level)],
+            "actions": dict(self.actions),
+            "byEndpoint": dict(sorted(by_endpoint.items(), key=lambda kv: -kv[1])),
+            "byDay": dict(sorted(by_day.items())),
+        }
+
+    def _level(self, used, projected):
+        if self.quota <= 0:
+            return "normal"
+        if used >= self.quota:
+            return "exhausted"
+        if used >= self.quota * self.critical_at:
+            return "critical"
+        if used >= self.quota * self.conserve_at or projected > self.quota:
+            return "conserve"
+        return "normal"
+
+    def _applies(self, action, level):
+        threshold = self.actions.get(action, "off")
+        return threshold != "off" and LEVELS.index(level) >= LEVELS.index(threshold)
+
+    def level(self):
+        now = datetime.now()
+        used = sum(self._usage(now)[1].values())
+        return self._level(used, self._projection(now, used)[1])
+
+    def degraded(self, action):
+        """True while `action` (a DEGRADE_ACTIONS key) is in effect."""
+        return self._applies(action, self.level())
+
+    def live_poll_factor(self):
+        return QUOTA_LIVE_POLL_FACTOR if self.degraded("slow_live_polls") else 1.0
+
+
+ledger = QuotaLedger()
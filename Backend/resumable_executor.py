@@ -0,0 +1,60 @@
+import asyncio
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction
+import metrics
+from agent_runs import PausedRun, resume_from
+from tools import ApprovalRequiredException
+
+# AgentExecutor for runs that pause at an approval gate and resume there (see agent_runs.py).
+# Kept apart from agent_runs so main.py can hold paused runs without importing LangChain at startup.
+
+
+class ResumableAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor whose runs can pause at an approval gate and be resumed (see resume_from).
+    Only the async path (ainvoke) is resumable.
+    """
+
+    async def _atake_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        paused = resume_from.get()
+        if paused is not None and not intermediate_steps:
+            # First step of a resumed run: no planning. The step's output is the paused run's
+            # history plus the gated calls, now run again with approval; _acall appends it to its
+            # (empty) intermediate_steps and the next step plans from there.
+            resume_from.set(None)
+            metrics.AGENT_RESUMED_RUNS.inc()
+            try:
+                results = await asyncio.gather(*[
+                    self._arun_action(action, name_to_tool_map, color_mapping, run_manager) for action in paused.pending
+                ])
+            except ApprovalRequiredException as e:
+                e.paused_run = paused  # still not approved: stays paused at the same step
+                raise
+            return list(paused.steps) + results
+
+        # Same as AgentExecutor._atake_next_step, keeping the actions of a step that hits the gate
+        outputs = []
+        try:
+            async for output in self._aiter_next_step(name_to_tool_map, color_mapping, inputs,
+                                                      intermediate_steps, run_manager):
+                outputs.append(output)
+        except ApprovalRequiredException as e:
+            pending = [o for o in outputs if isinstance(o, AgentAction)]
+            e.paused_run = PausedRun(dict(inputs), list(intermediate_steps), pending, e.action_description)
+            raise
+        return self._consume_next_step(outputs)
+
+    async def _arun_action(self, action, name_to_tool_map, color_mapping, run_manager):
+        if run_manager:
+            await run_manager.on_agent_action(action, verbose=self.verbose, color="green")
+        tool = name_to_tool_map.get(action.tool)
+        if tool is None:
+            return action, f"{action.tool} is not a valid tool."
+        observation = await tool.arun(
+            action.tool_input,
+            verbose=self.verbose,
+            color=color_mapping[action.tool],
+            callbacks=run_manager.get_child() if run_manager else None,
+            **self.agent.tool_run_logging_kwargs(),
+        )
+        return action, observation
@@ -0,0 +1,232 @@
+import os
+import json
+import base64
+import time
+import bisect
+import itertools
+import threading
+from datetime import datetime, timedelta
+from data_versions import data_versions
+
+# Multi-day schedule index behind /api/match-list.
+# Holds the daily schedules for a window of days around today. Days in the past whose matches
+# have all finished are settled and never fetched again; today, future days and past days with
+# unfinished matches are re-fetched once they are older than SCHEDULE_MUTABLE_MAX_AGE.
+# Events are kept sorted by start time per list ("upcoming", "recent") so range queries bisect,
+# and team/tournament/status filters read precomputed id sets instead of scanning.
+
+# Window: today plus this many days back / ahead (the defaults match the old today + yesterday)
+SCHEDULE_PAST_DAYS = int(os.getenv("SCHEDULE_PAST_DAYS", "1"))
+SCHEDULE_FUTURE_DAYS = int(os.getenv("SCHEDULE_FUTURE_DAYS", "0"))
+SCHEDULE_MUTABLE_MAX_AGE = float(os.getenv("SCHEDULE_MUTABLE_MAX_AGE", "300"))
+
+RECENT_STATUSES = ("closed", "ended", "postponed")
+UPCOMING_STATUSES = ("not_started", "scheduled")
+
+
+def _timestamp(iso):
+    # e.g. 2026-02-19T21:30:00+00:00 (Z if present)
+    try:
+        return datetime.fromisoformat(iso.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class IndexedEvent:
+    """A schedule event with the status and list ("upcoming"/"recent") the dashboard shows."""
+    __slots__ = ("event", "start", "status", "kind")
+
+    def __init__(self, event, now):
+        self.event = event
+        self.start = _timestamp(event.scheduled)
+        status = event.status
+        # Determine Status if missing: assume ended if in past
+        if not status or status == 'Unknown':
+            if self.start is None:
+                status = 'scheduled'  # Fallback
+            else:
+                status = 'ended' if self.start < now else 'not_started'
+        self.status = status
+        if status in RECENT_STATUSES:
+            self.kind = "recent"
+        elif status in UPCOMING_STATUSES:
+            self.kind = "upcoming"
+        else:
+            self.kind = None  # e.g. live: shown from the live schedule instead
+
+    def sort_key(self):
+        """(start timestamp, id): unique, so it doubles as a pagination cursor."""
+        return (self.start if self.start is not None else float("-inf"), self.event.id)
+
+    def to_item(self):
+        return {
+            "id": self.event.id,
+            "team1": self.event.team1,
+            "team2": self.event.team2,
+            "status": self.status,
+            "startTime": self.event.scheduled,
+            "type": self.kind or "scheduled",
+            "score": "",
+            "result": ""
+        }
+
+
+class _DaySchedule:
+    __slots__ = ("events", "fetched_at", "settled", "state")
+
+    def __init__(self, events, fetched_at, settled, version):
+        self.events = events
+        self.fetched_at = fetched_at
+        self.settled = settled
+        # The payload's data version and the statuses shown (some derived from the clock):
+        # the indexes only need rebuilding when either moved
+        self.state = (version, tuple(e.status for e in events))
+
+
+class ScheduleIndex:
+    def __init__(self, past_days=SCHEDULE_PAST_DAYS, future_days=SCHEDULE_FUTURE_DAYS,
+                 mutable_max_age=SCHEDULE_MUTABLE_MAX_AGE):
+        self.past_days = past_days
+        self.future_days = future_days
+        self.mutable_max_age = mutable_max_age
+        self._lock = threading.Lock()
+        self._days = {}  # YYYY-MM-DD -> _DaySchedule
+        self._built_from = None  # (date, state) of the days the index was built from
+        self._by_id = {}
+        # kind -> (sort keys, events) sorted ascending by (start, id); events without a start time sort first
+        self._sorted = {"upcoming": ([], []), "recent": ([], [])}
+        self._by_team = {}  # team id / lowercased name -> event ids
+        self._by_tournament = {}  # tournament id / lowercased name -> event ids
+        self._by_status = {}  # status -> event ids
+
+    def window(self, now=None):
+        today = datetime.fromtimestamp(now or time.time())
+        return [(today + timedelta(days=d)).strftime("%Y-%m-%d")
+                for d in range(-self.past_days, self.future_days + 1)]
+
+    def sync(self, client, now=None):
+        """
+        Fetches the days of the window the index does not hold yet and re-fetches mutable days
+        older than mutable_max_age, then rebuilds the indexes if anything changed. Blocking.
+        """
+        now = now or time.time()
+        today = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        window = self.window(now)
+        with self._lock:
+            held = dict(self._days)
+        days = {}
+        for date in window:
+            day = held.get(date)
+            if day is not None and (day.settled or now - day.fetched_at < self.mutable_max_age):
+                days[date] = day
+                continue
+            source = client.get_daily_matches(date, max_age=self.mutable_max_age)
+            if source is None:
+                if day is not None:
+                    days[date] = day  # keep the last good schedule
+                continue
+            # Re-derived even when the payload is unchanged: missing statuses come from the clock
+            events = [IndexedEvent(e, now) for e in source]
+            settled = date < today and all(e.kind == "recent" for e in events)
+            days[date] = _DaySchedule(events, now, settled, data_versions.current(f"get_daily_schedule:{date}"))
+        with self._lock:
+            self._days = days
+            built_from = tuple((date, day.state) for date, day in sorted(days.items()))
+            if built_from != self._built_from:
+                self._rebuild(days)
+                self._built_from = built_from
+
+    def _rebuild(self, days):
+        by_id = {}
+        # Later days win on duplicate ids (matches spanning midnight appear on both)
+        for date in sorted(days):
+            for e in days[date].events:
+                by_id[e.event.id] = e
+        by_team, by_tournament, by_status = {}, {}, {}
+        lists = {"upcoming": [], "recent": []}
+        for match_id, e in by_id.items():
+            if len(e.event.competitors) < 2:
+                continue
+            if e.kind in lists:
+                lists[e.kind].append(e)
+            for c in e.event.competitors:
+                for key in (c.id, (c.name or "").lower()):
+                    if key:
+                        by_team.setdefault(key, set()).add(match_id)
+            t = e.event.tournament
+            if t:
+                for key in (t.id, (t.name or "").lower()):
+                    if key:
+                        by_tournament.setdefault(key, set()).add(match_id)
+            by_status.setdefault(e.status, set()).add(match_id)
+        self._sorted = {}
+        for kind, events in lists.items():
+            events.sort(key=IndexedEvent.sort_key)
+            self._sorted[kind] = ([e.sort_key() for e in events], events)
+        self._by_id = by_id
+        self._by_team = by_team
+        self._by_tournament = by_tournament
+        self._by_status = by_status
+
+    def get(self, match_id):
+        with self._lock:
+            return self._by_id.get(match_id)
+
+    def query(self, kind, team=None, tournament=None, status=None, start=None, end=None, exclude=(),
+              after=None, limit=None):
+        """
+        Events of `kind` ("upcoming" soonest first, "recent" latest first) starting in
+        [start, end) (timestamps), optionally restricted to a team, tournament or status
+        (ids or names, case-insensitive). `after` is the sort_key() of the last event of the
+        previous page; at most `limit` events are returned.
+        """
+        with self._lock:
+            keys, events = self._sorted.get(kind, ([], []))
+            lo = bisect.bisect_left(keys, (start,)) if start is not None else 0
+            hi = bisect.bisect_left(keys, (end,)) if end is not None else len(events)
+            if after is not None:
+                if kind == "recent":
+                    hi = min(hi, bisect.bisect_left(keys, after))
+                else:
+                    lo = max(lo, bisect.bisect_right(keys, after))
+            allowed = None
+            for index, key in ((self._by_team, team), (self._by_tournament, tournament), (self._by_status, status)):
+                if key:
+                    ids = index.get(key, index.get(key.lower(), set()))
+                    allowed = ids if allowed is None else allowed & ids
+        selected = range(hi - 1, lo - 1, -1) if kind == "recent" else range(lo, hi)
+        matching = (events[i] for i in selected
+                    if (allowed is None or events[i].event.id in allowed) and events[i].event.id not in exclude)
+        return list(itertools.islice(matching, limit))
+
+
+def encode_cursor(kind, event):
+    """Opaque page cursor pointing after `event` in the `kind` list."""
+    start, match_id = event.sort_key()
+    raw = json.dumps([kind, None if start == float("-inf") else start, match_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(kind, sort key) of a cursor from encode_cursor. Raises ValueError if malformed."""
+    try:
+        kind, start, match_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if kind not in ("upcoming", "recent") or not isinstance(match_id, str):
+        raise ValueError("Invalid cursor")
+    return kind, (float("-inf") if start is None else float(start), match_id)
+
+
+def parse_date_bound(value, end=False):
+    """
+    Timestamp for a YYYY-MM-DD or ISO date-time filter. A bare end date includes that whole day.
+    Raises ValueError if malformed.
+    """
+    if len(value) == 10:
+        day = datetime.strptime(value, "%Y-%m-%d")
+        return (day + timedelta(days=1) if end else day).timestamp()
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+schedule_index = ScheduleIndex()
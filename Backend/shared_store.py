@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import log
+
+# Cross-process Sportradar state for multi-worker deployments (uvicorn --workers N).
+# Each worker process has its own client caches and its own rate limiter, so N workers make
+# up to N x 1 QPS upstream (429s) and hold N copies of every payload. With SHARED_STORE_PATH
+# set, all workers on the host share one SQLite database in WAL mode:
+#   - the rate limiter's next free slot, reserved in a write transaction, so the 1.2s spacing
+#     holds across processes;
+#   - fetched payloads with their fetch time, consulted before going upstream, so a payload
+#     one worker fetched serves every worker until it is older than the caller's max age;
+#   - large tool observations (blob_store.py), so GET /api/blobs/{hash} works on any worker;
+#   - the quota ledger's call counts (quota_ledger.py), added to by every worker.
+# Each process keeps its small in-memory LRU in front (payload object identity is what the
+# decoded-model and data-version caches key on). Any SQLite error falls back to per-process
+# behaviour for that call; the store never fails a request.
+
+# Empty = off (single process, per-process caches and limiter as before)
+SHARED_STORE_PATH = os.getenv("SHARED_STORE_PATH", "")
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "2000"))
+SHARED_BLOBS_MAX_ENTRIES = 1000
+PRUNE_EVERY_WRITES = 100
+BUSY_TIMEOUT_SECONDS = 5.0
+
+logger = log.get_logger("shared_store")
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _dumps = lambda payload: json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    _loads = json.loads
+
+
+class SharedStore:
+    def __init__(self, path, max_entries=SHARED_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()  # sqlite3 connections are per thread
+        self._writes = 0
+        conn = self._conn()
+        # WAL: readers never block the writer and vice versa, across processes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limit (name TEXT PRIMARY KEY, last_request REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                     "(key TEXT PRIMARY KEY, payload BLOB NOT NULL, fetched_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS blobs "
+                     "(digest TEXT PRIMARY KEY, data BLOB NOT NULL, stored_at REAL NOT NULL)")
+        # kind: "endpoint" or "day"; name: the endpoint label or YYYY-MM-DD
+        conn.execute("CREATE TABLE IF NOT EXISTS quota_counts "
+                     "(month TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, calls INTEGER NOT NULL, "
+                     "PRIMARY KEY (month, kind, name))")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; write transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; last commits may be lost on power loss
+            self._local.conn = conn
+        return conn
+
+    def reserve_slot(self, name, min_interval, now):
+        """
+        Start time of the next request slot of limiter `name`, at least `min_interval` after the
+        previous one reserved by any process. None on error (the caller limits locally).
+        """
+        try:
+            conn = self._conn()
+            # IMMEDIATE takes the write lock up front: two processes cannot read the same slot
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT last_request FROM rate_limit WHERE name = ?", (name,)).fetchone()
+                slot = max(now, row[0] + min_interval) if row else now
+                conn.execute("INSERT OR REPLACE INTO rate_limit (name, last_request) VALUES (?, ?)", (name, slot))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return slot
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared rate limiter unavailable: %s", e)
+            return None
+
+    def mark_request(self, name, now):
+        """Records a finished request (never moves a slot another process already reserved)."""
+        try:
+            self._conn().execute("UPDATE rate_limit SET last_request = MAX(last_request, ?) WHERE name = ?", (now, name))
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared rate limiter unavailable: %s", e)
+
+    def get(self, key):
+        """(payload, age in seconds) of a shared response, or None."""
+        try:
+            row = self._conn().execute("SELECT payload, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared cache unavailable: %s", e)
+            return None
+        if row is None:
+            return None
+        try:
+            return _loads(row[0]), max(time.time() - row[1], 0.0)
+        except ValueError:
+            return None
+
+    def put(self, key, payload, fetched_at=None):
+        if payload is None:
+            return  # failed fetches are not shared
+        try:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO responses (key, payload, fetched_at) VALUES (?, ?, ?)",
+                         (key, _dumps(payload), fetched_at or time.time()))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY_WRITES == 0:
+                # Oldest fetches go first; each process prunes now and then
+                conn.execute("DELETE FROM responses WHERE key NOT IN "
+                             "(SELECT key FROM responses ORDER BY fetched_at DESC LIMIT ?)", (self.max_entries,))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("shared_store.error", "Shared cache unavailable: %s", e)
+
+    def delete(self, key):
+        try:
+            self._conn().execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared cache unavailable: %s", e)
+
+    def take(self, key):
+        """
+        Removes a shared response and returns (payload, age in seconds), or None when it is
+        missing or another process removed it first: of all callers, exactly one gets it.
+        """
+        try:
+            conn = self._conn()
+            # Read and delete under the write lock, so two processes cannot both read the row
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT payload, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared cache unavailable: %s", e)
+            return None
+        if row is None:
+            return None
+        try:
+            return _loads(row[0]), max(time.time() - row[1], 0.0)
+        except ValueError:
+            return None
+
+    def put_blob(self, digest, data):
+        try:
+            conn = self._conn()
+            # Content-addressed: an existing row already holds the same bytes
+            conn.execute("INSERT OR IGNORE INTO blobs (digest, data, stored_at) VALUES (?, ?, ?)",
+                         (digest, data, time.time()))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY_WRITES == 0:
+                conn.execute("DELETE FROM blobs WHERE digest NOT IN "
+                             "(SELECT digest FROM blobs ORDER BY stored_at DESC LIMIT ?)", (SHARED_BLOBS_MAX_ENTRIES,))
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared blob store unavailable: %s", e)
+
+    def get_blob(self, digest):
+        try:
+            row = self._conn().execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared blob store unavailable: %s", e)
+            return None
+        return bytes(row[0]) if row else None
+
+    def add_quota_calls(self, counts, seed_month=None):
+        """
+        Adds {(month, kind, name): calls} to the shared quota counts in one transaction. With
+        `seed_month`, the counts are only added if that month has none yet (first worker
+        bringing in its ledger file). False on error (the caller keeps the counts to retry).
+        """
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if seed_month is None or conn.execute(
+                        "SELECT 1 FROM quota_counts WHERE month = ? LIMIT 1", (seed_month,)).fetchone() is None:
+                    conn.executemany(
+                        "INSERT INTO quota_counts (month, kind, name, calls) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (month, kind, name) DO UPDATE SET calls = calls + excluded.calls",
+                        [(month, kind, name, calls) for (month, kind, name), calls in counts.items()])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return True
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared quota ledger unavailable: %s", e)
+            return False
+
+    def quota_calls(self, month):
+        """({endpoint: calls}, {day: calls}) counted by all workers in `month`, or None on error."""
+        try:
+            rows = self._conn().execute("SELECT kind, name, calls FROM quota_counts WHERE month = ?",
+                                        (month,)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared quota ledger unavailable: %s", e)
+            return None
+        by_endpoint, by_day = {}, {}
+        for kind, name, calls in rows:
+            (by_endpoint if kind == "endpoint" else by_day)[name] = calls
+        return by_endpoint, by_day
+
+    def clear(self):
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM blobs")
+            conn.execute("DELETE FROM rate_limit")
+        except sqlite3.Error as e:
+            logger.warning("shared_store.error", "Shared cache unavailable: %s", e)
+
+
+def _open(path):
+    if not path:
+        return None
+    try:
+        return SharedStore(path)
+    except sqlite3.Error as e:
+        logger.error("shared_store.open_failed", "Could not open shared store %s: %s", path, e)
+        return None
+
+
+shared_store = _open(SHARED_STORE_PATH)
@@ -0,0 +1,287 @@
+import os
+import re
+import time
+import datetime
+import threading
+from collections import OrderedDict, deque
+import log
+import metrics
+from sportradar_client import SportradarClient, background_requests
+from quota_ledger import ledger as quota_ledger
+
+# Speculative fetches while a run waits for approval.
+# Between the approval prompt and the user's click the server is idle, then the approved tool
+# call waits on the rate limiter for every payload it needs. When a run pauses, the Sportradar
+# endpoints the gated tool calls will read (live schedule and summaries, team and player
+# profiles, timelines) are fetched in the background into a side cache owned by the chat session.
+# Nothing else sees it: the client's caches, data versions, player form and the knowledge base
+# are untouched. Only the approved run of that session reads it (via the client's
+# speculated_payloads), each payload once and only while fresh. Declined speculations are
+# dropped. Upstream calls are capped per pause and per hour, yield to interactive requests and
+# stop while the quota ledger pauses prefetching.
+
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "true").lower() != "false"
+SPECULATION_MAX_CALLS = int(os.getenv("SPECULATION_MAX_CALLS", "6"))  # per paused run
+SPECULATION_MAX_CALLS_PER_HOUR = int(os.getenv("SPECULATION_MAX_CALLS_PER_HOUR", "60"))
+# Live data (schedules, summaries, timelines) older than this is not served; profiles are kept
+# as long as the paused run (they change between matches, not during an approval)
+SPECULATION_LIVE_MAX_AGE = float(os.getenv("SPECULATION_LIVE_MAX_AGE", "30"))
+SPECULATION_QUIET_SECONDS = 1.0
+SPECULATIONS_KEPT = 64
+PLAYERS_PER_TEAM = 11
+
+logger = log.get_logger("speculation")
+
+_IDS = re.compile(r"sr:(match|player|competitor):\d+")
+_STABLE_PREFIXES = ("/players/", "/teams/")
+LIVE_SCHEDULE_ENDPOINT = "/schedules/live/schedule.json"
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _HourlyCap:
+    """Upstream calls made by all speculations in the last hour."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._calls = deque()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] > 3600:
+                self._calls.popleft()
+            if len(self._calls) >= self.limit:
+                return False
+            self._calls.append(now)
+            return True
+
+
+_hourly = _HourlyCap(SPECULATION_MAX_CALLS_PER_HOUR)
+
+
+class Speculation:
+    """Side cache of one paused run: endpoint -> payload, filled by a background thread."""
+
+    def __init__(self, client, actions, max_calls=SPECULATION_MAX_CALLS):
+        self.client = client
+        self.actions = actions  # AgentActions of the gated step
+        self.max_calls = max_calls
+        self.calls = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._payloads = {}  # endpoint -> (payload, monotonic fetch time)
+        self._inflight = {}  # endpoint -> Event set when the fetch finished
+        self._stop = threading.Event()
+
+    # --- read side: the approved run ---
+
+    def take(self, endpoint):
+        """The speculated payload for `endpoint` (once), or None. Waits for a fetch in flight."""
+        with self._lock:
+            done = self._inflight.get(endpoint)
+        if done is not None:
+            done.wait(self.client.timeout + self.client.min_interval * self.max_calls)
+        with self._lock:
+            entry = self._payloads.pop(endpoint, None)
+        if entry is None:
+            return None
+        max_age = None if endpoint.startswith(_STABLE_PREFIXES) else SPECULATION_LIVE_MAX_AGE
+        if max_age is not None and time.monotonic() - entry[1] > max_age:
+            metrics.SPECULATIVE_REQUESTS.inc(result="expired")
+            return None
+        metrics.SPECULATIVE_REQUESTS.inc(result="used")
+        return entry[0]
+
+    def stop(self):
+        """No further fetches (the approval arrived, or the speculation is dropped)."""
+        self._stop.set()
+
+    def discard(self):
+        self.stop()
+        with self._lock:
+            unused = len(self._payloads)
+            self._payloads.clear()
+        if unused:
+            metrics.SPECULATIVE_REQUESTS.inc(unused, result="wasted")
+
+    # --- write side: the background thread ---
+
+    def start(self):
+        threading.Thread(target=self._run, name="speculation", daemon=True).start()
+
+    def _run(self):
+        try:
+            with background_requests():
+                for action in self.actions:
+                    self._speculate(action.tool, action.tool_input)
+        except _Cancelled:
+            pass
+        except Exception as e:
+            logger.warning("speculation.failed", "Speculative fetch failed: %s", e)
+
+    def _fetch(self, endpoint):
+        """Raw payload of `endpoint`, fetched with spare capacity. Raises _Cancelled when stopped or capped."""
+        with self._lock:
+            if endpoint in self._payloads:
+                return self._payloads[endpoint][0]
+        while not self.client.is_idle(SPECULATION_QUIET_SECONDS):
+            if self._stop.wait(0.2):
+                raise _Cancelled()
+        if self._stop.is_set() or quota_ledger.degraded("pause_prefetch"):
+            raise _Cancelled()
+        if self.calls >= self.max_calls or not _hourly.take():
+            metrics.SPECULATIVE_REQUESTS.inc(result="capped")
+            raise _Cancelled()
+        self.calls += 1
+        done = threading.Event()
+        with self._lock:
+            self._inflight[endpoint] = done
+        payload = None
+        try:
+            # Straight to _get: the client's caches and data versions only see it if the run uses it
+            payload = self.client._get(endpoint)
+        finally:
+            with self._lock:
+                if payload is not None:
+                    self._payloads[endpoint] = (payload, time.monotonic())
+                del self._inflight[endpoint]
+            done.set()
+        metrics.SPECULATIVE_REQUESTS.inc(result="fetched" if payload is not None else "failed")
+        return payload
+
+    def _cached(self, method, key, endpoint):
+        """Payload for method(key): the client's cached copy if it has one, else fetched speculatively."""
+        if method.age(self.client, key) is not None:
+            return method(self.client, key)
+        return self._fetch(endpoint)
+
+    def _summary(self, match_id):
+        return self._cached(SportradarClient.get_match_summary, match_id, f"/matches/{match_id}/summary.json")
+
+    def _team(self, team_id):
+        return self._cached(SportradarClient.get_team_profile, team_id, f"/teams/{team_id}/profile.json")
+
+    def _player(self, player_id):
+        return self._cached(SportradarClient.get_player_profile, player_id, f"/players/{player_id}/profile.json")
+
+    def _live_match_ids(self):
+        schedule = self._fetch(LIVE_SCHEDULE_ENDPOINT) or {}
+        return [e.get('id') for e in schedule.get('sport_events', []) if e.get('id')]
+
+    def _match_team_ids(self, match_id):
+        summary = self._summary(match_id) or {}
+        competitors = (summary.get('sport_event') or {}).get('competitors') or summary.get('competitors') or []
+        return [c.get('id') for c in competitors if c.get('id')]
+
+    def _speculate(self, tool, tool_input):
+        args = tool_input if isinstance(tool_input, dict) else {}
+        text = str(tool_input)
+        ids = {kind: [] for kind in ("match", "player", "competitor")}
+        for m in _IDS.finditer(text):
+            ids[m.group(1)].append(m.group(0))
+        match_id = args.get("match_id") or next(iter(ids["match"]), None)
+
+        if tool == "request_user_approval":
+            # Free text naming the tool it wants ("Use compare_squads for India vs Sri Lanka"):
+            # speculate for every gated tool it mentions, with the ids and known names in it
+            for name in _GATED_TOOLS:
+                if name in text:
+                    self._speculate(name, {"match_id": match_id, "players": ids["player"] + _known_names(text, "players"),
+                                           "team_names": _known_names(text, "teams"), "text": text})
+            return
+        if tool == "fetch_live_match_context":
+            for live_id in self._live_match_ids():
+                self._summary(live_id)
+        elif tool == "fetch_daily_results":
+            today = datetime.datetime.now().strftime('%Y-%m-%d')
+            schedule = self._cached(SportradarClient.get_daily_schedule, today, f"/schedules/{today}/schedule.json") or {}
+            finished = [e.get('id') for e in schedule.get('sport_events', [])
+                        if e.get('sport_event_status', {}).get('status') in ('closed', 'ended')]
+            for finished_id in finished[:5]:
+                self._summary(finished_id)
+        elif tool == "fetch_match_progression":
+            match_id = match_id or next(iter(self._live_match_ids()), None)
+            if match_id:
+                self._fetch(f"/matches/{match_id}/timeline.json")
+        elif tool in ("fetch_player_profile", "fetch_player_career_stats"):
+            player = args.get("player_id") or next(iter(ids["player"]), None) or next(iter(args.get("players") or []), None)
+            player_id = _player_id(player) if player else None
+            if player_id:
+                self._player(player_id)
+        elif tool in ("analyze_match_matchup", "compare_squads"):
+            team_ids = self._match_team_ids(match_id) if match_id else []
+            team_ids += [t for t in (_team_id(n) for n in args.get("team_names") or []) if t]
+            rosters = [(self._team(t) or {}).get('players', []) for t in dict.fromkeys(team_ids)]
+            if tool == "compare_squads":
+                players = [p for p in (_player_id(p) for p in args.get("players") or []) if p]
+                for roster in rosters:
+                    players += [p.get('id') for p in roster[:PLAYERS_PER_TEAM] if p.get('id')]
+                for player_id in dict.fromkeys(players):
+                    self._player(player_id)
+
+
+# Tools whose data is worth fetching ahead of approval
+_GATED_TOOLS = ("fetch_live_match_context", "fetch_daily_results", "fetch_match_progression", "fetch_player_profile",
+                "fetch_player_career_stats", "analyze_match_matchup", "compare_squads")
+
+
+def _known_names(text, section):
+    """Knowledge base players / teams named in `text`."""
+    from tools import knowledge_base
+    lowered = text.lower()
+    return [name for name in knowledge_base.get(section, {}) if name.lower() in lowered]
+
+
+def _player_id(name_or_id):
+    # Names resolve through the knowledge base only; the roster scan is left to the tool
+    if name_or_id.startswith("sr:player:"):
+        return name_or_id
+    from tools import knowledge_base
+    return (knowledge_base.get("players", {}).get(name_or_id) or {}).get("id")
+
+
+def _team_id(name):
+    from tools import knowledge_base
+    for t_name, t_data in knowledge_base.get("teams", {}).items():
+        if name.lower() in t_name.lower() and t_data.get('id'):
+            return t_data['id']
+    return None
+
+
+class Speculations:
+    """Running speculations by chat session id."""
+
+    def __init__(self, maxsize=SPECULATIONS_KEPT):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._by_session = OrderedDict()
+
+    def start(self, session_id, client, actions):
+        if not SPECULATION_ENABLED or client is None or not actions or quota_ledger.degraded("pause_prefetch"):
+            return None
+        speculation = Speculation(client, actions)
+        with self._lock:
+            previous = self._by_session.pop(session_id, None)
+            self._by_session[session_id] = speculation
+            dropped = [previous] if previous else []
+            while len(self._by_session) > self.maxsize:
+                dropped.append(self._by_session.popitem(last=False)[1])
+        for old in dropped:
+            old.discard()
+        speculation.start()
+        return speculation
+
+    def take(self, session_id):
+        """Removes the session's speculation and stops its fetching. None if there is none."""
+        with self._lock:
+            speculation = self._by_session.pop(session_id, None)
+        if speculation is not None:
+            speculation.stop()
+        return speculation
+
+
+speculations = Speculations()
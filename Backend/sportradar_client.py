@@ -1,58 +1,468 @@
 
 import os
+import hashlib
 import requests
 import functools
 import time
+import threading
+import contextlib
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import log
+import metrics
+import tracing
+import match_model
+from quota_ledger import ledger as quota_ledger
+from data_versions import data_versions, version_of
+from player_form import form_engine
+from shared_store import shared_store
+from circuit_breaker import CircuitBreakers
+
+# orjson decodes Sportradar payloads several times faster when installed; json works without it
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+logger = log.get_logger("sportradar")
+
+# Threads for fetch_many; requests still queue through the client's rate limiter
+SPORTRADAR_FETCH_WORKERS = int(os.getenv("SPORTRADAR_FETCH_WORKERS", "4"))
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+def _get_fetch_pool():
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(max_workers=SPORTRADAR_FETCH_WORKERS, thread_name_prefix="sportradar-fetch")
+        return _fetch_pool
+
+# Set while the prefetcher is fetching, so its requests do not count as interactive demand
+_background = contextvars.ContextVar("sportradar_background", default=False)
+
+# Shared-store key of the cached call now fetching on this thread: [key, requested at, reused].
+# After its rate-limit wait the request first checks whether another worker fetched the same
+# payload meanwhile, so workers that miss at the same moment make one upstream call, not N.
+_shared_fetch = contextvars.ContextVar("sportradar_shared_fetch", default=None)
+
+# Side cache of payloads fetched ahead of an approval (speculation.py), set for the approved run:
+# its requests take a speculated payload instead of going upstream
+speculated_payloads = contextvars.ContextVar("sportradar_speculated", default=None)
+
+# Set by a caller that wants to know which payloads were served from the last good copy because
+# Sportradar failed or its breaker was open: endpoint -> age in seconds (like current_dependencies)
+stale_reads = contextvars.ContextVar("sportradar_stale_reads", default=None)
+
+# [age] of the last good payload _get fell back to during the cached call on this thread, so the
+# cache keeps it with its real age instead of as a fresh fetch
+_fallback_age = contextvars.ContextVar("sportradar_fallback_age", default=None)
+
+# Last good payloads kept for fallback (by endpoint)
+LAST_GOOD_KEPT = 256
+
+# _request result when Sportradar failed (timeout, connection error, 5xx) or the breaker is open,
+# as opposed to a definite answer such as a 404
+_UNAVAILABLE = object()
+
+LIVE_SCHEDULE_ENDPOINT = "/schedules/live/schedule.json"
+
+@contextlib.contextmanager
+def background_requests():
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+def tracked_lru_cache(maxsize):
+    """
+    LRU cache for client methods that also reports hits/misses to the metrics registry.
+    Exposes cache_info/cache_clear like functools.lru_cache, plus refresh(*args, max_age=...)
+    to re-fetch a single entry once it is older than max_age seconds, age(*args), and
+    derived(derive, result, *args): derive(result) computed once per cached payload and
+    dropped with it (the payload's data version, its decoded model).
+    With a shared store (shared_store.py), local misses and stale entries are looked up there
+    before going upstream, and fetched payloads are written there for the other workers.
+    """
+    def decorator(func):
+        lock = threading.Lock()
+        entries = OrderedDict()  # call args -> (result, fetched_at, {derive: derived value})
+        stats = {"hits": 0, "misses": 0}
+
+        def _key(args, kwargs):
+            return args + tuple(sorted(kwargs.items())) if kwargs else args
+
+        def _store(key, result, age=0.0):
+            with lock:
+                entries[key] = (result, time.monotonic() - age, {})
+                entries.move_to_end(key)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+
+        def _shared_key(args, kwargs):
+            parts = list(map(str, args[1:])) + [f"{k}={v}" for k, v in sorted(kwargs.items())]
+            return func.__name__ + ":" + ",".join(parts)
+
+        def _fetch(args, kwargs):
+            # Upstream call -> (result, its age if it is a last good fallback, else None).
+            # A freshly fetched payload is shared with the other workers.
+            fallback = [None]
+            fallback_token = _fallback_age.set(fallback)
+            pending = None
+            if shared_store is not None:
+                pending = [_shared_key(args, kwargs), time.time(), False]
+                token = _shared_fetch.set(pending)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                if pending is not None:
+                    _shared_fetch.reset(token)
+                _fallback_age.reset(fallback_token)
+            if result is not None and pending is not None and not pending[2] and fallback[0] is None:
+                shared_store.put(pending[0], result)
+            return result, fallback[0]
+
+        def _derived(key, result, derive):
+            # The entry holds the payload, so the identity check cannot match a reused id.
+            # Results the cache does not hold (failed fetch, evicted since, older copy) are not memoized.
+            with lock:
+                entry = entries.get(key)
+            if result is None or entry is None or entry[0] is not result:
+                return derive(result)
+            memo = entry[2]
+            if derive not in memo:
+                memo[derive] = derive(result)
+            return memo[derive]
+
+        def _observe(key, args, result):
+            # Track the content version so derived answers know when the data moved
+            version = _derived(key, result, version_of) if result is not None else None
+            data_versions.observe(func.__name__ + ":" + ",".join(map(str, args[1:])), result, version)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _key(args, kwargs)
+            with tracing.span(func.__name__, "cache") as span:
+                with lock:
+                    entry = entries.get(key)
+                    if entry is not None:
+                        entries.move_to_end(key)
+                        stats["hits"] += 1
+                    else:
+                        stats["misses"] += 1
+                shared = None
+                if entry is None and shared_store is not None:
+                    shared = shared_store.get(_shared_key(args, kwargs))
+                if entry is not None:
+                    result = entry[0]
+                    outcome = "hit"
+                elif shared is not None:
+                    # Another worker fetched it
+                    result = shared[0]
+                    _store(key, result, age=shared[1])
+                    outcome = "shared"
+                else:
+                    result, stale_age = _fetch(args, kwargs)
+                    _store(key, result, age=stale_age or 0.0)
+                    outcome = "miss"
+                metrics.CACHE_REQUESTS.inc(method=func.__name__, result=outcome)
+                if span:
+                    span.set(cache=outcome)
+            return _observe(key, args, result)
+
+        def refresh(*args, max_age=0.0, **kwargs):
+            """
+            Cached result if it is at most `max_age` seconds old, else fetched anew.
+            A failed fetch (None) is not cached; the previous result, if any, is returned instead.
+            """
+            key = _key(args, kwargs)
+            with lock:
+                entry = entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= max_age:
+                metrics.CACHE_REQUESTS.inc(method=func.__name__, result="hit")
+                return _observe(key, args, entry[0])
+            if shared_store is not None:
+                shared = shared_store.get(_shared_key(args, kwargs))
+                if shared is not None and shared[1] <= max_age:
+                    # Another worker refreshed it recently enough
+                    metrics.CACHE_REQUESTS.inc(method=func.__name__, result="shared")
+                    _store(key, shared[0], age=shared[1])
+                    return _observe(key, args, shared[0])
+            if entry is not None and quota_ledger.degraded("serve_stale"):
+                # Quota nearly spent: any cached copy will do (callers can check age())
+                metrics.CACHE_REQUESTS.inc(method=func.__name__, result="stale_served")
+                return _observe(key, args, entry[0])
+            metrics.CACHE_REQUESTS.inc(method=func.__name__, result="stale" if entry else "miss")
+            with tracing.span(func.__name__, "cache", cache="refresh"):
+                result, stale_age = _fetch(args, kwargs)
+            if result is None:
+                if entry is None:
+                    return None
+                result = entry[0]
+            elif stale_age is not None and entry is not None and time.monotonic() - entry[1] <= stale_age:
+                # Sportradar failed and the cached copy is newer than the last good fallback
+                result = entry[0]
+            else:
+                _store(key, result, age=stale_age or 0.0)
+            return _observe(key, args, result)
+
+        def age(*args, **kwargs):
+            """Seconds since the cached result for these arguments was fetched (None if not cached)."""
+            with lock:
+                entry = entries.get(_key(args, kwargs))
+            return None if entry is None else time.monotonic() - entry[1]
+
+        def derived(derive, result, *args, **kwargs):
+            """derive(result) for a result just returned for these arguments, memoized on its cache entry."""
+            return _derived(_key(args, kwargs), result, derive)
+
+        def cache_info():
+            with lock:
+                return functools._CacheInfo(stats["hits"], stats["misses"], maxsize, len(entries))
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+                stats["hits"] = stats["misses"] = 0
+
+        wrapper.refresh = refresh
+        wrapper.age = age
+        wrapper.derived = derived
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
 
 class SportradarClient:
     """
     Cricket Client for Sportradar API.
     Handles API requests, rate limiting, and basic error handling.
     """
-    def __init__(self, api_key, access_level='t', language_code='en', timeout=10):
+    def __init__(self, api_key, access_level='t', language_code='en', timeout=10, base_url=None):
         self.api_key = api_key
         # Restore real URL
-        self.base_url = "https://api.sportradar.com/cricket-{access_level}2/{language_code}".format(
-            access_level=access_level,
-            language_code=language_code
-        )
+        # SPORTRADAR_BASE_URL points every client at another server, e.g. the local
+        # stand-in from mock_sportradar.py (http://127.0.0.1:8001)
+        base_url = base_url or os.getenv("SPORTRADAR_BASE_URL")
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+        else:
+            self.base_url = "https://api.sportradar.com/cricket-{access_level}2/{language_code}".format(
+                access_level=access_level,
+                language_code=language_code
+            )
         self.timeout = timeout
+        # Seconds between requests: ~1 QPS on the trial key, 1.2s to be safe
+        self.min_interval = 1.2
         self.last_request_time = 0
+        # Tools may run in parallel threads; slots are handed out under this lock
+        self._rate_lock = threading.Lock()
+        # With a shared store, slots are reserved across worker processes under this name
+        # (one limiter per API key: the limit is per key)
+        self._limiter_name = "sportradar:" + hashlib.sha1(f"{self.base_url}|{api_key}".encode("utf-8")).hexdigest()[:16]
+        # Interactive (non-background) demand, read by the prefetcher to stay out of the way
+        self._interactive_waiting = 0
+        self.last_interactive_time = 0
+        # Per-endpoint breakers and adaptive timeouts (circuit_breaker.py), capped at `timeout`
+        self.breakers = CircuitBreakers(timeout)
+        # endpoint -> (payload, fetched at): served, marked stale, when a request fails
+        self._last_good = OrderedDict()
+        self._last_good_lock = threading.Lock()
 
     def _get(self, endpoint, params=None):
+        label = metrics.endpoint_label(endpoint)
+        speculated = speculated_payloads.get()
+        if speculated is not None and not params:
+            payload = speculated.take(endpoint)
+            if payload is not None:
+                with tracing.span(f"GET {label}", "sportradar", endpoint=endpoint, speculated=True):
+                    return payload
+        with tracing.span(f"GET {label}", "sportradar", endpoint=endpoint) as span:
+            result = self._request(endpoint, label, params, span)
+            if result is not _UNAVAILABLE:
+                if result is not None and not params:
+                    with self._last_good_lock:
+                        self._last_good[endpoint] = (result, time.time())
+                        self._last_good.move_to_end(endpoint)
+                        while len(self._last_good) > LAST_GOOD_KEPT:
+                            self._last_good.popitem(last=False)
+                return result
+            return self._last_good_fallback(endpoint, label, params, span)
+
+    def _last_good_fallback(self, endpoint, label, params, span):
+        """
+        The last good payload of a failed interactive request, recorded in stale_reads, or None.
+        Background fetches (prefetch, speculation) get None: they only warm caches with fresh data.
+        """
+        if params or _background.get():
+            return None
+        with self._last_good_lock:
+            entry = self._last_good.get(endpoint)
+        if entry is None:
+            return None
+        age = max(0.0, time.time() - entry[1])
+        metrics.SPORTRADAR_STALE_SERVED.inc(endpoint=label)
+        if span:
+            span.set(stale_age_s=round(age, 1))
+        fallback = _fallback_age.get()
+        if fallback is not None:
+            fallback[0] = age
+        stale = stale_reads.get()
+        if stale is not None:
+            stale[endpoint] = round(age)
+        return entry[0]
+
+    def _request(self, endpoint, label, params, span):
+        breaker = self.breakers.get(label)
+        timeout = breaker.acquire()
+        if timeout is None:
+            # Failing fast: no rate-limiter slot, no quota, no timeout to sit out
+            metrics.SPORTRADAR_REQUESTS.inc(endpoint=label, status="circuit_open")
+            if span:
+                span.set(circuit="open")
+            return _UNAVAILABLE
+
         if params is None:
             params = {}
         params['api_key'] = self.api_key
         
         # RATE LIMITING: Enforce ~1 request per second (1 QPS limit)
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1.2:  # Wait 1.2s to be safe
-            sleep_time = 1.2 - time_since_last
-            print(f"⏳ Rate Limit: Sleeping for {sleep_time:.2f}s...")
-            time.sleep(sleep_time)
+        # Each caller reserves the next free slot (min_interval apart) and sleeps outside
+        # the lock, so concurrent tool calls queue up instead of firing together.
+        interactive = not _background.get()
+        with self._rate_lock:
+            current_time = time.time()
+            slot = None
+            if shared_store is not None:
+                # Other workers' requests count too
+                slot = shared_store.reserve_slot(self._limiter_name, self.min_interval, current_time)
+            if slot is None:
+                slot = max(current_time, self.last_request_time + self.min_interval)
+            self.last_request_time = slot
+            if interactive:
+                self._interactive_waiting += 1
+                self.last_interactive_time = slot
+        sleep_time = slot - current_time
+        try:
+            if sleep_time > 0:
+                logger.debug("sportradar.rate_limit_wait", "Rate limit: sleeping %.2fs", sleep_time, endpoint=endpoint)
+                time.sleep(sleep_time)
+        finally:
+            if interactive:
+                with self._rate_lock:
+                    self._interactive_waiting -= 1
+        metrics.RATE_LIMIT_WAIT.observe(sleep_time)
+        if span:
+            span.set(rate_limit_wait_ms=round(sleep_time * 1000, 2))
+
+        pending = _shared_fetch.get()
+        if pending is not None and shared_store is not None:
+            shared = shared_store.get(pending[0])
+            # Fetched by another worker after this call asked for it: as fresh as a new request
+            if shared is not None and time.time() - shared[1] >= pending[1]:
+                pending[2] = True
+                metrics.CACHE_REQUESTS.inc(method=pending[0].split(":", 1)[0], result="shared")
+                if span:
+                    span.set(shared=True)
+                breaker.success()
+                return shared[0]
         
         url = f"{self.base_url}{endpoint}"
-        print(f"📡 [Sportradar API] Requesting: {endpoint}")
+        logger.debug("sportradar.request", "Requesting: %s", endpoint)
         
+        started = time.perf_counter()
         try:
-            response = requests.get(url, params=params, timeout=self.timeout)
-            self.last_request_time = time.time() # Update time after request
+            response = requests.get(url, params=params, timeout=timeout)
+            latency = time.perf_counter() - started
+            self._mark_request()
+            quota_ledger.record(label)
             
             if response.status_code == 429:
-                print("⚠️ Quota Exceeded (429). Waiting 2 seconds before retry...")
+                metrics.SPORTRADAR_429.inc(endpoint=label)
+                if span:
+                    span.set(retried_429=True)
+                logger.warning("sportradar.429", "Quota exceeded (429), retrying in 2s", endpoint=endpoint)
                 time.sleep(2)
-                response = requests.get(url, params=params, timeout=self.timeout)
-                self.last_request_time = time.time()
+                if shared_store is not None:
+                    # The retry takes a slot like any request, or it collides with other workers'
+                    retry_wait = self._reserve_shared_slot()
+                    if retry_wait > 0:
+                        time.sleep(retry_wait)
+                retried = time.perf_counter()
+                response = requests.get(url, params=params, timeout=timeout)
+                latency = time.perf_counter() - retried
+                self._mark_request()
+                quota_ledger.record(label)
+                if response.status_code == 429:
+                    metrics.SPORTRADAR_429.inc(endpoint=label)
 
-            response.raise_for_status()
-            return response.json()
+            metrics.SPORTRADAR_REQUESTS.inc(endpoint=label, status=str(response.status_code))
+            if span:
+                span.set(status=response.status_code, timeout_s=round(timeout, 2))
+            if response.status_code >= 500:
+                breaker.failure()
+                response.raise_for_status()
+            if response.status_code >= 400:
+                # An answer (404, exhausted quota), not an outage
+                breaker.success(latency)
+                response.raise_for_status()
+            try:
+                payload = _loads(response.content)
+            except ValueError as e:
+                # 200 with a non-JSON body (proxy or maintenance page): the upstream is not answering
+                breaker.failure()
+                metrics.SPORTRADAR_REQUESTS.inc(endpoint=label, status="invalid_json")
+                if span:
+                    span.set(error=f"invalid JSON: {e}"[:200])
+                logger.warning("sportradar.invalid_json", "Non-JSON response from %s: %s", endpoint, e)
+                return _UNAVAILABLE
+            breaker.success(latency)
+            return payload
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
-            return None
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is None:
+                # Timeouts / connection errors never produced a status code
+                metrics.SPORTRADAR_REQUESTS.inc(endpoint=label, status="error")
+                breaker.failure()
+            # Request errors quote the URL, query string (api_key) included
+            error = str(e).replace(self.api_key, "***") if self.api_key else str(e)
+            if span:
+                span.set(error=error[:200])
+            logger.warning("sportradar.error", "Error fetching %s: %s", endpoint, error)
+            return _UNAVAILABLE if status is None or status >= 500 else None
+        finally:
+            metrics.SPORTRADAR_LATENCY.observe(time.perf_counter() - started, endpoint=label)
+
+    def _reserve_shared_slot(self):
+        """Seconds until a newly reserved shared slot (0 if the shared limiter is unavailable)."""
+        with self._rate_lock:
+            now = time.time()
+            slot = shared_store.reserve_slot(self._limiter_name, self.min_interval, now)
+            if slot is None:
+                return 0.0
+            self.last_request_time = max(self.last_request_time, slot)
+            return slot - now
 
-    @functools.lru_cache(maxsize=32)
+    def is_idle(self, quiet_seconds):
+        """True when no interactive request is queued or has been made in the last `quiet_seconds`."""
+        with self._rate_lock:
+            return self._interactive_waiting == 0 and time.time() - self.last_interactive_time >= quiet_seconds
+
+    def _mark_request(self):
+        # Update time after request (never moves a slot another thread already reserved)
+        with self._rate_lock:
+            now = time.time()
+            self.last_request_time = max(self.last_request_time, now)
+        if shared_store is not None:
+            shared_store.mark_request(self._limiter_name, now)
+
+    @tracked_lru_cache(maxsize=32)
     def get_daily_schedule(self, date_str):
         """
         Fetches the daily schedule for a formatted date string YYYY-MM-DD.
@@ -65,10 +475,11 @@ class SportradarClient:
         """
         Fetches the schedule for currently live matches.
         """
-        endpoint = "/schedules/live/schedule.json"
-        return self._get(endpoint)
+        result = self._get(LIVE_SCHEDULE_ENDPOINT)
+        data_versions.observe("get_live_schedule:", result)
+        return result
 
-    @functools.lru_cache(maxsize=10)
+    @tracked_lru_cache(maxsize=10)
     def get_match_summary(self, match_id):
         """
         Fetches the summary for a specific match.
@@ -78,7 +489,16 @@ class SportradarClient:
         endpoint = f"/matches/{match_id}/summary.json"
         return self._get(endpoint)
 
-    @functools.lru_cache(maxsize=10)
+    def get_match_timeline(self, match_id):
+        """
+        Fetches the ball-by-ball timeline of a match. Not cached: timeline_store keeps
+        the ingested events and only polls for new ones.
+        """
+        endpoint = f"/matches/{match_id}/timeline.json"
+        return self._get(endpoint)
+
+    # Sized for the prefetcher's rosters (two teams of PREFETCH_PLAYERS_PER_TEAM per upcoming match)
+    @tracked_lru_cache(maxsize=128)
     def get_player_profile(self, player_id):
         """
         Fetches the profile and statistics for a specific player.
@@ -86,7 +506,7 @@ class SportradarClient:
         endpoint = f"/players/{player_id}/profile.json"
         return self._get(endpoint)
 
-    @functools.lru_cache(maxsize=5)
+    @tracked_lru_cache(maxsize=32)
     def get_team_profile(self, team_id):
         """
         Fetches the team profile, including the current player roster.
@@ -94,6 +514,98 @@ class SportradarClient:
         endpoint = f"/teams/{team_id}/profile.json"
         return self._get(endpoint)
 
+    def refresh_resources(self, resources, max_age):
+        """
+        Re-fetches the data_versions resources (e.g. "get_match_summary:sr:match:1") that change
+        during a match and were fetched more than `max_age` seconds ago. Profiles are left alone.
+        """
+        for resource in resources:
+            method, _, key = resource.partition(":")
+            if method == "get_live_schedule":
+                # Not cached: its last good copy tells when it was fetched
+                with self._last_good_lock:
+                    entry = self._last_good.get(LIVE_SCHEDULE_ENDPOINT)
+                if entry is None or time.time() - entry[1] > max_age:
+                    self.get_live_schedule()
+            elif method in ("get_match_summary", "get_daily_schedule") and key:
+                getattr(SportradarClient, method).refresh(self, key, max_age=max_age)
+
+    def fetch_many(self, method, keys):
+        """
+        [method(key) for key in keys], fetched concurrently, e.g. fetch_many(client.get_team_profile, ids).
+        Uncached keys still take rate-limiter slots one after another, but each request's network
+        time overlaps the next one's wait, and cached keys return at once. Failures come back as None.
+        """
+        unique = list(dict.fromkeys(keys))
+        if len(unique) <= 1:
+            results = {key: self._fetch_one(method, key) for key in unique}
+        else:
+            pool = _get_fetch_pool()
+            # Each call runs in a copy of the caller's context so its spans nest under the calling tool
+            futures = {key: pool.submit(contextvars.copy_context().run, self._fetch_one, method, key) for key in unique}
+            results = {key: future.result() for key, future in futures.items()}
+        return [results[key] for key in keys]
+
+    @staticmethod
+    def _fetch_one(method, key):
+        try:
+            return method(key)
+        except Exception as e:
+            logger.warning("sportradar.fetch_failed", "Error fetching %s: %s", key, e)
+            return None
+
+    # Typed views (match_model), decoded once per cached payload and kept on its cache entry
+    def get_match(self, match_id):
+        """MatchSummary for a match, or None if the summary could not be fetched."""
+        payload = self.get_match_summary(match_id)
+        return self._observe_form(
+            SportradarClient.get_match_summary.derived(match_model.summary_from, payload, self, match_id))
+
+    def refresh_match(self, match_id, max_age=0.0):
+        """
+        MatchSummary re-fetched unless the cached summary is at most `max_age` seconds old.
+        Falls back to the last good summary if the fetch fails.
+        """
+        payload = SportradarClient.get_match_summary.refresh(self, match_id, max_age=max_age)
+        return self._observe_form(
+            SportradarClient.get_match_summary.derived(match_model.summary_from, payload, self, match_id))
+
+    @staticmethod
+    def _observe_form(summary):
+        # Finished matches feed the rolling player form (player_form.py); once per match
+        form_engine.observe(summary)
+        return summary
+
+    def get_live_matches(self):
+        """ScheduleEvent list for live matches, or None on error."""
+        # Not cached by the client (always fetched), so decoded on every call and not kept
+        return match_model.schedule_from(self.get_live_schedule())
+
+    def get_daily_matches(self, date_str, max_age=None):
+        """
+        ScheduleEvent list for a YYYY-MM-DD schedule, or None on error.
+        With `max_age`, a cached schedule older than that many seconds is re-fetched.
+        """
+        if max_age is None:
+            payload = self.get_daily_schedule(date_str)
+        else:
+            payload = SportradarClient.get_daily_schedule.refresh(self, date_str, max_age=max_age)
+        return SportradarClient.get_daily_schedule.derived(match_model.schedule_from, payload, self, date_str)
+
+_default_client = None
+
+def get_default_client():
+    """
+    Shared client built from SPORTRADAR_API_KEY (None if the key is missing).
+    Lets the REST endpoints use the client without importing the agent tools.
+    """
+    global _default_client
+    if _default_client is None:
+        api_key = os.getenv("SPORTRADAR_API_KEY")
+        if api_key:
+            _default_client = SportradarClient(api_key)
+    return _default_client
+
 # Simple test block
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -0,0 +1,210 @@
+import os
+import time
+import bisect
+import functools
+import threading
+from array import array
+from collections import OrderedDict
+from quota_ledger import ledger as quota_ledger
+
+# Ball-by-ball history of matches, built from the Sportradar timeline endpoint.
+# Each poll ingests only the events after the last sequence id already stored, into compact
+# per-match columns (array-backed: innings, over, ball, runs, wicket, plus running totals per
+# innings). The raw JSON is dropped after ingestion. Deliveries are stored in order, so
+# "score at 15 overs" or "run rate over the last 3 overs" is a bisect on the over column.
+
+# Timelines younger than this are not re-polled
+TIMELINE_MAX_AGE = float(os.getenv("TIMELINE_MAX_AGE", "15"))
+TIMELINES_KEPT = 32
+
+
+def _locked(method):
+    # Columns are appended one after another; readers must not see a half-appended delivery
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class MatchTimeline:
+    """Columnar deliveries of one match. Overs are 1-based as in the feed (over 1 = balls 0.1-0.6)."""
+    def __init__(self, match_id):
+        self.match_id = match_id
+        self.lock = threading.RLock()
+        self.last_seq = 0
+        self.fetched_at = None  # monotonic time of the last successful poll
+        self.innings = array('B')
+        self.over = array('H')
+        self.ball = array('B')
+        self.runs = array('B')
+        self.wicket = array('B')
+        # Running totals within the delivery's innings, inclusive
+        self.total_runs = array('I')
+        self.total_wickets = array('B')
+        self._innings_start = {}  # innings number -> index of its first delivery
+
+    def __len__(self):
+        return len(self.runs)
+
+    @_locked
+    def ingest(self, events):
+        """Appends the ball events with ids above last_seq. Returns how many were added."""
+        added = 0
+        for e in events:
+            seq = e.get('id')
+            if not isinstance(seq, int) or seq <= self.last_seq:
+                continue
+            self.last_seq = seq
+            if e.get('type') != 'ball':
+                continue
+            innings = int(e.get('innings_number') or 1)
+            runs = int(e.get('runs') or 0)
+            wicket = 1 if e.get('wicket') else 0
+            new_innings = innings not in self._innings_start
+            if new_innings:
+                self._innings_start[innings] = len(self.runs)
+            previous = not new_innings and len(self.runs) > 0
+            self.innings.append(innings)
+            self.over.append(int(e.get('over_number') or 0))
+            self.ball.append(int(e.get('ball_number') or 0))
+            self.runs.append(runs)
+            self.wicket.append(wicket)
+            self.total_runs.append((self.total_runs[-1] if previous else 0) + runs)
+            self.total_wickets.append((self.total_wickets[-1] if previous else 0) + wicket)
+            added += 1
+        return added
+
+    def _bounds(self, innings):
+        """[start, end) delivery indexes of an innings."""
+        start = self._innings_start.get(innings)
+        if start is None:
+            return None
+        later = [i for n, i in self._innings_start.items() if n > innings]
+        return start, min(later) if later else len(self.runs)
+
+    @_locked
+    def current_innings(self):
+        return self.innings[-1] if len(self.innings) else None
+
+    def _position(self, innings, overs):
+        """Index just past the delivery at `overs` (e.g. 15 = end of over 15, 14.3 = third ball of over 15)."""
+        lo, hi = self._bounds(innings)
+        whole = int(overs)
+        part = round((overs - whole) * 10)
+        # Completed overs 1..whole, then `part` balls of the next one
+        idx = bisect.bisect_right(self.over, whole, lo, hi)
+        if part:
+            idx = bisect.bisect_right(self.ball, part, idx, bisect.bisect_right(self.over, whole + 1, idx, hi))
+        return idx
+
+    @_locked
+    def score_at(self, overs, innings=None):
+        """{"innings", "overs", "runs", "wickets", "balls"} at `overs` into an innings (current by default)."""
+        innings = innings or self.current_innings()
+        if innings is None or self._bounds(innings) is None:
+            return None
+        lo, _ = self._bounds(innings)
+        idx = self._position(innings, overs)
+        if idx == lo:
+            return {"innings": innings, "overs": overs, "runs": 0, "wickets": 0, "balls": 0}
+        return {"innings": innings, "overs": overs, "runs": self.total_runs[idx - 1],
+                "wickets": self.total_wickets[idx - 1], "balls": idx - lo}
+
+    @_locked
+    def recent_run_rate(self, last_overs=3, innings=None):
+        """Runs per over across the last `last_overs` overs bowled in an innings (current by default)."""
+        innings = innings or self.current_innings()
+        bounds = self._bounds(innings) if innings is not None else None
+        if bounds is None or bounds[0] == bounds[1]:
+            return None
+        lo, hi = bounds
+        # From the first delivery of the over `last_overs` before the current one
+        first_over = max(self.over[hi - 1] - last_overs + 1, self.over[lo])
+        start = bisect.bisect_left(self.over, first_over, lo, hi)
+        runs = self.total_runs[hi - 1] - (self.total_runs[start - 1] if start > lo else 0)
+        balls = hi - start
+        return {"innings": innings, "overs": round(balls / 6, 2), "runs": runs,
+                "runRate": round(runs * 6 / balls, 2) if balls else 0.0}
+
+    @_locked
+    def runs_per_over(self, innings=None):
+        """[(over, runs, wickets)] for an innings (current by default), for charting."""
+        innings = innings or self.current_innings()
+        bounds = self._bounds(innings) if innings is not None else None
+        if bounds is None:
+            return []
+        lo, hi = bounds
+        result = []
+        idx = lo
+        while idx < hi:
+            over = self.over[idx]
+            end = bisect.bisect_right(self.over, over, idx, hi)
+            before_runs = self.total_runs[idx - 1] if idx > lo else 0
+            before_wickets = self.total_wickets[idx - 1] if idx > lo else 0
+            result.append((over, self.total_runs[end - 1] - before_runs, self.total_wickets[end - 1] - before_wickets))
+            idx = end
+        return result
+
+    @_locked
+    def innings_numbers(self):
+        return sorted(self._innings_start)
+
+
+class TimelineStore:
+    def __init__(self, max_age=TIMELINE_MAX_AGE, maxsize=TIMELINES_KEPT):
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._timelines = OrderedDict()  # match id -> MatchTimeline
+
+    def get(self, match_id):
+        with self._lock:
+            return self._timelines.get(match_id)
+
+    def sync(self, client, match_id, max_age=None):
+        """
+        The match's timeline, polling Sportradar for new events if the stored one is older
+        than max_age. None if the match has no timeline. Blocking.
+        """
+        # Polled less often while the Sportradar quota runs low
+        max_age = (self.max_age if max_age is None else max_age) * quota_ledger.live_poll_factor()
+        with self._lock:
+            timeline = self._timelines.get(match_id)
+            if timeline is None:
+                timeline = self._timelines[match_id] = MatchTimeline(match_id)
+                while len(self._timelines) > self.maxsize:
+                    self._timelines.popitem(last=False)
+            self._timelines.move_to_end(match_id)
+        # One poller per match at a time; other matches are not blocked
+        with timeline.lock:
+            if timeline.fetched_at is None or time.monotonic() - timeline.fetched_at > max_age:
+                payload = client.get_match_timeline(match_id)
+                if payload is not None:
+                    timeline.ingest(payload.get('timeline', []))
+                    timeline.fetched_at = time.monotonic()
+        return timeline if timeline.fetched_at is not None else None
+
+
+def progression(timeline, at_over=None, last_overs=3):
+    """
+    Compact view for the tools and dashboard: every innings' score at `at_over` (default: the
+    current innings' overs, so a chase is compared with the first innings at the same stage),
+    the current innings' run rate over the last `last_overs` overs and its runs per over.
+    """
+    innings = timeline.current_innings()
+    if innings is None:
+        return {"matchId": timeline.match_id, "innings": [], "message": "No deliveries yet."}
+    if at_over is None:
+        latest = timeline.score_at(10 ** 4)  # whole innings so far
+        at_over = float(f"{latest['balls'] // 6}.{latest['balls'] % 6}")
+    return {
+        "matchId": timeline.match_id,
+        "atOver": at_over,
+        "innings": [timeline.score_at(at_over, innings=n) for n in timeline.innings_numbers()],
+        "recent": timeline.recent_run_rate(last_overs),
+        "runsPerOver": [{"over": o, "runs": r, "wickets": w} for o, r, w in timeline.runs_per_over()],
+    }
+
+
+timeline_store = TimelineStore()
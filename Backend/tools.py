@@ -1,8 +1,12 @@
 import os
 import json
+import functools
 from langchain.tools import tool
-from sportradar_client import SportradarClient
+from sportradar_client import get_default_client, stale_reads
+from timeline_store import timeline_store, progression
+from player_form import form_engine
 from dotenv import load_dotenv
+import log
 
 class ApprovalRequiredException(Exception):
     def __init__(self, action_description):
@@ -16,25 +20,53 @@ class ApprovalRequiredException(Exception):
 
 load_dotenv()
 
+logger = log.get_logger("tools")
+
 GLOBAL_USER_MESSAGE = ""
 SESSION_APPROVED = False
+APPROVAL_PREFIX = "I approve. Proceed with:"
+
+def is_approval(message: str) -> bool:
+    return message.strip().startswith(APPROVAL_PREFIX)
 
 def verify_approval(action_description: str):
     global SESSION_APPROVED
-    if GLOBAL_USER_MESSAGE.strip().startswith("I approve. Proceed with:"):
+    if is_approval(GLOBAL_USER_MESSAGE):
         SESSION_APPROVED = True
         return
         
     if not SESSION_APPROVED:
         raise ApprovalRequiredException(action_description)
 
-# Initialize Client
-SPORTRADAR_API_KEY = os.getenv("SPORTRADAR_API_KEY")
-client = None
-if SPORTRADAR_API_KEY:
-    client = SportradarClient(SPORTRADAR_API_KEY)
-else:
-    print("WARNING: SPORTRADAR_API_KEY not found. Sportradar tools will fail.")
+# Initialize Client (shared with the REST endpoints in main.py)
+client = get_default_client()
+if not client:
+    logger.warning("config.missing", "SPORTRADAR_API_KEY not found. Sportradar tools will fail.")
+
+def reports_stale_data(func):
+    """
+    For tools reading Sportradar: when the client served last good copies (upstream down or its
+    breaker open), the output says so. JSON objects get a "stale" field, text a closing note.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stale = {}
+        token = stale_reads.set(stale)
+        try:
+            output = func(*args, **kwargs)
+        finally:
+            stale_reads.reset(token)
+        if not stale:
+            return output
+        try:
+            data = json.loads(output)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            data["stale"] = {"reason": "Sportradar unavailable, last good data served", "ageSeconds": stale}
+            return json.dumps(data, indent=2 if "\n" in output else None)
+        return f"{output}\n\n(Sportradar is unavailable: this data is up to {max(stale.values())}s old.)"
+    return wrapper
 
 # Load Knowledge Base
 KNOWLEDGE_FILE = os.path.join(os.path.dirname(__file__), "knowledge.json")
@@ -43,7 +75,7 @@ try:
     with open(KNOWLEDGE_FILE, "r") as f:
         knowledge_base = json.load(f)
 except Exception as e:
-    print(f"Error loading knowledge.json: {e}")
+    logger.error("knowledge.load_failed", "Error loading knowledge.json: %s", e)
 
 def harvest_player_ids(match_list):
     """
@@ -72,12 +104,13 @@ def harvest_player_ids(match_list):
             knowledge_base["players"] = players_kb
             with open(KNOWLEDGE_FILE, "w") as f:
                 json.dump(knowledge_base, f, indent=4)
-            print("Knowledge Base updated with new Player IDs.")
+            logger.info("knowledge.updated", "Knowledge Base updated with new Player IDs.")
             
     except Exception as e:
-        print(f"Error harvesting IDs: {e}")
+        logger.warning("knowledge.harvest_failed", "Error harvesting IDs: %s", e)
 
 @tool
+@reports_stale_data
 def fetch_daily_results(query: str = ""):
     """
     Fetches the list of cricket matches completed today.
@@ -92,35 +125,26 @@ def fetch_daily_results(query: str = ""):
     try:
         import datetime
         today = datetime.datetime.now().strftime('%Y-%m-%d')
-        daily_data = client.get_daily_schedule(today)
+        matches = client.get_daily_matches(today)
         
-        if not daily_data:
+        if not matches:
              return json.dumps({"message": "No matches found for today."})
 
-        matches = daily_data.get('sport_events', [])
         results = []
         
         # Limit to top 5 completed matches to avoid rate limits when fetching summaries
-        completed_matches = [m for m in matches if m.get('status') == 'closed' or m.get('status') == 'ended']
+        completed_matches = [m for m in matches if m.status == 'closed' or m.status == 'ended']
         
         for match in completed_matches[:5]:
-            match_id = match.get('id')
             try:
                 # Fetch summary to get players
-                summary = client.get_match_summary(match_id)
+                summary = client.get_match(match.id)
                 if not summary: continue
                 
-                # Parse to standard format (reuse logic or keep simple)
-                # We need to extract players to learn.
-                # Simplification: We'll just extract players here directly for harvesting
-                # and return a simple score string.
-                
                 # Format Result for Output
-                competitors = match.get('competitors', [])
-                t1 = competitors[0].get('name', 'Team 1') if len(competitors) > 0 else 'T1'
-                t2 = competitors[1].get('name', 'Team 2') if len(competitors) > 1 else 'T2'
-                status = summary.get('sport_event_status', {})
-                score = status.get('display_score') or status.get('status', 'Ended')
+                t1 = match.competitors[0].name if len(match.competitors) > 0 else 'T1'
+                t2 = match.competitors[1].name if len(match.competitors) > 1 else 'T2'
+                score = summary.display_score or summary.status or 'Ended'
                 
                 results.append({
                     "match": f"{t1} vs {t2}",
@@ -136,6 +160,7 @@ def fetch_daily_results(query: str = ""):
         return json.dumps({"error": f"Error fetching daily results: {e}"})
 
 @tool
+@reports_stale_data
 def fetch_live_match_context(query: str = ""):
     """
     Fetches the current live cricket match context. 
@@ -148,94 +173,42 @@ def fetch_live_match_context(query: str = ""):
         return json.dumps({"error": "Sportradar Client not initialized (Missing API Key)."})
     
     try:
-        live_data = client.get_live_schedule()
-        if not live_data:
+        live_matches = client.get_live_matches()
+        if live_matches is None:
             return json.dumps({"error": "No live data available or error fetching."})
         
-        matches = live_data.get('sport_events', [])
-        if not matches:
+        if not live_matches:
             return json.dumps({"message": "No live matches currently in progress."})
             
         # We will return a structured object with 'matches' list
         # Each match has id, team1, team2, status, score, players (if available)
         result_data = {"matches": []}
 
-        for match in matches:
-            # ... [Existing parsing logic] ...
-            competitors = match.get('competitors', [])
-            team1 = competitors[0].get('name', 'Unknown') if len(competitors) > 0 else 'Unknown'
-            team2 = competitors[1].get('name', 'Unknown') if len(competitors) > 1 else 'Unknown'
-            match_id = match.get('id')
-            venue_info = match.get('venue', {})
-            venue_name = venue_info.get('name', 'Unknown Venue')
-            
+        for match in live_matches:
             match_info = {
-                "id": match_id,
-                "team1": team1,
-                "team2": team2,
-                "venue": venue_name,
+                "id": match.id,
+                "team1": match.team1,
+                "team2": match.team2,
+                "venue": match.venue,
                 "status": "Live",
                 "score": "",
                 "players": []
             }
             
             try:
-                summary = client.get_match_summary(match_id)
+                summary = client.get_match(match.id)
                 if summary:
-                    # Extract Score
-                    status = summary.get('sport_event_status', {})
-                    match_info['status'] = status.get('status', 'Live')
+                    match_info['status'] = summary.status or 'Live'
                     
                     # Extract Detailed Match Stats
-                    match_info['match_status'] = status.get('match_status') # e.g. second_innings_away_team
-                    match_info['display_overs'] = status.get('display_overs') # e.g. 14.1
-                    match_info['run_rate'] = status.get('run_rate')
-                    match_info['required_run_rate'] = status.get('required_run_rate')
-                    
-                    scores = []
-                    match_info['innings_scores'] = []
-                    if 'period_scores' in status:
-                        for p in status['period_scores']:
-                            scores.append(f"{p.get('type')}: {p.get('display_score')}")
-                            # Save structured innings data for calculation
-                            match_info['innings_scores'].append({
-                                "inning": p.get('number'),
-                                "score": p.get('display_score'),
-                                "runs": p.get('home_score') if p.get('home_score') > 0 else p.get('away_score'),
-                                "wickets": p.get('home_wickets') if p.get('home_score') > 0 else p.get('away_wickets')
-                            })
-                    match_info['score'] = ", ".join(scores)
+                    match_info['match_status'] = summary.match_status # e.g. second_innings_away_team
+                    match_info['display_overs'] = summary.display_overs # e.g. 14.1
+                    match_info['run_rate'] = summary.run_rate
+                    match_info['required_run_rate'] = summary.required_run_rate
+                    match_info['score'] = summary.score_text()
                     
-                    # Extract Lineups / Players
-                    stats = summary.get('statistics', {})
-                    teams_stats = stats.get('teams', [])
-                    
-                    for team in teams_stats:
-                        t_name = team.get('name', 'Unknown Team')
-                        players = team.get('players', [])
-                        for p in players:
-                            # Standardize player object for frontend
-                            # Frontend expects: id, name, role, team, runs, balls, strikeRate, wickets, economy
-                            
-                            # Parse batting if available (very dependent on API structure)
-                            # Sportradar structure is complex. We'll try to get basic stats if present.
-                            # Usually 'statistics' inside player object.
-                            p_stats = p.get('statistics', {})
-                            batting = p_stats.get('batting', {})
-                            bowling = p_stats.get('bowling', {})
-                            
-                            player_obj = {
-                                "id": p.get('id'),
-                                "name": p.get('name'),
-                                "team": t_name,
-                                "role": p.get('type', 'Player'), # e.g. batsman, bowler
-                                "runs": batting.get('runs'),
-                                "balls": batting.get('balls'),
-                                "strikeRate": batting.get('strike_rate'),
-                                "wickets": bowling.get('wickets'),
-                                "economy": bowling.get('economy')
-                            }
-                            match_info['players'].append(player_obj)
+                    # Lineups / Players, standardized for the frontend
+                    match_info['players'] = [p.to_dict() for p in summary.players]
                             
             except Exception as e:
                 match_info['error'] = f"Could not fetch summary: {str(e)}"
@@ -254,10 +227,6 @@ def fetch_live_match_context(query: str = ""):
                      team2_cnt += 1
             
             match_info['players'] = truncated_players
-            
-            # Remove giant arrays to prevent token limit crashes
-            if 'innings_scores' in match_info:
-                 del match_info['innings_scores']
 
             result_data['matches'].append(match_info)
 
@@ -267,6 +236,7 @@ def fetch_live_match_context(query: str = ""):
         return json.dumps({"error": f"Error fetching live match context: {str(e)}"})
 
 @tool
+@reports_stale_data
 def fetch_player_profile(player_id: str):
     """
     Fetches detailed profile and statistics for a specific player using their Sportradar Player ID (URN).
@@ -433,17 +403,80 @@ def request_user_approval(action_description: str):
         str: A string indicating implicit approval.
     """
     global SESSION_APPROVED
-    if GLOBAL_USER_MESSAGE.strip().startswith("I approve. Proceed with:"):
+    if is_approval(GLOBAL_USER_MESSAGE):
         SESSION_APPROVED = True
         
     if SESSION_APPROVED:
         return "User has already explicitly approved this session. Proceed immediately with the tool you planned to use."
     raise ApprovalRequiredException(action_description)
 
+def _match_roster(search_name, roster):
+    """(id, name) of the first roster player whose name matches `search_name` (lowercase)."""
+    for p in roster:
+        p_name = p.get('name', '').lower()
+        # Simple fuzzy match: "Virat Kohli" in "Virat Kohli" or "Kohli" in "Virat Kohli"
+        if search_name == p_name or search_name in p_name or p_name in search_name:
+            return p.get('id'), p.get('name')
+    return None, None
+
+def _resolve_player_id(name):
+    """
+    Sportradar player id for a player name: the knowledge base mapping first (for speed),
+    then the rosters of the knowledge base's teams via the API. None if not found.
+    """
+    logger.debug("player.resolve", "Searching for player ID for name: %s", name)
+    search_name = name.lower()
+
+    # 1. First check if we have a direct ID mapping in knowledge.json (for speed)
+    players_kb = knowledge_base.get("players", {})
+    if name in players_kb and "id" in players_kb[name]:
+        found_id = players_kb[name]["id"]
+        logger.debug("player.resolved", "Found direct match in KB: %s", found_id, source="knowledge")
+        return found_id
+
+    # 2. If not, search through KNOWN TEAMS via API
+    teams = knowledge_base.get("teams", {})
+    for team_name, team_data in teams.items():
+        team_id = team_data.get("id")
+        if not team_id: continue
+
+        logger.debug("player.roster_scan", "Checking roster of %s (%s)", team_name, team_id)
+        try:
+            # Fetch Team Profile from API
+            team_profile = client.get_team_profile(team_id)
+            if not team_profile: continue
+
+            # Check players in roster
+            found_id, found_name = _match_roster(search_name, team_profile.get('players', []))
+            if found_id:
+                logger.debug("player.resolved", "Found API match in %s: %s -> %s", team_name, found_name, found_id, source="roster")
+                return found_id
+        except Exception as e:
+            logger.warning("player.roster_failed", "Error checking team %s: %s", team_name, e)
+    return None
+
+def _form_lines(player_id):
+    """Recent form from the finished matches seen so far (player_form.py), as output lines."""
+    form = form_engine.form(player_id)
+    if not form:
+        return ["Recent Form: no finished matches of this player seen yet."]
+    lines = []
+    bat = form.get("batting")
+    if bat:
+        avg = bat["average"] if bat["average"] is not None else "N/A (not out)"
+        lines.append(f"Recent Batting (last {bat['innings']} inns): {bat['runs']} Runs, Avg: {avg}, "
+                     f"SR: {bat['strikeRate']}, Boundary %: {bat['boundaryPercent']}")
+    bowl = form.get("bowling")
+    if bowl:
+        lines.append(f"Recent Bowling (last {bowl['spells']} spells): {bowl['wickets']} Wickets, Econ: {bowl['economy']}")
+    return lines
+
 @tool
+@reports_stale_data
 def fetch_player_career_stats(player_id: str):
     """
-    Fetches and summarizes a player's career statistics (Batting/Bowling).
+    Fetches and summarizes a player's career statistics (Batting/Bowling), plus recent form
+    (last innings average, strike rate, boundary %, economy) from finished matches.
     Use this to validate a player's quality or form.
     Input: Player ID (e.g., "sr:player:123456") OR Player Name (e.g. "Virat Kohli").
     **CRITICAL**: DO NOT USE THIS TOOL DIRECTLY. You MUST call `request_user_approval` first and wait for the user's explicit permission.
@@ -454,44 +487,7 @@ def fetch_player_career_stats(player_id: str):
     
     # Name Lookup Logic
     if not player_id.startswith("sr:player:"):
-        print(f"Searching for player ID for name: {player_id}")
-        
-        found_id = None
-        search_name = player_id.lower()
-        
-        # 1. First check if we have a direct ID mapping in knowledge.json (for speed)
-        players_kb = knowledge_base.get("players", {})
-        if player_id in players_kb and "id" in players_kb[player_id]:
-             found_id = players_kb[player_id]["id"]
-             print(f"Found direct match in KB: {found_id}")
-
-        # 2. If not, search through KNOWN TEAMS via API
-        if not found_id:
-            teams = knowledge_base.get("teams", {})
-            for team_name, team_data in teams.items():
-                team_id = team_data.get("id")
-                if not team_id: continue
-                
-                print(f"Checking roster of {team_name} ({team_id})...")
-                try:
-                    # Fetch Team Profile from API
-                    team_profile = client.get_team_profile(team_id)
-                    if not team_profile: continue
-                    
-                    # Check players in roster
-                    roster = team_profile.get('players', [])
-                    for p in roster:
-                        p_name = p.get('name', '').lower()
-                        # Simple fuzzy match: "Virat Kohli" in "Virat Kohli" or "Kohli" in "Virat Kohli"
-                        if search_name == p_name or search_name in p_name or p_name in search_name:
-                             found_id = p.get('id')
-                             print(f"Found API match in {team_name}: {p.get('name')} -> {found_id}")
-                             break
-                    
-                    if found_id: break
-                except Exception as e:
-                    print(f"Error checking team {team_name}: {e}")
-        
+        found_id = _resolve_player_id(player_id)
         if found_id:
             player_id = found_id
         else:
@@ -544,12 +540,14 @@ def fetch_player_career_stats(player_id: str):
             else:
                 output.append("No 'total' stats found. Raw stats keys: " + ", ".join(stats.keys()))
 
+        output.extend(_form_lines(player_id))
         return "\n".join(output)
 
     except Exception as e:
         return f"Error fetching career stats: {e}"
 
 @tool
+@reports_stale_data
 def analyze_match_matchup(match_id: str = None, team_names: list = None):
     """
     Fetches detailed team profiles and rosters for a specific match to enable deep analysis 
@@ -575,13 +573,11 @@ def analyze_match_matchup(match_id: str = None, team_names: list = None):
         # 1. Resolve Team IDs from Match ID
         if match_id:
             try:
-                summary = client.get_match_summary(match_id)
+                summary = client.get_match(match_id)
                 if summary:
-                    competitors = summary.get('sport_event', {}).get('competitors', []) \
-                                  or summary.get('competitors', []) # fallback
-                    for c in competitors:
-                        team_ids.append(c.get('id'))
-                        team_names_found.append(c.get('name'))
+                    for c in summary.competitors:
+                        team_ids.append(c.id)
+                        team_names_found.append(c.name)
             except Exception as e:
                 return f"Error fetching match summary for {match_id}: {e}"
         
@@ -610,8 +606,8 @@ def analyze_match_matchup(match_id: str = None, team_names: list = None):
         
         has_rosters = False
         
-        for tid in team_ids:
-            t_profile = client.get_team_profile(tid)
+        # Both profiles at once: the second request's wait overlaps the first one's round trip
+        for tid, t_profile in zip(team_ids, client.fetch_many(client.get_team_profile, team_ids)):
             if t_profile:
                 t_data = {
                     "name": t_profile.get('team', {}).get('name'),
@@ -640,3 +636,136 @@ def analyze_match_matchup(match_id: str = None, team_names: list = None):
 
     except Exception as e:
         return f"Error analyzing matchup: {e}"
+
+# Squad comparison
+MAX_SQUAD_COMPARISON_PLAYERS = 30
+PLAYERS_PER_SQUAD = 11
+
+def _career_row(profile, fallback_name, team):
+    """Compact career totals of a player profile as table cells."""
+    player = profile.get('player', {}) if profile else {}
+    total = (profile or {}).get('statistics', {}).get('total', {})
+    bat = total.get('batting', {})
+    bowl = total.get('bowling', {})
+    dash = lambda v: "-" if v is None else v
+    return [player.get('name') or fallback_name, team or "-",
+            dash(bat.get('matches')), dash(bat.get('runs')), dash(bat.get('average')), dash(bat.get('strike_rate')),
+            dash(bowl.get('wickets')), dash(bowl.get('economy')), dash(bowl.get('average'))]
+
+@tool
+@reports_stale_data
+def compare_squads(players: list = None, team_names: list = None, match_id: str = None):
+    """
+    Compares many players at once: returns ONE compact table of career batting (matches, runs,
+    average, strike rate) and bowling (wickets, economy, average) totals for every player.
+    Use this instead of calling `fetch_player_career_stats` once per player.
+
+    Args:
+        players (list): Player names or Sportradar Player IDs (e.g. ["Virat Kohli", "sr:player:123"]).
+        team_names (list): Teams whose first 11 listed players to include (e.g. ["India", "Sri Lanka"]).
+        match_id (str): A Sportradar Match ID: include the first 11 listed players of both teams.
+
+    **CRITICAL**: DO NOT USE THIS TOOL DIRECTLY. You MUST call `request_user_approval` first and wait for the user's explicit permission.
+    """
+    verify_approval("compare_squads")
+    if not client:
+        return "Error: Client not initialized."
+
+    try:
+        # 1. Teams whose squads to include
+        teams = []  # (team id, name)
+        if match_id:
+            summary = client.get_match(match_id)
+            if summary:
+                teams += [(c.id, c.name) for c in summary.competitors]
+        teams_kb = knowledge_base.get("teams", {})
+        for name in team_names or []:
+            for t_name, t_data in teams_kb.items():
+                if name.lower() in t_name.lower() and t_data.get('id'):
+                    teams.append((t_data['id'], t_name))
+                    break
+
+        # 2. All rosters at once (also used to resolve player names below)
+        entries = []  # (player id, name, team)
+        rosters = {}
+        for (tid, t_name), profile in zip(teams, client.fetch_many(client.get_team_profile, [t[0] for t in teams])):
+            roster = (profile or {}).get('players', [])
+            rosters[t_name] = roster
+            entries += [(p.get('id'), p.get('name'), t_name) for p in roster[:PLAYERS_PER_SQUAD] if p.get('id')]
+
+        unresolved = []
+        for name in players or []:
+            if name.startswith("sr:player:"):
+                entries.append((name, name, None))
+                continue
+            found_id = found_team = None
+            for t_name, roster in rosters.items():
+                found_id, _ = _match_roster(name.lower(), roster)
+                if found_id:
+                    found_team = t_name
+                    break
+            found_id = found_id or _resolve_player_id(name)
+            if found_id:
+                entries.append((found_id, name, found_team))
+            else:
+                unresolved.append(name)
+
+        # Drop duplicates (a listed player may also be in a listed squad), keep the first
+        unique = {}
+        for e in entries:
+            unique.setdefault(e[0], e)
+        entries = list(unique.values())[:MAX_SQUAD_COMPARISON_PLAYERS]
+        if not entries:
+            return "Error: No players to compare. Provide player names/IDs, two team names, or a match_id."
+
+        # 3. Every career profile at once, under the shared rate limit
+        profiles = client.fetch_many(client.get_player_profile, [e[0] for e in entries])
+
+        header = ["Player", "Team", "Bat M", "Runs", "Avg", "SR", "Wkts", "Econ", "Bowl Avg"]
+        lines = [" | ".join(header), " | ".join("---" for _ in header)]
+        missing = []
+        for (pid, name, team), profile in zip(entries, profiles):
+            if not profile:
+                missing.append(name)
+                continue
+            lines.append(" | ".join(str(cell) for cell in _career_row(profile, name, team)))
+        if missing:
+            lines.append(f"\nNo profile available for: {', '.join(missing)}")
+        if unresolved:
+            lines.append(f"Could not find a Player ID for: {', '.join(unresolved)}")
+        return "Career totals\n" + "\n".join(lines)
+
+    except Exception as e:
+        return f"Error comparing squads: {e}"
+
+@tool
+@reports_stale_data
+def fetch_match_progression(match_id: str = "", at_over: float = None, last_overs: int = 3):
+    """
+    Ball-by-ball progression of a match: each innings' score at a given over (e.g. "score at
+    15 overs"), the run rate over the last few overs and runs per over of the current innings.
+    Use it for momentum questions ("how did the last 3 overs go?", "where were they at 10 overs?").
+
+    Args:
+        match_id (str): Sportradar Match ID. Empty = the first live match.
+        at_over (float): Over to compare innings at, e.g. 15 or 14.3. Default: the current over.
+        last_overs (int): Overs for the recent run rate (default 3).
+
+    **CRITICAL**: DO NOT USE THIS TOOL DIRECTLY. You MUST call `request_user_approval` first and wait for the user's explicit permission.
+    """
+    verify_approval("fetch_match_progression")
+    if not client:
+        return "Error: Client not initialized."
+
+    try:
+        if not match_id:
+            live = client.get_live_matches() or []
+            if not live:
+                return "No live matches found. Please provide a match_id."
+            match_id = live[0].id
+        timeline = timeline_store.sync(client, match_id)
+        if timeline is None:
+            return f"No ball-by-ball timeline available for {match_id}."
+        return json.dumps(progression(timeline, at_over, last_overs), indent=2)
+    except Exception as e:
+        return f"Error fetching match progression: {e}"
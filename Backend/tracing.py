@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+import log
+
+# Lightweight per-request tracing.
+# One Trace per /chat run. Spans are recorded for LLM calls, tool calls, cached client
+# methods and Sportradar HTTP requests, streamed to the client as `trace` SSE events and
+# optionally appended as JSON lines to TRACE_EXPORT_PATH.
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+
+logger = log.get_logger("tracing")
+
+# The active trace / span for the current task. LangChain copies the context into the
+# executor threads that run sync tools, so Sportradar calls made inside tools see these.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+current_span = contextvars.ContextVar("current_span", default=None)
+
+_export_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start", "end_time", "attributes")
+
+    def __init__(self, trace, name, kind, parent_id=None, attributes=None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.end_time = None
+        self.attributes = dict(attributes or {})
+
+    @property
+    def duration_ms(self):
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return round((end - self.start) * 1000, 2)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, **attributes):
+        if self.end_time is not None:
+            return
+        self.attributes.update(attributes)
+        self.end_time = time.perf_counter()
+        self.trace._on_span_end(self)
+
+    def to_dict(self):
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round((self.start - self.trace.start) * 1000, 2),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """
+    Collects spans for a single agent run.
+    `sink` is called with each finished span's dict (used to push SSE `trace` events);
+    it may be called from tool threads, so it must be thread-safe.
+    """
+    def __init__(self, sink=None, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.sink = sink
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.spans = []
+        self._open_tools = []
+        self._claimed_tools = set()
+        self._lock = threading.Lock()
+
+    def start_span(self, name, kind, parent_id=None, **attributes):
+        if parent_id is None:
+            parent = current_span.get()
+            if parent is not None and parent.trace is self:
+                parent_id = parent.span_id
+            elif kind != "tool":
+                # Tools are never nested, even when several run concurrently
+                parent_id = self.default_parent()
+        span = Span(self, name, kind, parent_id, attributes)
+        if kind == "tool":
+            with self._lock:
+                self._open_tools.append(span)
+        return span
+
+    def default_parent(self):
+        # Tools run in executor threads that cannot see the callback handler's spans,
+        # so work done inside a tool is attached to the innermost open tool span.
+        with self._lock:
+            return self._open_tools[-1].span_id if self._open_tools else None
+
+    def claim_tool(self, name):
+        """
+        Oldest open tool span called `name` not yet claimed by a tool thread.
+        Lets concurrently running tools each find their own span.
+        """
+        with self._lock:
+            for span in self._open_tools:
+                if span.name == name and span.span_id not in self._claimed_tools:
+                    self._claimed_tools.add(span.span_id)
+                    return span
+        return None
+
+    def _on_span_end(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if span in self._open_tools:
+                self._open_tools.remove(span)
+                self._claimed_tools.discard(span.span_id)
+        if self.sink:
+            try:
+                self.sink(span.to_dict())
+            except Exception as e:
+                logger.warning("trace.sink_failed", "Trace sink error: %s", e)
+
+    def summary(self):
+        with self._lock:
+            spans = list(self.spans)
+        totals = {}
+        for span in spans:
+            totals[span.kind] = round(totals.get(span.kind, 0) + span.duration_ms, 2)
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 2),
+            "span_count": len(spans),
+            "totals_ms": totals,
+        }
+
+    def to_dict(self):
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        data = self.summary()
+        data["started_at"] = self.started_at
+        data["spans"] = spans
+        return data
+
+    def export(self, path=None):
+        """Appends the finished trace as one JSON line. No-op unless a path is configured."""
+        path = path or TRACE_EXPORT_PATH
+        if not path:
+            return
+        try:
+            line = json.dumps(self.to_dict())
+            with _export_lock:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except Exception as e:
+            logger.warning("trace.export_failed", "Error exporting trace: %s", e)
+
+
+@contextmanager
+def span(name, kind, **attributes):
+    """
+    Records a span on the current trace, if any. Yields the Span (or None when
+    tracing is inactive) so callers can attach attributes such as cache hits.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    s = trace.start_span(name, kind, **attributes)
+    token = current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=type(e).__name__)
+        raise
+    finally:
+        current_span.reset(token)
+        s.end()
+
+
+@contextmanager
+def tool_scope(name):
+    """Runs the body of tool `name` with its own tool span as the current span."""
+    trace = current_trace.get()
+    tool_span = trace.claim_tool(name) if trace is not None else None
+    if tool_span is None:
+        yield
+        return
+    token = current_span.set(tool_span)
+    try:
+        yield
+    finally:
+        current_span.reset(token)
@@ -2,6 +2,7 @@ import React from 'react';
 import { User } from 'lucide-react';
 import CricketBotIcon from './CricketBotIcon';
 import ThinkingProcess from './ThinkingProcess';
+import type { TraceSpan, TraceSummary, ThinkingStep } from '../types';
 
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
@@ -10,7 +11,10 @@ interface ChatMessageProps {
     message: {
         role: 'user' | 'assistant';
         content: string;
-        thinking?: { type: 'thought' | 'action' | 'observation', content: string }[];
+        thinking?: ThinkingStep[];
+        trace?: TraceSpan[];
+        traceSummary?: TraceSummary;
+        queuePosition?: number;
         _requiresApproval?: boolean;
         _approvalAction?: string;
     };
@@ -37,9 +41,16 @@ const ChatMessage: React.FC<ChatMessageProps> = ({ message, onApprove, onReject
                     {isAssistant ? <CricketBotIcon size={18} /> : <User size={18} />}
                 </div>
                 <div className="flex-1 space-y-2 overflow-hidden min-w-0">
+                    {/* Admission queue status while the server waits for Gemini capacity */}
+                    {isAssistant && message.queuePosition !== undefined && message.queuePosition > 0 && (
+                        <div className="text-xs text-zinc-500 bg-zinc-100 border border-zinc-200 rounded-md px-3 py-2 inline-block">
+                            Waiting for the analyst... you are #{message.queuePosition} in the queue.
+                        </div>
+                    )}
+
                     {/* Thinking Process (Only for Assistant) */}
                     {isAssistant && message.thinking && message.thinking.length > 0 && (
-                        <ThinkingProcess logs={message.thinking} />
+                        <ThinkingProcess logs={message.thinking} trace={message.trace} traceSummary={message.traceSummary} />
                     )}
 
                     {/* Scouting Badges */}
@@ -4,13 +4,19 @@ import ChatMessage from './ChatMessage';
 import Sidebar from './Sidebar';
 import PlayerTable from './PlayerTable';
 import MatchList from './MatchList';
-import type { Player, Match } from '../types';
+import type { Player, Match, MatchListResponse, MatchUpdate, BatchRefreshResponse, TraceSpan, TraceSummary, ThinkingStep } from '../types';
 import { chatService } from '../services/api';
 
+// Backend MAX_BATCH_REFRESH: ids per POST /api/matches/refresh
+const MAX_BATCH_REFRESH = 20;
+
 interface Message {
     role: 'user' | 'assistant';
     content: string;
-    thinking?: { type: 'thought' | 'action' | 'observation', content: string }[];
+    thinking?: ThinkingStep[];
+    trace?: TraceSpan[];
+    traceSummary?: TraceSummary;
+    queuePosition?: number;
     _requiresApproval?: boolean;
     _approvalAction?: string;
 }
@@ -63,7 +69,7 @@ function Dashboard() {
 
     // Match List State
     const [isRefreshingAll, setIsRefreshingAll] = useState(false);
-    const [matches, setMatches] = useState<{ live: Match[], upcoming: Match[], recent: Match[] }>({
+    const [matches, setMatches] = useState<MatchListResponse>({
         live: [],
         upcoming: [],
         recent: []
@@ -100,27 +106,97 @@ function Dashboard() {
         // return () => clearInterval(interval);
     }, []);
 
-    const handleRefreshMatch = async (matchId: string) => {
+    // Next page of the upcoming or completed list
+    const handleLoadMore = async (section: 'upcoming' | 'recent') => {
+        const cursor = matches.next?.[section];
+        if (!cursor) return;
         try {
-            const response = await fetch(`http://localhost:8000/api/match/${matchId}/refresh`);
+            const response = await fetch(`http://localhost:8000/api/match-list?cursor=${encodeURIComponent(cursor)}`);
             if (response.ok) {
-                const updatedMatch = await response.json();
-
-                // Update specific match in live matches
+                const data: MatchListResponse = await response.json();
                 setMatches(prev => ({
                     ...prev,
-                    live: prev.live.map(m =>
-                        m.id === matchId
-                            ? { ...m, status: updatedMatch.status, score: updatedMatch.score }
-                            : m
-                    )
+                    [section]: [...prev[section], ...(data[section] || [])],
+                    next: { ...prev.next, [section]: data.next?.[section] ?? null }
                 }));
             }
+        } catch (error) {
+            console.error("Failed to load more matches:", error);
+        }
+    };
+
+    // Delta refresh of live cards: send the versions we show, apply the changed fields that come back
+    const refreshLiveMatches = async (matchIds: string[]) => {
+        const versions = new Map(matches.live.map(m => [m.id, m.version ?? 0]));
+        const updates: Record<string, MatchUpdate> = {};
+        for (let i = 0; i < matchIds.length; i += MAX_BATCH_REFRESH) {
+            const batch = Object.fromEntries(matchIds.slice(i, i + MAX_BATCH_REFRESH).map(id => [id, versions.get(id) ?? 0]));
+            const response = await fetch('http://localhost:8000/api/matches/refresh', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ matches: batch }),
+            });
+            if (!response.ok) throw new Error(`Refresh failed: ${response.status}`);
+            const data: BatchRefreshResponse = await response.json();
+            Object.assign(updates, data.matches);
+        }
+        if (Object.keys(updates).length === 0) return; // unchanged
+
+        setMatches(prev => ({
+            ...prev,
+            live: prev.live.map(m => {
+                const update = updates[m.id];
+                if (!update) return m;
+                return {
+                    ...m,
+                    ...(update.patch.status !== undefined && { status: update.patch.status }),
+                    ...(update.patch.score !== undefined && { score: update.patch.score }),
+                    version: update.version,
+                };
+            })
+        }));
+    };
+
+    const handleRefreshMatch = async (matchId: string) => {
+        try {
+            await refreshLiveMatches([matchId]);
         } catch (error) {
             console.error("Failed to refresh match:", error);
         }
     };
 
+    // "Refresh All": one batch call for every live card; the full list only when there is none yet
+    const handleRefreshAll = async () => {
+        if (matches.live.length === 0) {
+            await fetchMatches();
+            return;
+        }
+        setIsRefreshingAll(true);
+        try {
+            await refreshLiveMatches(matches.live.map(m => m.id));
+        } catch (error) {
+            console.error("Failed to refresh matches:", error);
+        } finally {
+            setIsRefreshingAll(false);
+        }
+    };
+
+    // Tool output side effect: live context JSON (a "matches" key) updates the Live Players table
+    const applyLiveContext = (output: string) => {
+        try {
+            const data = JSON.parse(output);
+            if (data.matches && Array.isArray(data.matches)) {
+                console.log("Auto-updating Live Context:", data);
+                // Update the Live Players table with data from the first match found
+                if (data.matches.length > 0) {
+                    setLivePlayers(data.matches[0].players || []);
+                }
+            }
+        } catch (e) {
+            // Not JSON or non-match data, ignore.
+        }
+    };
+
     const handleSendMessage = async (content: string) => {
         const userMessage: Message = { role: 'user', content };
         setMessages((prev) => [...prev, userMessage]);
@@ -135,12 +211,15 @@ function Dashboard() {
 
             setMessages((prev) => [...prev, assistantMessage]);
 
-            for await (const chunk of chatService.streamMessage(content)) {
+            for await (const chunk of chatService.streamMessage(content, activeSessionId)) {
                 setMessages((prev) => {
                     const newMessages = [...prev];
                     const lastMsg = newMessages[newMessages.length - 1];
 
                     if (lastMsg.role === 'assistant') {
+                        // Any event other than a queue update means the run has been admitted
+                        lastMsg.queuePosition = chunk.type === 'queue' ? chunk.position : undefined;
+
                         if (chunk.type === 'thought' || chunk.type === 'action' || chunk.type === 'observation') {
                             const currentThinking = lastMsg.thinking || [];
                             const lastThought = currentThinking[currentThinking.length - 1];
@@ -149,7 +228,9 @@ function Dashboard() {
                                 lastThought.content === chunk.content;
 
                             if (!isDuplicate) {
-                                lastMsg.thinking = [...currentThinking, { type: chunk.type, content: chunk.content }];
+                                lastMsg.thinking = [...currentThinking, {
+                                    type: chunk.type, content: chunk.content, tool: chunk.tool, blob: chunk.blob, size: chunk.size
+                                }];
                             }
 
                             // Pass approval attributes from the chunk mapping generated by main.py exception
@@ -160,19 +241,11 @@ function Dashboard() {
 
                             // Check for Side Effects (Context Updates)
                             if (chunk.type === 'observation') {
-                                try {
-                                    // chunk.content is the tool output. 
-                                    // If it's JSON from fetch_live_match_context, it will have "matches" key.
-                                    const data = JSON.parse(chunk.content);
-                                    if (data.matches && Array.isArray(data.matches)) {
-                                        console.log("Auto-updating Live Context:", data);
-                                        // Update the Live Players table with data from the first match found
-                                        if (data.matches.length > 0) {
-                                            setLivePlayers(data.matches[0].players || []);
-                                        }
-                                    }
-                                } catch (e) {
-                                    // Not JSON or non-match data, ignore.
+                                if (!chunk.blob) {
+                                    applyLiveContext(chunk.content);
+                                } else if (chunk.tool === 'fetch_live_match_context') {
+                                    // Large output: only the preview was streamed; fetch the full JSON once
+                                    chatService.fetchBlob(chunk.blob).then(applyLiveContext).catch(() => { });
                                 }
                             }
 
@@ -194,6 +267,15 @@ function Dashboard() {
                                 lastMsg.content = lastMsg.content.replace(highlightMatch[0], "");
                             }
 
+                        } else if (chunk.type === 'trace') {
+                            // Timing spans for the Thinking Process accordion
+                            if (chunk.span) {
+                                lastMsg.trace = [...(lastMsg.trace || []), chunk.span];
+                            }
+                            if (chunk.summary) {
+                                lastMsg.traceSummary = chunk.summary;
+                            }
+
                         } else if (chunk.type === 'error') {
                             lastMsg.content += `\n[Error: ${chunk.content}]`;
                         }
@@ -301,7 +383,7 @@ function Dashboard() {
                         <div className="flex items-center gap-3">
                             <h2 className="font-semibold text-zinc-800">Match Center</h2>
                             <button
-                                onClick={fetchMatches}
+                                onClick={handleRefreshAll}
                                 disabled={isRefreshingAll}
                                 className="p-1.5 text-zinc-500 hover:text-indigo-600 hover:bg-indigo-50 rounded-md transition-colors disabled:opacity-50"
                                 title="Refresh Multiple Matches"
@@ -330,7 +412,7 @@ function Dashboard() {
                         )}
 
                         {/* Match List */}
-                        <MatchList matches={matches} onRefreshMatch={handleRefreshMatch} />
+                        <MatchList matches={matches} onRefreshMatch={handleRefreshMatch} onLoadMore={handleLoadMore} />
                     </div>
                 </aside>
 
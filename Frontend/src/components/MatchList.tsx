@@ -1,19 +1,35 @@
 import React, { useState } from 'react';
 import { Calendar, Clock, Trophy, RefreshCw } from 'lucide-react';
-import type { Match } from '../types';
+import type { Match, MatchListResponse } from '../types';
 
 interface MatchListProps {
-    matches: {
-        live: Match[];
-        upcoming: Match[];
-        recent: Match[];
-    };
+    matches: MatchListResponse;
     onSelectMatch?: (match: Match) => void;
     onRefreshMatch?: (matchId: string) => Promise<void>;
+    onLoadMore?: (section: 'upcoming' | 'recent') => Promise<void>;
 }
 
-const MatchList: React.FC<MatchListProps> = ({ matches, onSelectMatch, onRefreshMatch }) => {
+const MatchList: React.FC<MatchListProps> = ({ matches, onSelectMatch, onRefreshMatch, onLoadMore }) => {
     const [refreshingId, setRefreshingId] = useState<string | null>(null);
+    const [loadingSection, setLoadingSection] = useState<'upcoming' | 'recent' | null>(null);
+
+    const handleLoadMore = async (section: 'upcoming' | 'recent') => {
+        if (onLoadMore) {
+            setLoadingSection(section);
+            await onLoadMore(section);
+            setLoadingSection(null);
+        }
+    };
+
+    const loadMoreButton = (section: 'upcoming' | 'recent') => matches.next?.[section] && onLoadMore ? (
+        <button
+            onClick={() => handleLoadMore(section)}
+            disabled={loadingSection === section}
+            className="w-full text-xs text-zinc-500 hover:text-indigo-600 py-1.5 rounded-md hover:bg-indigo-50 transition-colors disabled:opacity-50"
+        >
+            {loadingSection === section ? 'Loading...' : 'Show more'}
+        </button>
+    ) : null;
 
     const handleRefresh = async (e: React.MouseEvent, matchId: string) => {
         e.stopPropagation();
@@ -111,6 +127,7 @@ const MatchList: React.FC<MatchListProps> = ({ matches, onSelectMatch, onRefresh
                             </div>
                         ))}
                     </div>
+                    {loadMoreButton('upcoming')}
                 </div>
             )}
 
@@ -154,6 +171,7 @@ const MatchList: React.FC<MatchListProps> = ({ matches, onSelectMatch, onRefresh
                             </div>
                         ))}
                     </div>
+                    {loadMoreButton('recent')}
                 </div>
             )}
         </div>
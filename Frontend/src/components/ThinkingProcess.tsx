@@ -1,17 +1,54 @@
 import React, { useState } from 'react';
-import { ChevronDown, ChevronRight, Calculator, Database, Brain, CheckCircle2 } from 'lucide-react';
-
-interface LogEntry {
-    type: 'thought' | 'action' | 'observation';
-    content: string;
-}
+import { ChevronDown, ChevronRight, Calculator, Database, Brain, CheckCircle2, Timer } from 'lucide-react';
+import type { TraceSpan, TraceSummary, ThinkingStep } from '../types';
+import { chatService } from '../services/api';
 
 interface ThinkingProcessProps {
-    logs: LogEntry[];
+    logs: ThinkingStep[];
+    trace?: TraceSpan[];
+    traceSummary?: TraceSummary;
 }
 
-const ThinkingProcess: React.FC<ThinkingProcessProps> = ({ logs }) => {
+const formatMs = (ms: number) => ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${Math.round(ms)}ms`;
+
+const formatBytes = (bytes: number) => bytes >= 1024 ? `${(bytes / 1024).toFixed(1)} KB` : `${bytes} B`;
+
+// Preview of a large tool output; the full text is fetched only when expanded
+const BlobOutput: React.FC<{ step: ThinkingStep }> = ({ step }) => {
+    const [full, setFull] = useState<string | null>(null);
+    const [state, setState] = useState<'idle' | 'loading' | 'failed'>('idle');
+
+    const load = () => {
+        setState('loading');
+        chatService.fetchBlob(step.blob!)
+            .then(text => { setFull(text); setState('idle'); })
+            .catch(() => setState('failed'));
+    };
+
+    return (
+        <>
+            {full ?? step.content}
+            {full === null && (
+                <button onClick={load} disabled={state !== 'idle'} className="block mt-1 text-emerald-600 hover:underline">
+                    {state === 'loading' ? 'Loading...' : state === 'failed' ? 'Full output no longer available' : `Show full output (${formatBytes(step.size || 0)})`}
+                </button>
+            )}
+        </>
+    );
+};
+
+// Walks up the span tree to the enclosing tool span (Sportradar calls sit under cache spans)
+const enclosingToolId = (span: TraceSpan, byId: Record<string, TraceSpan>): string | undefined => {
+    let current: TraceSpan | undefined = span;
+    while (current && current.kind !== 'tool') {
+        current = current.parent_id ? byId[current.parent_id] : undefined;
+    }
+    return current?.id;
+};
+
+const ThinkingProcess: React.FC<ThinkingProcessProps> = ({ logs, trace, traceSummary }) => {
     const [isOpen, setIsOpen] = useState(true);
+    const spansById: Record<string, TraceSpan> = Object.fromEntries((trace || []).map(span => [span.id, span]));
 
     if (!logs || logs.length === 0) return null;
 
@@ -46,14 +83,37 @@ const ThinkingProcess: React.FC<ThinkingProcessProps> = ({ logs }) => {
                                         log.type === 'action' ? 'text-blue-700 font-mono text-xs bg-blue-50/50 p-2 rounded border border-blue-100' :
                                             'text-emerald-700 font-mono text-xs bg-emerald-50/50 p-2 rounded border border-emerald-100'
                                     }`}>
-                                    {log.content}
+                                    {log.blob ? <BlobOutput step={log} /> : log.content}
                                 </p>
                             </div>
                         </div>
                     ))}
+                    {/* Timings: top-level LLM/tool spans, with Sportradar calls nested under their tool */}
+                    {trace && trace.length > 0 && (
+                        <div className="pl-7 pt-1 space-y-1">
+                            {trace.filter(span => span.kind === 'llm' || span.kind === 'tool').map(span => (
+                                <div key={span.id} className="text-xs text-zinc-500 font-mono">
+                                    <div className="flex items-center gap-1.5">
+                                        <Timer size={10} />
+                                        <span>{span.name}</span>
+                                        <span className="text-zinc-400">{formatMs(span.duration_ms)}</span>
+                                    </div>
+                                    {trace.filter(child => child.kind === 'sportradar' && enclosingToolId(child, spansById) === span.id).map(child => (
+                                        <div key={child.id} className="pl-4 text-zinc-400">
+                                            {child.name} {formatMs(child.duration_ms)}
+                                            {typeof child.attributes.rate_limit_wait_ms === 'number' && child.attributes.rate_limit_wait_ms > 0 &&
+                                                ` (waited ${formatMs(child.attributes.rate_limit_wait_ms)})`}
+                                        </div>
+                                    ))}
+                                </div>
+                            ))}
+                        </div>
+                    )}
                     <div className="flex gap-3 text-sm items-center text-zinc-400 pl-7 pt-1">
                         <CheckCircle2 size={12} />
-                        <span className="text-xs">Reasoning complete</span>
+                        <span className="text-xs">
+                            Reasoning complete{traceSummary ? ` in ${formatMs(traceSummary.duration_ms)}` : ''}
+                        </span>
                     </div>
                 </div>
             )}
@@ -5,6 +5,7 @@
 
 export interface ChatRequest {
     message: string;
+    session_id?: string;
 }
 
 export interface ChatResponse {
@@ -14,18 +15,31 @@ export interface ChatResponse {
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// Chat session ids ('1', timestamps) are only unique within this page, so the backend's
+// conversation memory is keyed by a per-page-load id plus the session id. Sessions are not
+// kept across reloads in the UI, so a reload starts with fresh memory too.
+const CLIENT_ID = crypto.randomUUID();
+
+// Full text of large tool observations, by content hash. The hash names immutable content, so
+// one fetch per hash is enough for the page (the browser's HTTP cache keeps it across reloads).
+const blobCache = new Map<string, Promise<string>>();
+
 export const chatService = {
     /**
      * Sends a message to the backend and streams the response.
-     * Yields partial updates as they arrive.
+     * Yields partial updates as they arrive. Messages of the same `sessionId` share
+     * conversation memory on the backend, so follow-ups can refer to earlier answers.
      */
-    async *streamMessage(content: string): AsyncGenerator<any, void, unknown> {
+    async *streamMessage(content: string, sessionId?: string): AsyncGenerator<any, void, unknown> {
         const response = await fetch(`${API_BASE_URL}/chat`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message: content } as ChatRequest),
+            body: JSON.stringify({
+                message: content,
+                session_id: sessionId ? `${CLIENT_ID}:${sessionId}` : undefined,
+            } as ChatRequest),
         });
 
         if (!response.ok) {
@@ -56,5 +70,22 @@ export const chatService = {
                 }
             }
         }
+    },
+
+    /**
+     * Full tool output of an observation event that carries a `blob` hash instead of its content.
+     */
+    fetchBlob(hash: string): Promise<string> {
+        let pending = blobCache.get(hash);
+        if (!pending) {
+            pending = fetch(`${API_BASE_URL}/api/blobs/${hash}`).then(async (response) => {
+                if (!response.ok) throw new Error(`Blob ${hash} unavailable (${response.status})`);
+                return response.text();
+            });
+            // A failed fetch (e.g. expired blob) may be retried later
+            pending.catch(() => blobCache.delete(hash));
+            blobCache.set(hash, pending);
+        }
+        return pending;
     }
 };
@@ -19,10 +19,54 @@ export interface Match {
     score?: string;
     result?: string;
     type: 'live' | 'upcoming' | 'recent' | 'scheduled';
+    version?: number; // live matches: data version the card shows (refresh cursor)
 }
 
 export interface MatchListResponse {
     live: Match[];
     upcoming: Match[];
     recent: Match[];
+    // Cursors for the next page of each list (null when there is none)
+    next?: { upcoming?: string | null; recent?: string | null };
+}
+
+// POST /api/matches/refresh: new version and changed fields of each match that moved
+export interface MatchUpdate {
+    version: number;
+    patch: { status?: string; score?: string; [field: string]: unknown };
+    full?: boolean; // every field, the server did not know our version
+}
+
+export interface BatchRefreshResponse {
+    matches: Record<string, MatchUpdate>;
+    missing: string[];
+    pollAfter: number;
+    stale?: Record<string, number>;
+}
+
+export interface TraceSpan {
+    id: string;
+    parent_id: string | null;
+    name: string;
+    kind: 'llm' | 'tool' | 'cache' | 'sportradar' | string;
+    start_ms: number;
+    duration_ms: number;
+    attributes: Record<string, unknown>;
+}
+
+export interface TraceSummary {
+    trace_id: string;
+    duration_ms: number;
+    span_count: number;
+    totals_ms: Record<string, number>;
+}
+
+// One entry of an assistant message's Thinking Process. Large tool outputs arrive as a preview
+// in `content` plus the `blob` hash of the full text (see chatService.fetchBlob) and its `size` in bytes.
+export interface ThinkingStep {
+    type: 'thought' | 'action' | 'observation';
+    content: string;
+    tool?: string;
+    blob?: string;
+    size?: number;
 }